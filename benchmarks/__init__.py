@@ -0,0 +1,16 @@
+"""Замеры производительности блога.
+
+    python -m benchmarks.datagen --posts 100000 --database bench.sqlite3
+    python -m benchmarks.runner --database bench.sqlite3 -o after.json
+    python -m benchmarks.compare before.json after.json
+    python -m benchmarks.throughput --database bench.sqlite3 -c 200
+    python -m benchmarks.dbload --database bench.sqlite3
+    python -m benchmarks.stress_comments --processes 16
+    python -m benchmarks.search --database bench.sqlite3 --posts 1000000
+    python -m benchmarks.sessions --database bench.sqlite3
+    python -m benchmarks.post_cards --database bench.sqlite3
+    python -m benchmarks.conditional --database bench.sqlite3
+
+Данные живут в отдельной базе (--database), рабочая db.sqlite3
+не затрагивается.
+"""
@@ -0,0 +1,52 @@
+"""Сравнение двух отчётов runner: python -m benchmarks.compare old new"""
+import argparse
+import json
+
+METRICS = (
+    ('latency_ms', 'p50'),
+    ('latency_ms', 'p95'),
+    ('latency_ms', 'p99'),
+    ('queries_per_request', 'mean'),
+    ('peak_memory_bytes', None),
+    ('response_bytes', None),
+)
+
+
+def metric(result, group, name):
+    value = result.get(group)
+    return value.get(name) if name and value is not None else value
+
+
+def compare(old, new):
+    rows = []
+    for scenario, new_result in new['scenarios'].items():
+        old_result = old['scenarios'].get(scenario)
+        if old_result is None:
+            continue
+        for group, name in METRICS:
+            before = metric(old_result, group, name)
+            after = metric(new_result, group, name)
+            if before is None or after is None:
+                continue
+            change = (after - before) / before * 100 if before else 0.0
+            label = f'{group}.{name}' if name else group
+            rows.append((scenario, label, before, after, change))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('old')
+    parser.add_argument('new')
+    args = parser.parse_args()
+    with open(args.old, encoding='utf-8') as old_file:
+        old = json.load(old_file)
+    with open(args.new, encoding='utf-8') as new_file:
+        new = json.load(new_file)
+    for scenario, label, before, after, change in compare(old, new):
+        print(f'{scenario:20} {label:28} {before:>12} → {after:>12} '
+              f'({change:+.1f}%)')
+
+
+if __name__ == '__main__':
+    main()
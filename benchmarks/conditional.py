@@ -0,0 +1,122 @@
+"""Трафик и CPU условных GET: python -m benchmarks.conditional --help
+
+Для лент, страницы публикации и профиля (аноним и автор) страница
+сначала запрашивается целиком, затем --repeat раз обычным GET и
+--repeat раз с If-None-Match из первого ответа. В отчёте — CPU
+процесса и время на запрос, байты ответа с заголовками и статусы.
+Кэш страниц анонимов работает как в продакшене: для анонима полный
+ответ часто берётся из него, и выигрыш 304 — прежде всего в трафике.
+"""
+import argparse
+import json
+import statistics
+import sys
+import time
+
+from benchmarks import environment
+from benchmarks.datagen import generate
+from benchmarks.runner import percentile
+
+
+def response_bytes(response):
+    return len(response.serialize_headers()) + len(response.content)
+
+
+def measure(request, repeat):
+    cpu = []
+    wall = []
+    sizes = []
+    statuses = {}
+    for _ in range(repeat):
+        cpu_start = time.process_time()
+        wall_start = time.perf_counter()
+        response = request()
+        wall.append((time.perf_counter() - wall_start) * 1000)
+        cpu.append((time.process_time() - cpu_start) * 1000)
+        sizes.append(response_bytes(response))
+        status = str(response.status_code)
+        statuses[status] = statuses.get(status, 0) + 1
+    return {
+        'cpu_ms': round(statistics.fmean(cpu), 3),
+        'latency_ms': {
+            'p50': round(percentile(wall, 0.50), 3),
+            'p95': round(percentile(wall, 0.95), 3),
+        },
+        'bytes': round(statistics.fmean(sizes)),
+        'statuses': dict(sorted(statuses.items())),
+    }
+
+
+def build_paths():
+    from django.db.models import Count
+
+    from blog.models import Category, Post
+
+    visible = Post.objects.filter(is_visible=True)
+    hot_post = visible.order_by('-comment_count').first()
+    category = Category.objects.filter(is_published=True).annotate(
+        n=Count('posts')).order_by('-n').first()
+    paths = {'index': '/'}
+    if category is not None:
+        paths['category_posts'] = f'/category/{category.slug}/'
+    if hot_post is not None:
+        paths['post_detail'] = f'/posts/{hot_post.id}/'
+        paths['profile'] = f'/profile/{hot_post.author.username}/'
+    return paths, hot_post.author if hot_post else None
+
+
+def compare(client, path, repeat):
+    first = client.get(path)
+    etag = first.get('ETag')
+    if etag is None:
+        return {'error': f'{path}: ответ {first.status_code} без ETag'}
+    full = measure(lambda: client.get(path), repeat)
+    revalidated = measure(
+        lambda: client.get(path, HTTP_IF_NONE_MATCH=etag), repeat)
+    return {
+        'full': full,
+        'revalidated': revalidated,
+        'bytes_saved': round(1 - revalidated['bytes'] / full['bytes'], 3),
+        'cpu_saved': round(1 - revalidated['cpu_ms'] / full['cpu_ms'], 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    environment.add_arguments(parser)
+    parser.add_argument('--repeat', type=int, default=200)
+    parser.add_argument('-o', '--output', help='Файл для JSON-отчёта')
+    args = parser.parse_args()
+
+    environment.setup_django(args.database)
+    from django.core.cache import caches
+    from django.test import Client
+
+    from blog.models import Post
+
+    if not Post.objects.exists():
+        generate(posts=200, stdout=sys.stderr)
+    for cache in caches.all():
+        cache.clear()
+    paths, author = build_paths()
+    anonymous = Client(raise_request_exception=False)
+    reader = Client(raise_request_exception=False)
+    if author is not None:
+        reader.force_login(author)
+
+    report = {}
+    for name, path in paths.items():
+        report[name] = {
+            'anonymous': compare(anonymous, path, args.repeat),
+            'author': compare(reader, path, args.repeat),
+        }
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            file.write(text)
+    else:
+        sys.stdout.write(text + '\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,163 @@
+"""Генератор синтетических данных: python -m benchmarks.datagen --help"""
+import argparse
+import random
+import sys
+import time
+from datetime import timedelta
+
+from benchmarks import environment
+
+TEXT_WORDS = (
+    'утро город море горы лес поезд кофе книга дождь солнце друзья '
+    'дорога музей парк река снег ветер закат рассвет сад улица мост'
+).split()
+BENCH_PASSWORD = 'bench-password'
+MAX_COMMENTS_PER_POST = 20000
+
+
+def words(rng, count):
+    return ' '.join(rng.choice(TEXT_WORDS) for _ in range(count))
+
+
+def skewed(rng, limit, alpha):
+    """Индекс с длинным хвостом: немногие получают большую часть"""
+    return min(limit - 1, int(rng.paretovariate(alpha)) - 1)
+
+
+def comment_total(rng, mean, alpha):
+    """Число комментариев по Парето со средним около mean"""
+    return min(MAX_COMMENTS_PER_POST,
+               int((rng.paretovariate(alpha) - 1) * (alpha - 1) * mean))
+
+
+def generate(posts=1000, authors=100, categories=20, locations=50,
+             comments_per_post=5.0, comment_skew=1.2, author_skew=1.5,
+             future_share=0.02, unpublished_share=0.05,
+             batch_size=5000, seed=0, stdout=None):
+    """Наполнение базы пачками bulk_create.
+
+    Комментарии распределены по Парето: у большинства публикаций
+    их почти нет, у немногих — тысячи. comment_count заполняется
+    сразу, поскольку bulk_create не отправляет сигналы; по той же
+    причине витрина PublishedPost и поисковый индекс строятся в конце.
+    """
+    from django.contrib.auth import get_user_model
+    from django.contrib.auth.hashers import make_password
+    from django.core.management.color import no_style
+    from django.db import connection, transaction
+    from django.utils import timezone
+
+    from blog.models import Category, Comment, Location, Post
+    from blog import search
+    from blog.published import rebuild
+
+    User = get_user_model()
+    rng = random.Random(seed)
+    now = timezone.now()
+    started = time.perf_counter()
+
+    def report(message):
+        if stdout is not None:
+            elapsed = time.perf_counter() - started
+            stdout.write(f'[{elapsed:7.1f} с] {message}\n')
+
+    password = make_password(BENCH_PASSWORD)
+    first_user = (User.objects.order_by('-id').values_list(
+        'id', flat=True).first() or 0) + 1
+    User.objects.bulk_create([
+        User(id=first_user + i, username=f'bench-{first_user + i}',
+             first_name=words(rng, 1), password=password)
+        for i in range(authors)
+    ], batch_size=batch_size)
+    author_ids = list(range(first_user, first_user + authors))
+    report(f'авторов: {authors}')
+
+    first_category = (Category.objects.order_by('-id').values_list(
+        'id', flat=True).first() or 0) + 1
+    Category.objects.bulk_create([
+        Category(id=first_category + i,
+                 title=words(rng, 2), description=words(rng, 20),
+                 slug=f'bench-{first_category + i}',
+                 is_published=rng.random() > 0.1)
+        for i in range(categories)
+    ])
+    category_ids = list(range(first_category, first_category + categories))
+    first_location = (Location.objects.order_by('-id').values_list(
+        'id', flat=True).first() or 0) + 1
+    Location.objects.bulk_create([
+        Location(id=first_location + i, name=words(rng, 2))
+        for i in range(locations)
+    ])
+    location_ids = list(range(first_location, first_location + locations))
+    report(f'категорий: {categories}, мест: {locations}')
+
+    next_post = (Post.objects.order_by('-id').values_list(
+        'id', flat=True).first() or 0) + 1
+    total_comments = 0
+    for offset in range(0, posts, batch_size):
+        post_batch = []
+        comment_batch = []
+        for _ in range(min(batch_size, posts - offset)):
+            if rng.random() < future_share:
+                pub_date = now + timedelta(minutes=rng.randint(1, 60 * 24))
+            else:
+                pub_date = now - timedelta(minutes=rng.randint(1, 525600))
+            n_comments = comment_total(rng, comments_per_post, comment_skew)
+            post_batch.append(Post(
+                id=next_post,
+                title=words(rng, 4), text=words(rng, rng.randint(20, 200)),
+                pub_date=pub_date,
+                is_published=rng.random() > unpublished_share,
+                author_id=author_ids[skewed(rng, authors, author_skew)],
+                category_id=rng.choice(category_ids),
+                location_id=rng.choice(location_ids),
+                comment_count=n_comments,
+            ))
+            comment_batch.extend(
+                Comment(post_id=next_post, text=words(rng, 12),
+                        author_id=rng.choice(author_ids))
+                for _ in range(n_comments))
+            next_post += 1
+        with transaction.atomic():
+            Post.objects.bulk_create(post_batch)
+            Comment.objects.bulk_create(comment_batch, batch_size=batch_size)
+        total_comments += len(comment_batch)
+        report(f'публикаций: {offset + len(post_batch)}, '
+               f'комментариев: {total_comments}')
+
+    with connection.cursor() as cursor:
+        for sql in connection.ops.sequence_reset_sql(
+                no_style(), [User, Category, Location, Post]):
+            cursor.execute(sql)
+    report(f'в витрине лент: {rebuild()}')
+    report(f'в поисковом индексе: {search.rebuild()}')
+    return {
+        'authors': authors,
+        'categories': categories,
+        'locations': locations,
+        'posts': posts,
+        'comments': total_comments,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    environment.add_arguments(parser)
+    parser.add_argument('--posts', type=int, default=1000)
+    parser.add_argument('--authors', type=int, default=100)
+    parser.add_argument('--categories', type=int, default=20)
+    parser.add_argument('--locations', type=int, default=50)
+    parser.add_argument('--comments-per-post', type=float, default=5.0)
+    parser.add_argument('--batch-size', type=int, default=5000)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    environment.setup_django(args.database)
+    generate(posts=args.posts, authors=args.authors,
+             categories=args.categories, locations=args.locations,
+             comments_per_post=args.comments_per_post,
+             batch_size=args.batch_size, seed=args.seed, stdout=sys.stdout)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+"""Нагрузочный тест настроек БД: python -m benchmarks.dbload --help
+
+WSGI-сервер из benchmarks.throughput поочерёдно запускается с
+соединением на каждый запрос и SQLite по умолчанию (untuned) и с
+постоянными соединениями и PRAGMA из SQLITE_PRAGMAS (tuned); в отчёте
+запросы в секунду и задержки для каждого профиля.
+"""
+import argparse
+import json
+import os
+import sqlite3
+import sys
+
+from benchmarks import environment
+from benchmarks.throughput import DEFAULT_THREADS, build_paths, run_mode
+
+PROFILES = {
+    'untuned': {
+        'BLOGICUM_DB_CONN_MAX_AGE': '0',
+        'BLOGICUM_SQLITE_TUNING': '0',
+    },
+    'tuned': {
+        'BLOGICUM_DB_CONN_MAX_AGE': '60',
+        'BLOGICUM_SQLITE_TUNING': '1',
+    },
+}
+
+
+def reset_journal_mode(database):
+    """WAL сохраняется в файле базы: вернуть журнал по умолчанию"""
+    with sqlite3.connect(database) as connection:
+        connection.execute('PRAGMA journal_mode = delete')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    environment.add_arguments(parser)
+    parser.add_argument('-c', '--concurrency', type=int, default=50)
+    parser.add_argument('-d', '--duration', type=float, default=10,
+                        help='Секунд нагрузки на каждый профиль')
+    parser.add_argument('--warmup', type=float, default=2)
+    parser.add_argument('--threads', type=int, default=DEFAULT_THREADS)
+    parser.add_argument('--port', type=int, default=8775)
+    parser.add_argument('-o', '--output', help='Файл для JSON-отчёта')
+    args = parser.parse_args()
+
+    # Сам замер не должен переводить базу в WAL до профиля untuned.
+    os.environ['BLOGICUM_SQLITE_TUNING'] = '0'
+    environment.setup_django(args.database)
+    from django.db import connections
+
+    paths = build_paths()
+    results = {}
+    for i, (profile, env) in enumerate(PROFILES.items()):
+        connections.close_all()
+        if env['BLOGICUM_SQLITE_TUNING'] == '0':
+            reset_journal_mode(args.database)
+        results[profile] = run_mode(
+            'wsgi', args.database, args.port + i, paths, args.concurrency,
+            args.duration, args.warmup, args.threads, env)
+    report = {
+        'concurrency': args.concurrency,
+        'threads': args.threads,
+        'paths': paths,
+        'profiles': results,
+    }
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            file.write(text)
+    else:
+        sys.stdout.write(text + '\n')
+
+
+if __name__ == '__main__':
+    main()
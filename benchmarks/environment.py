@@ -0,0 +1,36 @@
+import os
+import sys
+from pathlib import Path
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent / 'blogicum'
+DEFAULT_DATABASE = Path(__file__).resolve().parent / 'bench.sqlite3'
+
+
+def setup_django(database=DEFAULT_DATABASE, engine=None):
+    """Django с отдельной базой для замеров вместо db.sqlite3;
+    engine — другой бэкенд SQLite для сравнения
+    """
+    if str(PROJECT_DIR) not in sys.path:
+        sys.path.insert(0, str(PROJECT_DIR))
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'blogicum.settings')
+
+    import django
+    from django.conf import settings
+
+    settings.DATABASES['default']['NAME'] = str(database)
+    if engine is not None:
+        settings.DATABASES['default']['ENGINE'] = engine
+    settings.DEBUG = False
+    django.setup()
+
+    from django.core.management import call_command
+    from django.test.utils import setup_test_environment
+
+    setup_test_environment(debug=False)
+    call_command('migrate', verbosity=0, interactive=False)
+
+
+def add_arguments(parser):
+    parser.add_argument(
+        '--database', type=Path, default=DEFAULT_DATABASE,
+        help='Файл SQLite с данными для замеров')
@@ -0,0 +1,84 @@
+"""Рендер карточек ленты шаблоном и blog.cards:
+python -m benchmarks.post_cards --help
+
+Для каждого размера страницы карточки рендерятся двумя способами —
+циклом с {% include "includes/post_card.html" %} и
+blog.cards.render_post_cards — сначала со сверкой вывода, затем
+--repeat раз на замер. Кэш фрагментов не участвует: меряется именно
+рендер промахов. Шаблоны грузит кэширующий загрузчик, как в
+продакшене.
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+from benchmarks import environment
+from benchmarks.datagen import generate
+from benchmarks.runner import percentile
+
+PAGE_SIZES = (10, 50, 100)
+LOOP_TEMPLATE = ('{% for post in posts %}'
+                 '{% include "includes/post_card.html" %}{% endfor %}')
+
+
+def measure(render, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        render()
+        timings.append((time.perf_counter() - start) * 1000)
+    return {
+        'p50': round(percentile(timings, 0.50), 3),
+        'p95': round(percentile(timings, 0.95), 3),
+        'mean': round(statistics.fmean(timings), 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    environment.add_arguments(parser)
+    parser.add_argument('--sizes', type=int, nargs='+', default=PAGE_SIZES)
+    parser.add_argument('--repeat', type=int, default=200)
+    parser.add_argument('-o', '--output', help='Файл для JSON-отчёта')
+    args = parser.parse_args()
+
+    os.environ.setdefault('BLOGICUM_TEMPLATE_CACHE', '1')
+    environment.setup_django(args.database)
+    from django.template import engines
+
+    from blog.cards import render_post_cards
+    from blog.models import PublishedPost
+
+    missing = max(args.sizes) - PublishedPost.objects.count()
+    if missing > 0:
+        generate(posts=missing * 2, comments_per_post=0, stdout=sys.stderr)
+    engine = engines.all()[0]
+    loop = engine.from_string(LOOP_TEMPLATE)
+
+    report = {}
+    for size in args.sizes:
+        posts = [row.as_post() for row in PublishedPost.objects.order_by(
+            '-pub_date')[:size]]
+        template_html = loop.render({'posts': posts})
+        if ''.join(render_post_cards(posts)) != template_html:
+            raise SystemExit(f'{size} карточек: HTML не совпадает')
+        template = measure(lambda: loop.render({'posts': posts}), args.repeat)
+        inline = measure(lambda: render_post_cards(posts), args.repeat)
+        report[size] = {
+            'template_ms': template,
+            'inline_ms': inline,
+            'speedup': round(template['p50'] / inline['p50'], 1),
+        }
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            file.write(text)
+    else:
+        sys.stdout.write(text + '\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,206 @@
+"""Замеры горячих путей блога: python -m benchmarks.runner --help"""
+import argparse
+import json
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from contextlib import ExitStack
+from datetime import datetime, timezone as dt_timezone
+
+import django
+
+from benchmarks import environment
+
+
+class QueryCounter:
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+
+class Scenario:
+    """Один сценарий: клиент и функция, выполняющая запрос"""
+
+    def __init__(self, name, client, request):
+        self.name = name
+        self.client = client
+        self.request = request
+
+    def __call__(self):
+        """Ответ или None, если запрос упал исключением"""
+        try:
+            return self.request(self.client)
+        except Exception:
+            return None
+
+
+def build_scenarios():
+    """Сценарии по самым «тяжёлым» объектам набора данных"""
+    from django.db.models import Count
+    from django.test import Client
+
+    from blog.models import Category, Post
+
+    visible = Post.objects.filter(is_visible=True)
+    hot_post = visible.order_by('-comment_count').first()
+    category = Category.objects.filter(is_published=True).annotate(
+        n=Count('posts')).order_by('-n').first()
+    author = hot_post.author if hot_post else None
+    top_author = Post.objects.values('author__username').annotate(
+        n=Count('id')).order_by('-n').first()
+
+    anonymous = Client(raise_request_exception=False)
+    reader = Client(raise_request_exception=False)
+    writer = Client(raise_request_exception=False)
+    if author is not None:
+        reader.force_login(author)
+        writer.force_login(author)
+
+    scenarios = [
+        Scenario('index', reader, lambda c: c.get('/')),
+        Scenario('index_anonymous', anonymous, lambda c: c.get('/')),
+        Scenario('index_deep_page', reader, lambda c: c.get('/?page=500')),
+    ]
+    if category is not None:
+        scenarios.append(Scenario(
+            'category_posts', reader,
+            lambda c: c.get(f'/category/{category.slug}/')))
+    if hot_post is not None:
+        scenarios.extend([
+            Scenario('post_detail', reader,
+                     lambda c: c.get(f'/posts/{hot_post.id}/')),
+            Scenario('add_comment', writer,
+                     lambda c: c.post(f'/posts/{hot_post.id}/comment/',
+                                      {'text': 'Комментарий из замера'})),
+            Scenario('create_post', writer,
+                     lambda c: c.post('/posts/create/', {
+                         'title': 'Замер', 'text': 'Текст замера',
+                         'pub_date': '2020-01-01 00:00',
+                         'category': category.id if category else '',
+                     })),
+        ])
+    if top_author is not None:
+        username = top_author['author__username']
+        scenarios.append(Scenario(
+            'profile', reader, lambda c: c.get(f'/profile/{username}/')))
+    return scenarios
+
+
+def measure(scenario, iterations, warmup, memory_iterations):
+    from django.db import connections
+
+    for _ in range(warmup):
+        scenario()
+    latencies = []
+    queries = []
+    statuses = {}
+    sizes = []
+    for _ in range(iterations):
+        counter = QueryCounter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(counter))
+            start = time.perf_counter()
+            response = scenario()
+            latencies.append((time.perf_counter() - start) * 1000)
+        queries.append(counter.count)
+        status = 'error' if response is None else str(response.status_code)
+        statuses[status] = statuses.get(status, 0) + 1
+        if response is not None and not response.streaming:
+            sizes.append(len(response.content))
+
+    peak = 0
+    for _ in range(memory_iterations):
+        tracemalloc.start()
+        scenario()
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+
+    return {
+        'iterations': iterations,
+        'latency_ms': {
+            'p50': round(percentile(latencies, 0.50), 3),
+            'p95': round(percentile(latencies, 0.95), 3),
+            'p99': round(percentile(latencies, 0.99), 3),
+            'mean': round(statistics.fmean(latencies), 3),
+        },
+        'queries_per_request': {
+            'mean': round(statistics.fmean(queries), 2),
+            'max': max(queries),
+        },
+        'response_bytes': round(statistics.fmean(sizes)) if sizes else None,
+        'peak_memory_bytes': peak,
+        'statuses': dict(sorted(statuses.items())),
+    }
+
+
+def dataset_summary():
+    from django.contrib.auth import get_user_model
+
+    from blog.models import Category, Comment, Location, Post
+
+    return {
+        'users': get_user_model().objects.count(),
+        'categories': Category.objects.count(),
+        'locations': Location.objects.count(),
+        'posts': Post.objects.count(),
+        'comments': Comment.objects.count(),
+    }
+
+
+def run(only=None, iterations=50, warmup=5, memory_iterations=3):
+    from django.core.cache import caches
+
+    for cache in caches.all():
+        cache.clear()
+    results = {}
+    for scenario in build_scenarios():
+        if only and scenario.name not in only:
+            continue
+        results[scenario.name] = measure(
+            scenario, iterations, warmup, memory_iterations)
+    return {
+        'started_at': datetime.now(dt_timezone.utc).isoformat(),
+        'python': platform.python_version(),
+        'django': django.get_version(),
+        'dataset': dataset_summary(),
+        'scenarios': results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    environment.add_arguments(parser)
+    parser.add_argument('-n', '--iterations', type=int, default=50)
+    parser.add_argument('--warmup', type=int, default=5)
+    parser.add_argument('--memory-iterations', type=int, default=3)
+    parser.add_argument('--only', nargs='*', help='Имена сценариев')
+    parser.add_argument('-o', '--output', help='Файл для JSON-отчёта')
+    args = parser.parse_args()
+
+    environment.setup_django(args.database)
+    report = run(only=args.only, iterations=args.iterations,
+                 warmup=args.warmup,
+                 memory_iterations=args.memory_iterations)
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            file.write(text)
+    else:
+        sys.stdout.write(text + '\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+"""Задержка полнотекстового поиска: python -m benchmarks.search --help
+
+Если в базе меньше --posts публикаций, недостающие создаёт
+benchmarks.datagen (без комментариев — поиску они не нужны).
+Запросы идут напрямую через blog.search и KeysetPaginator, без HTTP,
+чтобы в замер попадали только БД и стемминг. Виды запросов:
+
+* common    — одно частое слово, совпадений почти у всех публикаций;
+* pair      — два слова сразу;
+* miss      — слово, которого нет ни в одной публикации;
+* next_page — вторая страница частого слова по курсору.
+"""
+import argparse
+import json
+import random
+import statistics
+import sys
+import time
+
+from benchmarks import environment
+from benchmarks.datagen import TEXT_WORDS, generate
+from benchmarks.runner import percentile
+
+MISSING_WORDS = ('вулкан', 'пустыня', 'айсберг', 'маяк')
+
+
+def summary(latencies):
+    return {
+        'p50': round(percentile(latencies, 0.50), 3),
+        'p95': round(percentile(latencies, 0.95), 3),
+        'p99': round(percentile(latencies, 0.99), 3),
+        'mean': round(statistics.fmean(latencies), 3),
+    }
+
+
+def measure(queries, fetch):
+    latencies = []
+    for query in queries:
+        start = time.perf_counter()
+        fetch(query)
+        latencies.append((time.perf_counter() - start) * 1000)
+    return summary(latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    environment.add_arguments(parser)
+    parser.add_argument('--posts', type=int, default=1_000_000)
+    parser.add_argument('--queries', type=int, default=200,
+                        help='Запросов каждого вида')
+    parser.add_argument('--batch-size', type=int, default=5000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('-o', '--output', help='Файл для JSON-отчёта')
+    args = parser.parse_args()
+
+    environment.setup_django(args.database)
+    from blog.models import Post
+    from blog.paginators import KeysetPaginator
+    from blog.views import (FEED_ORDERING, NUMBER_OF_PAGINATOR_PAGES,
+                            get_search_posts)
+
+    missing = args.posts - Post.objects.count()
+    if missing > 0:
+        generate(posts=missing, comments_per_post=0,
+                 batch_size=args.batch_size, seed=args.seed,
+                 stdout=sys.stderr)
+
+    def page(query, cursor=None):
+        paginator = KeysetPaginator(
+            get_search_posts(query), NUMBER_OF_PAGINATOR_PAGES,
+            ordering=FEED_ORDERING)
+        return paginator.get_page(cursor)
+
+    def next_page(query):
+        cursor = first_pages[query].next_cursor
+        return list(page(query, cursor))
+
+    rng = random.Random(args.seed)
+    common = [rng.choice(TEXT_WORDS) for _ in range(args.queries)]
+    pairs = [' '.join(rng.sample(TEXT_WORDS, 2))
+             for _ in range(args.queries)]
+    misses = [rng.choice(MISSING_WORDS) for _ in range(args.queries)]
+    first_pages = {word: page(word) for word in set(common)}
+
+    report = {
+        'posts': Post.objects.count(),
+        'queries': args.queries,
+        'latency_ms': {
+            'common': measure(common, lambda query: list(page(query))),
+            'pair': measure(pairs, lambda query: list(page(query))),
+            'miss': measure(misses, lambda query: list(page(query))),
+            'next_page': measure(common, next_page),
+        },
+    }
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            file.write(text)
+    else:
+        sys.stdout.write(text + '\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,105 @@
+"""Обращения к django_session на 1000 запросов:
+python -m benchmarks.sessions --help
+
+Сценарий визита: вход, --visit-requests запросов фрагмента
+комментариев (он проверяет request.user) и выход. Визиты повторяются
+с каждым движком сессий, пока не наберётся --requests запросов; в
+отчёте чтения и записи django_session в пересчёте на 1000 запросов.
+Вход и выход идут через force_login/logout тестового клиента — это те
+же login()/logout(), что вызывают представления.
+"""
+import argparse
+import json
+import sys
+
+from benchmarks import environment
+from benchmarks.datagen import generate
+
+ENGINES = {
+    'db': 'django.contrib.sessions.backends.db',
+    'cached_db': 'django.contrib.sessions.backends.cached_db',
+    'hybrid': 'blog.sessions',
+}
+WRITES = ('INSERT', 'UPDATE', 'DELETE')
+
+
+class SessionQueries:
+
+    def __init__(self):
+        self.reads = 0
+        self.writes = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        if 'django_session' in sql:
+            if sql.lstrip().upper().startswith(WRITES):
+                self.writes += 1
+            else:
+                self.reads += 1
+        return execute(sql, params, many, context)
+
+
+def run(engine, user, url, requests, visit_requests):
+    from django.core.cache import caches
+    from django.db import connection
+    from django.test import Client, override_settings
+
+    caches['sessions'].clear()
+    counter = SessionQueries()
+    done = 0
+    with override_settings(SESSION_ENGINE=engine), \
+            connection.execute_wrapper(counter):
+        client = Client()
+        while done < requests:
+            client.force_login(user)
+            for _ in range(visit_requests):
+                response = client.get(url)
+                assert response.status_code == 200, response.status_code
+            client.logout()
+            done += visit_requests + 2
+    per_thousand = 1000 / done
+    return {
+        'requests': done,
+        'reads_per_1k': round(counter.reads * per_thousand, 1),
+        'writes_per_1k': round(counter.writes * per_thousand, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    environment.add_arguments(parser)
+    parser.add_argument('--requests', type=int, default=10_000)
+    parser.add_argument('--visit-requests', type=int, default=8,
+                        help='Запросов между входом и выходом')
+    parser.add_argument('--engines', nargs='+', choices=ENGINES,
+                        default=list(ENGINES))
+    parser.add_argument('-o', '--output', help='Файл для JSON-отчёта')
+    args = parser.parse_args()
+
+    environment.setup_django(args.database)
+    from django.conf import settings
+    from django.urls import reverse
+
+    from blog.models import Post
+
+    settings.ALLOWED_HOSTS = ['testserver']
+    post = Post.objects.filter(is_visible=True).first()
+    if post is None:
+        generate(posts=10, comments_per_post=5, stdout=sys.stderr)
+        post = Post.objects.filter(is_visible=True).first()
+    url = reverse('blog:post_comments', args=[post.id])
+
+    report = {
+        name: run(ENGINES[name], post.author, url, args.requests,
+                  args.visit_requests)
+        for name in args.engines
+    }
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            file.write(text)
+    else:
+        sys.stdout.write(text + '\n')
+
+
+if __name__ == '__main__':
+    main()
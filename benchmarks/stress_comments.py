@@ -0,0 +1,163 @@
+"""Стресс-тест конкурентной записи комментариев в SQLite:
+python -m benchmarks.stress_comments --help
+
+Несколько процессов одновременно отправляют POST на add_comment к
+одной публикации. Профили:
+
+* plain — django.db.backends.sqlite3 без PRAGMA (журнал delete);
+* wal   — blog.backends.sqlite3 с WAL, BEGIN IMMEDIATE и повторами.
+
+Каждый профиль работает в своём процессе и на своей свежей базе.
+В отчёте: сколько записей удалось, сколько упало с «database is
+locked», время ожидания блокировок и сходится ли comment_count.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks import environment
+from benchmarks.runner import percentile
+
+PROFILES = {
+    'plain': ('django.db.backends.sqlite3', {'BLOGICUM_SQLITE_TUNING': '0'}),
+    'wal': ('blog.backends.sqlite3', {'BLOGICUM_SQLITE_TUNING': '1'}),
+}
+
+
+def hammer(post_id, user_id, comments, barrier, results):
+    """Тело процесса-писателя"""
+    from django.contrib.auth import get_user_model
+    from django.db import OperationalError
+    from django.test import Client
+
+    from blog.backends.sqlite3.base import lock_waited
+
+    lock_wait = []
+    lock_waited.connect(
+        lambda sender, seconds, **kwargs: lock_wait.append(seconds),
+        weak=False)
+    client = Client()
+    client.force_login(get_user_model().objects.get(pk=user_id))
+    outcome = {'ok': 0, 'locked': 0, 'error': 0}
+    latencies = []
+    barrier.wait()
+    for i in range(comments):
+        start = time.perf_counter()
+        try:
+            response = client.post(f'/posts/{post_id}/comment/',
+                                   {'text': f'Комментарий {os.getpid()}-{i}'})
+            outcome['ok' if response.status_code == 302 else 'error'] += 1
+        except OperationalError as exc:
+            outcome['locked' if 'locked' in str(exc) else 'error'] += 1
+        latencies.append((time.perf_counter() - start) * 1000)
+    results.put({**outcome, 'latencies': latencies,
+                 'lock_wait_ms': sum(lock_wait) * 1000})
+
+
+def run_profile(name, database, processes, comments):
+    engine, _ = PROFILES[name]
+    environment.setup_django(database, engine=engine)
+    from django.contrib.auth import get_user_model
+    from django.db import connections
+    from django.utils import timezone
+
+    from blog.models import Category, Comment, Location, Post
+
+    user = get_user_model().objects.create_user('stress', password='stress')
+    post = Post.objects.create(
+        title='Стресс', text='Текст', pub_date=timezone.now(), author=user,
+        category=Category.objects.create(title='К', description='О',
+                                         slug='stress'),
+        location=Location.objects.create(name='Место'))
+    connections.close_all()
+
+    context = multiprocessing.get_context('fork')
+    barrier = context.Barrier(processes + 1)
+    results = context.Queue()
+    writers = [
+        context.Process(target=hammer,
+                        args=(post.id, user.id, comments, barrier, results))
+        for _ in range(processes)
+    ]
+    for writer in writers:
+        writer.start()
+    barrier.wait()
+    started = time.perf_counter()
+    reports = [results.get() for _ in writers]
+    elapsed = time.perf_counter() - started
+    for writer in writers:
+        writer.join()
+
+    latencies = [value for report in reports for value in report['latencies']]
+    succeeded = sum(report['ok'] for report in reports)
+    post.refresh_from_db()
+    actual = Comment.objects.filter(post=post).count()
+    return {
+        'engine': engine,
+        'processes': processes,
+        'attempted': processes * comments,
+        'succeeded': succeeded,
+        'database_locked': sum(report['locked'] for report in reports),
+        'other_errors': sum(report['error'] for report in reports),
+        'comments_per_second': round(succeeded / elapsed, 1),
+        'latency_ms': {
+            'p50': round(percentile(latencies, 0.50), 3),
+            'p95': round(percentile(latencies, 0.95), 3),
+            'max': round(max(latencies), 3),
+        },
+        'lock_wait_ms': round(
+            sum(report['lock_wait_ms'] for report in reports), 1),
+        'comment_count_consistent': (
+            actual == succeeded and post.comment_count == actual),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('-p', '--processes', type=int, default=8)
+    parser.add_argument('-n', '--comments', type=int, default=100,
+                        help='Комментариев на процесс')
+    parser.add_argument('--profiles', nargs='*', choices=PROFILES,
+                        default=list(PROFILES))
+    parser.add_argument('--run-profile', choices=PROFILES,
+                        help=argparse.SUPPRESS)
+    parser.add_argument('--database', type=Path, help=argparse.SUPPRESS)
+    parser.add_argument('-o', '--output', help='Файл для JSON-отчёта')
+    args = parser.parse_args()
+
+    if args.run_profile:
+        report = run_profile(args.run_profile, args.database,
+                             args.processes, args.comments)
+        sys.stdout.write(json.dumps(report) + '\n')
+        return
+
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for name in args.profiles:
+            _, env = PROFILES[name]
+            output = subprocess.run(
+                [sys.executable, '-m', 'benchmarks.stress_comments',
+                 '--run-profile', name,
+                 '--database', str(Path(directory) / f'{name}.sqlite3'),
+                 '--processes', str(args.processes),
+                 '--comments', str(args.comments)],
+                cwd=Path(__file__).resolve().parent.parent,
+                env={**os.environ, **env},
+                stdout=subprocess.PIPE, check=True, text=True).stdout
+            results[name] = json.loads(output.splitlines()[-1])
+    text = json.dumps(results, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            file.write(text)
+    else:
+        sys.stdout.write(text + '\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,229 @@
+"""Пропускная способность под ASGI (uvicorn) и WSGI при высокой
+конкурентности: python -m benchmarks.throughput --help
+
+Каждый сервер запускается отдельным процессом с одним обработчиком:
+uvicorn с async-представлениями (blogicum/asgi.py) и wsgiref с пулом
+потоков (--threads, как у gunicorn --threads) с обычными. Нагрузку
+даёт клиент на asyncio, держащий --concurrency одновременных запросов.
+Нужен uvicorn: pip install uvicorn.
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from wsgiref.simple_server import WSGIRequestHandler, WSGIServer, make_server
+
+from benchmarks import environment
+from benchmarks.runner import percentile
+
+HOST = '127.0.0.1'
+MODES = ('asgi', 'wsgi')
+SERVER_START_TIMEOUT = 60
+DEFAULT_THREADS = 16
+
+
+class PooledWSGIServer(WSGIServer):
+    """Постоянные потоки: соединения с БД (CONN_MAX_AGE) в них
+    переживают запрос, как в gunicorn --threads
+    """
+
+    request_queue_size = 1024
+    threads = DEFAULT_THREADS
+
+    def server_activate(self):
+        super().server_activate()
+        self.pool = ThreadPoolExecutor(self.threads)
+
+    def process_request(self, request, client_address):
+        self.pool.submit(self.process_request_thread, request, client_address)
+
+    def process_request_thread(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+
+class QuietHandler(WSGIRequestHandler):
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(mode, database, port, threads=DEFAULT_THREADS):
+    """Тело процесса-сервера"""
+    if mode == 'asgi':
+        os.environ['BLOGICUM_ASYNC_VIEWS'] = '1'
+    environment.setup_django(database)
+    if mode == 'asgi':
+        import uvicorn
+        from django.core.asgi import get_asgi_application
+
+        uvicorn.run(get_asgi_application(), host=HOST, port=port,
+                    log_level='warning', access_log=False, backlog=4096)
+    else:
+        from django.core.wsgi import get_wsgi_application
+
+        PooledWSGIServer.threads = threads
+        make_server(HOST, port, get_wsgi_application(),
+                    server_class=PooledWSGIServer,
+                    handler_class=QuietHandler).serve_forever()
+
+
+def build_paths():
+    """Адреса читающих страниц по самым «тяжёлым» объектам"""
+    from django.db.models import Count
+
+    from blog.models import Category, Post
+
+    paths = ['/']
+    hot_post = Post.objects.filter(
+        is_visible=True).order_by('-comment_count').first()
+    category = Category.objects.filter(is_published=True).annotate(
+        n=Count('posts')).order_by('-n').first()
+    if category is not None:
+        paths.append(f'/category/{category.slug}/')
+    if hot_post is not None:
+        paths.append(f'/posts/{hot_post.id}/')
+        paths.append(f'/profile/{hot_post.author.username}/')
+    return paths
+
+
+async def fetch(port, path):
+    reader, writer = await asyncio.open_connection(HOST, port)
+    try:
+        writer.write((f'GET {path} HTTP/1.1\r\nHost: {HOST}\r\n'
+                      'Connection: close\r\n\r\n').encode())
+        await writer.drain()
+        status_line = await reader.readline()
+        await reader.read()
+        return status_line.split()[1].decode()
+    finally:
+        writer.close()
+
+
+async def load(port, paths, concurrency, duration):
+    latencies = []
+    statuses = {}
+    deadline = time.perf_counter() + duration
+
+    async def client(offset):
+        step = offset
+        while time.perf_counter() < deadline:
+            path = paths[step % len(paths)]
+            step += 1
+            start = time.perf_counter()
+            try:
+                status = await fetch(port, path)
+            except (OSError, IndexError, asyncio.IncompleteReadError):
+                status = 'error'
+            latencies.append((time.perf_counter() - start) * 1000)
+            statuses[status] = statuses.get(status, 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client(i) for i in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    if not latencies:
+        return {'requests': 0, 'statuses': statuses}
+    return {
+        'requests': len(latencies),
+        'requests_per_second': round(len(latencies) / elapsed, 1),
+        'latency_ms': {
+            'p50': round(percentile(latencies, 0.50), 3),
+            'p95': round(percentile(latencies, 0.95), 3),
+            'p99': round(percentile(latencies, 0.99), 3),
+            'mean': round(statistics.fmean(latencies), 3),
+        },
+        'statuses': dict(sorted(statuses.items())),
+    }
+
+
+def wait_for_port(port, process):
+    deadline = time.monotonic() + SERVER_START_TIMEOUT
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(
+                f'сервер завершился с кодом {process.returncode}')
+        try:
+            with socket.create_connection((HOST, port), timeout=1):
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f'сервер не открыл порт {port}')
+
+
+def run_mode(mode, database, port, paths, concurrency, duration, warmup,
+             threads=DEFAULT_THREADS, env=None):
+    """Запустить сервер (env — дополнительные переменные окружения)
+    и дать на него нагрузку
+    """
+    from django.core.cache import caches
+
+    for cache in caches.all():
+        cache.clear()
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'benchmarks.throughput', '--serve', mode,
+         '--port', str(port), '--database', str(database),
+         '--threads', str(threads)],
+        cwd=Path(__file__).resolve().parent.parent,
+        env={**os.environ, **(env or {})})
+    try:
+        wait_for_port(port, process)
+        if warmup:
+            asyncio.run(load(port, paths, concurrency, warmup))
+        return asyncio.run(load(port, paths, concurrency, duration))
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    environment.add_arguments(parser)
+    parser.add_argument('-c', '--concurrency', type=int, default=100)
+    parser.add_argument('-d', '--duration', type=float, default=10,
+                        help='Секунд нагрузки на каждый сервер')
+    parser.add_argument('--warmup', type=float, default=2)
+    parser.add_argument('--modes', nargs='*', choices=MODES, default=MODES)
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--threads', type=int, default=DEFAULT_THREADS,
+                        help='Потоков WSGI-сервера')
+    parser.add_argument('--serve', choices=MODES, help=argparse.SUPPRESS)
+    parser.add_argument('-o', '--output', help='Файл для JSON-отчёта')
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.serve, args.database, args.port, args.threads)
+        return
+    environment.setup_django(args.database)
+    paths = build_paths()
+    report = {
+        'concurrency': args.concurrency,
+        'duration_s': args.duration,
+        'paths': paths,
+        'servers': {
+            mode: run_mode(mode, args.database, args.port + i, paths,
+                           args.concurrency, args.duration, args.warmup,
+                           args.threads)
+            for i, mode in enumerate(args.modes)
+        },
+    }
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            file.write(text)
+    else:
+        sys.stdout.write(text + '\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,125 @@
+"""Асинхронные версии читающих представлений для ASGI.
+
+В Django 3.2 у ORM нет асинхронного API, поэтому запросы к БД и рендер
+выполняются в потоках через sync_to_async, а цикл событий тем временем
+обслуживает другие соединения. В post_detail публикация и пользователь
+запрашиваются одновременно; комментарии — только после проверки, что
+публикацию можно показать.
+"""
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.db import close_old_connections
+from django.http import Http404
+from django.shortcuts import get_object_or_404, render
+
+from .cache import anonymous_page_cache
+from .conditional import conditional_page
+from .forms import CommentForm
+from .models import Category, Post, User
+from .routers import read_from_replica
+from .views import (category_posts_state, get_comments_page, get_feed_page,
+                    get_posts, get_published_posts, get_search_posts,
+                    index_state, is_post_public, post_detail_state,
+                    profile_state)
+
+
+def in_own_thread(func):
+    """sync_to_async в отдельном потоке пула: такие вызовы идут
+    параллельно. По окончании, как после запроса, соединение потока
+    закрывается, только если истёк CONN_MAX_AGE или оно сломано
+    """
+    def run(*args, **kwargs):
+        try:
+            return func(*args, **kwargs)
+        finally:
+            close_old_connections()
+
+    return sync_to_async(run, thread_sensitive=False)
+
+
+def render_feed(request, template_name, posts, count_key, context=None):
+    page_obj = get_feed_page(request, posts, count_key)
+    return render(request, template_name,
+                  {**(context or {}), 'page_obj': page_obj})
+
+
+@read_from_replica
+@anonymous_page_cache
+@conditional_page(index_state)
+async def index(request):
+    """Главная страница / Лента публикаций"""
+    return await sync_to_async(render_feed)(
+        request, 'blog/index.html', get_published_posts(), ('index',))
+
+
+@read_from_replica
+@anonymous_page_cache
+@conditional_page(category_posts_state)
+async def category_posts(request, category_slug):
+    """Отображение публикаций в категории"""
+    category = await sync_to_async(get_object_or_404)(
+        Category,
+        slug=category_slug,
+        is_published=True)
+    posts = get_published_posts(category=category)
+    return await sync_to_async(render_feed)(
+        request, 'blog/post_list.html', posts,
+        ('category_posts', category.pk), {'category': category})
+
+
+@read_from_replica
+@anonymous_page_cache
+async def search(request):
+    """Поиск по заголовкам и текстам публикаций"""
+    query = request.GET.get('q', '').strip()
+    if not query:
+        return await sync_to_async(render)(
+            request, 'blog/search.html', {'query': query})
+    posts = await sync_to_async(get_search_posts)(query)
+    return await sync_to_async(render_feed)(
+        request, 'blog/search.html', posts, ('search', query),
+        {'query': query})
+
+
+def fetch_post(post_id):
+    return get_object_or_404(
+        Post.objects.select_related('category', 'location', 'author'),
+        id=post_id)
+
+
+@read_from_replica
+@conditional_page(post_detail_state)
+async def post_detail(request, post_id):
+    """Отображение полного описания выбранной публикации"""
+    user_id, post = await asyncio.gather(
+        sync_to_async(lambda: request.user.id)(),
+        in_own_thread(fetch_post)(post_id),
+    )
+    if user_id != post.author_id and not is_post_public(post):
+        raise Http404
+    comments = await in_own_thread(get_comments_page)(
+        post_id, request.GET.get('comments'))
+    context = {'post': post,
+               'form': CommentForm(request.POST or None),
+               'comments': comments}
+    return await sync_to_async(render)(
+        request, 'blog/post_detail.html', context)
+
+
+@read_from_replica
+@conditional_page(profile_state)
+async def profile(request, username):
+    """Отображение страницы пользователя"""
+    profile, user_id = await asyncio.gather(
+        sync_to_async(get_object_or_404)(User, username=username),
+        sync_to_async(lambda: request.user.id)(),
+    )
+    own = user_id == profile.id
+    if own:
+        posts = get_posts(author=profile)
+    else:
+        posts = get_published_posts(author=profile)
+    return await sync_to_async(render_feed)(
+        request, 'blog/profile.html', posts, ('profile', profile.pk, own),
+        {'profile': profile})
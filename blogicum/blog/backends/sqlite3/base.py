@@ -0,0 +1,93 @@
+"""SQLite для нескольких воркеров на одной машине.
+
+Отличия от django.db.backends.sqlite3:
+
+* транзакции atomic() начинаются с BEGIN IMMEDIATE: блокировка записи
+  берётся сразу, и ожидание её покрывает busy_timeout. С обычным BEGIN
+  транзакция, начавшаяся с чтения, при первой записи получает
+  SQLITE_BUSY без ожидания;
+* SQLITE_BUSY, пережившая busy_timeout, повторяется с экспоненциальной
+  паузой и случайным разбросом — для BEGIN и для одиночных запросов в
+  режиме autocommit, где повтор безопасен;
+* время ожидания блокировки отправляется сигналом lock_waited, долгие
+  ожидания пишутся в лог.
+
+PRAGMA (WAL, кэш страниц, mmap и т. д.) ставит blog.db.configure_sqlite.
+"""
+import logging
+import random
+import time
+
+from django.db.backends.sqlite3 import base
+from django.dispatch import Signal
+
+Database = base.Database
+logger = logging.getLogger(__name__)
+
+BEGIN_IMMEDIATE = 'BEGIN IMMEDIATE'
+BUSY_RETRIES = 5
+BUSY_BACKOFF_SECONDS = 0.05
+SLOW_LOCK_WAIT_SECONDS = 0.5
+
+# Аргументы: alias, seconds, retries.
+lock_waited = Signal()
+
+
+def is_busy(exc):
+    code = getattr(exc, 'sqlite_errorcode', None)
+    if code is not None:
+        return code & 0xff in (Database.SQLITE_BUSY, Database.SQLITE_LOCKED)
+    message = str(exc)
+    return 'database is locked' in message or 'database is busy' in message
+
+
+def backoff(retry):
+    return BUSY_BACKOFF_SECONDS * 2 ** retry * random.uniform(0.5, 1.5)
+
+
+class SQLiteCursorWrapper(base.SQLiteCursorWrapper):
+    db = None
+
+    def execute(self, query, params=None):
+        return self._run(super().execute, query, params)
+
+    def executemany(self, query, param_list):
+        return self._run(super().executemany, query, param_list)
+
+    def _run(self, method, query, params):
+        # Внутри транзакции часть работы уже сделана: повторять можно
+        # только транзакцию целиком, это дело вызывающего кода.
+        if self.db is None or self.db.in_atomic_block:
+            return method(query, params)
+        start = time.perf_counter()
+        retry = 0
+        while True:
+            try:
+                result = method(query, params)
+                break
+            except Database.OperationalError as exc:
+                if retry >= BUSY_RETRIES or not is_busy(exc):
+                    raise
+                time.sleep(backoff(retry))
+                retry += 1
+        if retry or query == BEGIN_IMMEDIATE:
+            self.db.report_lock_wait(time.perf_counter() - start, retry)
+        return result
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+
+    def create_cursor(self, name=None):
+        cursor = self.connection.cursor(factory=SQLiteCursorWrapper)
+        cursor.db = self
+        return cursor
+
+    def _start_transaction_under_autocommit(self):
+        self.cursor().execute(BEGIN_IMMEDIATE)
+
+    def report_lock_wait(self, seconds, retries=0):
+        if seconds >= SLOW_LOCK_WAIT_SECONDS:
+            logger.warning('%s: ожидание блокировки SQLite %.0f мс, '
+                           'повторов %d', self.alias, seconds * 1000, retries)
+        lock_waited.send(sender=type(self), alias=self.alias,
+                         seconds=seconds, retries=retries)
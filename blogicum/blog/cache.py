@@ -0,0 +1,258 @@
+import asyncio
+import hashlib
+import math
+import time
+from datetime import datetime, timezone
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.core.cache import caches
+from django.utils.cache import get_conditional_response
+from django.utils.http import parse_http_date_safe
+
+from . import published
+from .cards import PageUrls, render_post_card
+
+FRAGMENT_CACHE_ALIAS = 'fragments'
+POST_CARD_TEMPLATE = 'includes/post_card.html'
+POST_CARD_TIMEOUT = 60 * 60 * 24
+VERSION_PREFIX = 'version'
+POST_CARD_PREFIX = 'post-card'
+
+PAGE_CACHE_ALIAS = 'feeds'
+PAGE_CACHE_TIMEOUT = 60 * 5
+PAGE_PREFIX = 'page'
+PAGE_GENERATION_KEY = 'page-generation'
+PAGE_STATS_PREFIX = 'page-stats'
+PAGE_STATS_VIEWS_KEY = 'page-stats-views'
+
+
+def fragment_cache():
+    return caches[FRAGMENT_CACHE_ALIAS]
+
+
+def version_key(kind, pk):
+    return f'{VERSION_PREFIX}:{kind}:{pk}'
+
+
+def bump_version(kind, pk):
+    """Новая метка версии: все фрагменты со старой меткой устаревают"""
+    fragment_cache().set(version_key(kind, pk), time.time_ns(), None)
+
+
+def _card_dependencies(post):
+    """От каких объектов зависит вёрстка карточки публикации"""
+    return (
+        ('post', post.pk),
+        ('author', post.author_id),
+        ('category', post.category_id),
+        ('location', post.location_id),
+    )
+
+
+def _get_versions(keys):
+    """Метки версий одним запросом; потерянные метки создаются заново"""
+    cache = fragment_cache()
+    versions = cache.get_many(keys)
+    missing = {key: time.time_ns() for key in keys if key not in versions}
+    if missing:
+        cache.set_many(missing, None)
+        versions.update(missing)
+    return versions
+
+
+def render_post_cards(posts):
+    """HTML карточек публикаций; шаблон рендерится только для карточек,
+    у которых изменилась публикация, её автор, категория или место
+    """
+    posts = list(posts)
+    dependencies = [_card_dependencies(post) for post in posts]
+    versions = _get_versions({
+        version_key(kind, pk)
+        for deps in dependencies for kind, pk in deps if pk is not None
+    })
+    card_keys = [
+        ':'.join([POST_CARD_PREFIX, str(post.pk)] + [
+            f'{versions[version_key(kind, pk)]}' if pk is not None else '-'
+            for kind, pk in deps
+        ])
+        for post, deps in zip(posts, dependencies)
+    ]
+    cache = fragment_cache()
+    cached = cache.get_many(card_keys)
+    rendered = {}
+    cards = []
+    urls = PageUrls()
+    for post, key in zip(posts, card_keys):
+        if key not in cached:
+            # Тот же HTML, что POST_CARD_TEMPLATE, без шаблонизатора.
+            rendered[key] = render_post_card(post, urls)
+        cards.append(cached.get(key, rendered.get(key)))
+    if rendered:
+        cache.set_many(rendered, POST_CARD_TIMEOUT)
+    return cards
+
+
+def page_cache():
+    return caches[PAGE_CACHE_ALIAS]
+
+
+def purge_pages():
+    """Сброс всех закэшированных страниц лент.
+
+    Любая публикация, категория, место или комментарий видны и на
+    главной, и на странице категории, поэтому поколение общее.
+    """
+    page_cache().set(PAGE_GENERATION_KEY, time.time_ns(), None)
+
+
+def purged_within(seconds):
+    """Сбрасывались ли страницы за последние seconds секунд"""
+    generation = page_cache().get(PAGE_GENERATION_KEY)
+    return (generation is not None
+            and time.time_ns() - generation < seconds * 10 ** 9)
+
+
+def last_purge():
+    """Время последнего сброса страниц.
+
+    Сброс идёт при любом изменении, в том числе удалении и правке
+    профиля, поэтому отметка только растёт.
+    """
+    return datetime.fromtimestamp(_page_generation() / 10 ** 9, timezone.utc)
+
+
+def _page_generation():
+    cache = page_cache()
+    generation = cache.get(PAGE_GENERATION_KEY)
+    if generation is None:
+        generation = time.time_ns()
+        if not cache.add(PAGE_GENERATION_KEY, generation, None):
+            generation = cache.get(PAGE_GENERATION_KEY, generation)
+    return generation
+
+
+def page_timeout(now=None):
+    """Время жизни страницы: не дольше, чем до ближайшей отложенной
+    публикации.
+
+    Основной сброс — сигнал posts_published; срок страхует страницы,
+    если планировщик запоздал или не запущен.
+    """
+    seconds = published.seconds_until_next(now, limit=PAGE_CACHE_TIMEOUT)
+    return max(1, math.ceil(seconds))
+
+
+def _count(view_name, outcome):
+    cache = page_cache()
+    key = f'{PAGE_STATS_PREFIX}:{view_name}:{outcome}'
+    cache.add(key, 0, None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 1, None)
+
+
+def page_stats():
+    """Счётчики попаданий и промахов по представлениям"""
+    cache = page_cache()
+    view_names = cache.get(PAGE_STATS_VIEWS_KEY, ())
+    keys = [
+        f'{PAGE_STATS_PREFIX}:{view_name}:{outcome}'
+        for view_name in view_names for outcome in ('hit', 'miss')
+    ]
+    counters = cache.get_many(keys)
+    return {
+        view_name: {
+            outcome: counters.get(
+                f'{PAGE_STATS_PREFIX}:{view_name}:{outcome}', 0)
+            for outcome in ('hit', 'miss')
+        }
+        for view_name in view_names
+    }
+
+
+def reset_page_stats():
+    cache = page_cache()
+    view_names = cache.get(PAGE_STATS_VIEWS_KEY, ())
+    cache.delete_many([
+        f'{PAGE_STATS_PREFIX}:{view_name}:{outcome}'
+        for view_name in view_names for outcome in ('hit', 'miss')
+    ])
+
+
+def _register_stats_view(view_name):
+    cache = page_cache()
+    view_names = cache.get(PAGE_STATS_VIEWS_KEY, ())
+    if view_name not in view_names:
+        cache.set(PAGE_STATS_VIEWS_KEY, (*view_names, view_name), None)
+
+
+def _cached_page(request, view_name):
+    """Ключ страницы и ответ из кэша; (None, None) — кэш не применим"""
+    if (request.method not in ('GET', 'HEAD')
+            or request.user.is_authenticated):
+        return None, None
+    path_hash = hashlib.md5(request.get_full_path().encode()).hexdigest()
+    key = f'{PAGE_PREFIX}:{_page_generation()}:{path_hash}'
+    response = page_cache().get(key)
+    if response is not None:
+        _count(view_name, 'hit')
+    else:
+        _register_stats_view(view_name)
+        _count(view_name, 'miss')
+    return key, response
+
+
+def _revalidate(request, response):
+    """Страница из кэша или 304, если у клиента та же версия.
+
+    ETag и Last-Modified ставит blog.conditional до сохранения; страница
+    живёт в кэше, только пока её поколение не сброшено, — и валидаторы
+    всё это время верны.
+    """
+    last_modified = response.get('Last-Modified')
+    return get_conditional_response(
+        request, etag=response.get('ETag'),
+        last_modified=last_modified and parse_http_date_safe(last_modified),
+        response=response)
+
+
+def _store_page(key, response):
+    if response.status_code == 200 and not response.cookies:
+        page_cache().set(key, response, page_timeout())
+
+
+def anonymous_page_cache(view):
+    """Кэш целых страниц для анонимных читателей.
+
+    Авторизованным пользователям и ответам, которые ставят cookies,
+    страница всегда собирается заново. Подходит и для async-представлений.
+    """
+    view_name = view.__name__
+
+    if asyncio.iscoroutinefunction(view):
+        @wraps(view)
+        async def async_wrapper(request, *args, **kwargs):
+            key, response = await sync_to_async(_cached_page)(
+                request, view_name)
+            if response is not None:
+                return _revalidate(request, response)
+            response = await view(request, *args, **kwargs)
+            if key is not None:
+                await sync_to_async(_store_page)(key, response)
+            return response
+
+        return async_wrapper
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        key, response = _cached_page(request, view_name)
+        if response is not None:
+            return _revalidate(request, response)
+        response = view(request, *args, **kwargs)
+        if key is not None:
+            _store_page(key, response)
+        return response
+
+    return wrapper
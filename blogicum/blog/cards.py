@@ -0,0 +1,142 @@
+"""Карточки публикаций без шаблонизатора.
+
+render_post_cards выдаёт побайтно тот же HTML, что
+includes/post_card.html вместе с category_link.html и post_picture.html,
+но без разбора узлов, вложенных include и новых слоёв контекста на
+каждую карточку. Адреса автора и категории вычисляются
+blog.fasturls один раз на страницу, адрес публикации — подстановкой id
+в готовый шаблон.
+
+Шаблон остаётся образцом: правки вёрстки вносятся в оба места, а
+test_post_cards сверяет их вывод.
+"""
+from django.utils.formats import date_format, localize
+from django.utils.html import conditional_escape
+from django.utils.safestring import mark_safe
+from django.utils.text import Truncator
+from django.utils.timezone import template_localtime
+
+from .fasturls import UrlBuilder
+from .images import image_sources
+
+PUB_DATE_FORMAT = 'd E Y, H:i'
+TEXT_WORDS = 10
+IMG_CLASS = 'border-3 rounded img-fluid img-thumbnail mb-2 mx-auto d-block'
+# Число, которое не встретится в адресе само по себе.
+ID_PLACEHOLDER = 918273645
+
+
+class PageUrls:
+    """Адреса карточек страницы; по разу на автора и категорию"""
+
+    def __init__(self):
+        self.builder = UrlBuilder()
+        detail = self.builder.reverse(
+            'blog:post_detail', args=[ID_PLACEHOLDER])
+        self.detail_prefix, self.detail_suffix = detail.split(
+            str(ID_PLACEHOLDER))
+        self.profiles = {}
+        self.categories = {}
+
+    def post_detail(self, post):
+        return f'{self.detail_prefix}{int(post.id)}{self.detail_suffix}'
+
+    def profile(self, author):
+        username = str(author)
+        if username not in self.profiles:
+            self.profiles[username] = conditional_escape(
+                self.builder.reverse('blog:profile', args=[username]))
+        return self.profiles[username]
+
+    def category(self, slug):
+        if slug not in self.categories:
+            self.categories[slug] = conditional_escape(
+                self.builder.reverse('blog:category_posts', args=[slug]))
+        return self.categories[slug]
+
+
+def _picture(post):
+    """Вывод {% post_picture post "card" %}"""
+    picture = image_sources(post, 'card')
+    if picture is None:
+        return (f'\n  <img class="{IMG_CLASS}" '
+                f'src="{conditional_escape(post.image.url)}">\n\n')
+    sizes = conditional_escape(picture['sizes'])
+    sources = ''.join(
+        f'\n      <source type="{conditional_escape(source["type"])}" '
+        f'srcset="{conditional_escape(source["srcset"])}" '
+        f'sizes="{sizes}">\n    '
+        for source in picture['sources'])
+    return (f'\n  <picture>\n    {sources}\n'
+            f'    <img class="{IMG_CLASS}" '
+            f'src="{conditional_escape(picture["src"])}" loading="lazy" '
+            f'alt="{conditional_escape(post.title)}">\n  </picture>\n\n')
+
+
+def _image(post):
+    if not post.image:
+        return ''
+    return (f'\n        <a href="{conditional_escape(post.image.url)}" '
+            f'target="_blank">\n          {_picture(post)}\n'
+            '        </a>\n      ')
+
+
+def _notice(post):
+    if not post.is_published:
+        text = 'Пост снят с публикации админом'
+    elif not post.category.is_published:
+        text = 'Выбранная категория снята с публикации админом'
+    else:
+        return ''
+    return f'\n            <p class="text-danger">{text}</p>\n          '
+
+
+def _place(post):
+    location = post.location
+    if location and location.is_published:
+        return conditional_escape(location.name)
+    return 'Планета Земля'
+
+
+def render_post_card(post, urls=None):
+    """HTML одной карточки; urls — общий PageUrls страницы"""
+    urls = urls or PageUrls()
+    category = post.category
+    detail = urls.post_detail(post)
+    pub_date = conditional_escape(date_format(
+        template_localtime(post.pub_date), PUB_DATE_FORMAT))
+    text = conditional_escape(Truncator(post.text).words(
+        TEXT_WORDS, truncate=' …'))
+    return mark_safe(
+        '\n<div class="col d-flex justify-content-center">\n'
+        '  <div class="card" style="width: 40rem;">\n'
+        '    <div class="card-body">\n'
+        f'      {_image(post)}\n'
+        f'      <h5 class="card-title">{conditional_escape(post.title)}'
+        '</h5>\n'
+        '      <h6 class="card-subtitle mb-2 text-muted">\n'
+        '        <small>\n'
+        f'          {_notice(post)}\n'
+        f'          {pub_date} | {_place(post)}<br>\n'
+        '          От автора <a class="text-muted" '
+        f'href="{urls.profile(post.author)}">'
+        f'@{conditional_escape(post.author.username)}</a> в\n'
+        '          категории <a class="text-muted" '
+        f'href="{urls.category(category.slug)}">\n'
+        f'  {conditional_escape(category.title)}\n</a>\n'
+        '        </small>\n'
+        '      </h6>\n'
+        f'      <p class="card-text">{text}</p>\n'
+        f'      <a href="{detail}" class="card-link">Читать полный текст</a>\n'
+        f'      <a href="{detail}" class="card-link text-muted">Комментарии '
+        f'({localize(post.comment_count)})</a>\n'
+        '    </div>\n'
+        '  </div>\n'
+        '</div>'
+    )
+
+
+def render_post_cards(posts):
+    """HTML карточек в порядке posts"""
+    urls = PageUrls()
+    return [render_post_card(post, urls) for post in posts]
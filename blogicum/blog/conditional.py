@@ -0,0 +1,135 @@
+"""Условные GET: ETag и Last-Modified без рендера страницы.
+
+Декоратор conditional_page получает функцию состояния страницы
+state(request, *args, **kwargs). Она одним агрегатным запросом по
+строкам, которые покажет страница, возвращает пару (modified, parts):
+самую позднюю отметку updated_at и всё прочее, от чего зависит HTML, —
+или None, если валидаторы неприменимы (объекта нет, страница скрыта).
+ETag — хэш состояния вместе с пользователем и PAGE_ETAG_RELEASE.
+modified сама по себе может не расти: удаление строки или правка
+профиля её не сдвигают. Поэтому Last-Modified — поздняя из modified и
+времени последнего сброса кэша страниц (blog.cache.last_purge), который
+идёт при любом изменении. Страницы авторизованных содержат CSRF-токен
+форм, поэтому в их ETag входит и CSRF-cookie: после смены токена
+браузер не получит 304 на страницу со старыми формами.
+
+Совпал If-None-Match или страница не менялась после If-Modified-Since —
+ответ 304, представление не вызывается. Ответы помечаются
+Cache-Control: no-cache: браузер и CDN хранят страницу, но каждый раз
+сверяются с сервером. Страницы авторизованных ещё и private.
+"""
+import asyncio
+import hashlib
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import HttpResponse
+from django.middleware.csrf import get_token
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+
+from .cache import last_purge
+
+
+def latest(*stamps):
+    """Поздняя из отметок; None — отметок нет"""
+    stamps = [stamp for stamp in stamps if stamp is not None]
+    return max(stamps, default=None)
+
+
+def _csrf_cookie(request):
+    """CSRF-cookie, от которого зависят токены в формах страницы"""
+    if not request.user.is_authenticated:
+        return None
+    get_token(request)
+    return request.META['CSRF_COOKIE']
+
+
+def page_validators(request, state):
+    """Вычисляет ETag и Last-Modified (секунды) по состоянию страницы"""
+    modified, parts = state
+    key = repr((settings.PAGE_ETAG_RELEASE, request.user.pk,
+                _csrf_cookie(request), modified, parts))
+    etag = quote_etag(hashlib.md5(key.encode()).hexdigest())
+    return etag, int(latest(modified, last_purge()).timestamp())
+
+
+def _validators(state, request, args, kwargs):
+    if request.method not in ('GET', 'HEAD'):
+        return None
+    page_state = state(request, *args, **kwargs)
+    if page_state is None:
+        return None
+    return page_validators(request, page_state)
+
+
+def _headers(request, etag, last_modified):
+    """Заготовка заголовков; их копирует и ответ 304"""
+    response = HttpResponse()
+    response.headers['ETag'] = etag
+    if last_modified is not None:
+        response.headers['Last-Modified'] = http_date(last_modified)
+    if request.user.is_authenticated:
+        patch_cache_control(response, no_cache=True, private=True)
+    else:
+        patch_cache_control(response, no_cache=True)
+    return response
+
+
+def _not_modified(request, validators):
+    etag, last_modified = validators
+    headers = _headers(request, etag, last_modified)
+    response = get_conditional_response(
+        request, etag, last_modified, headers)
+    return None if response is headers else response
+
+
+def _add_headers(request, response, validators):
+    if response.status_code != 200:
+        return response
+    for header, value in _headers(request, *validators).items():
+        if header != 'Content-Type':
+            response.headers[header] = value
+    return response
+
+
+def conditional_page(state):
+    """ETag, Last-Modified и 304 по функции состояния страницы.
+
+    Ставится под anonymous_page_cache: страница попадает в кэш вместе
+    с валидаторами, и на попадание кэш отвечает 304 сам, без запроса
+    состояния. Подходит и для async-представлений.
+    """
+    def decorator(view):
+        if asyncio.iscoroutinefunction(view):
+            @wraps(view)
+            async def async_wrapper(request, *args, **kwargs):
+                validators = await sync_to_async(_validators)(
+                    state, request, args, kwargs)
+                if validators is None:
+                    return await view(request, *args, **kwargs)
+                response = await sync_to_async(_not_modified)(
+                    request, validators)
+                if response is not None:
+                    return response
+                response = await view(request, *args, **kwargs)
+                return await sync_to_async(_add_headers)(
+                    request, response, validators)
+
+            return async_wrapper
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            validators = _validators(state, request, args, kwargs)
+            if validators is None:
+                return view(request, *args, **kwargs)
+            response = _not_modified(request, validators)
+            if response is not None:
+                return response
+            return _add_headers(request, view(request, *args, **kwargs),
+                                validators)
+
+        return wrapper
+
+    return decorator
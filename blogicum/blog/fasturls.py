@@ -0,0 +1,138 @@
+"""Обратное разрешение URL по заранее скомпилированным маршрутам.
+
+django.urls.reverse() на каждый вызов проходит пространства имён,
+ищет резолвер, перебирает варианты маршрута и компилирует регулярное
+выражение проверки (через кэш re). fast_reverse делает всё это один
+раз на URLconf: для каждого имени вида 'blog:post_detail' хранит
+строки формата, имена параметров, конвертеры и скомпилированный
+шаблон. Остаётся подставить значения, проверить результат тем же
+шаблоном и закодировать — ответ совпадает с reverse() побайтно.
+
+Имена, которых нет в таблице (current_app, пространства имён
+приложений, вызываемые объекты), и аргументы, не подошедшие ни к
+одному варианту, уходят в reverse(): он вернёт адрес или поднимет
+то же NoReverseMatch. В шаблонах — тег {% fast_url %} из blog_tags.
+"""
+import re
+from functools import lru_cache
+from urllib.parse import quote
+
+from django.urls import get_resolver, get_script_prefix, get_urlconf, reverse
+from django.urls.resolvers import get_ns_resolver
+from django.utils.http import RFC3986_SUBDELIMS, escape_leading_slashes
+
+SAFE_CHARACTERS = RFC3986_SUBDELIMS + '/~:@'
+
+
+class Candidate:
+    """Один вариант маршрута: формат, параметры и проверка"""
+
+    def __init__(self, result, params, pattern, defaults, converters):
+        self.result = result
+        self.params = params
+        self.param_set = frozenset(params)
+        self.regex = re.compile(pattern)
+        self.defaults = defaults
+        self.converters = converters
+
+    def build(self, prefix, args, kwargs):
+        """Адрес или None, если значения не подходят"""
+        if args:
+            if len(args) != len(self.params):
+                return None
+            subs = dict(zip(self.params, args))
+        else:
+            if self.param_set.symmetric_difference(kwargs).difference(
+                    self.defaults):
+                return None
+            if any(kwargs.get(key, value) != value
+                   for key, value in self.defaults.items()):
+                return None
+            subs = kwargs
+        text_subs = {}
+        for key, value in subs.items():
+            converter = self.converters.get(key)
+            if converter is None:
+                text_subs[key] = str(value)
+                continue
+            try:
+                text_subs[key] = converter.to_url(value)
+            except ValueError:
+                return None
+        path = self.result % text_subs
+        if not self.regex.match(path):
+            return None
+        return escape_leading_slashes(
+            quote(prefix + path, safe=SAFE_CHARACTERS))
+
+
+def _named_resolvers(resolver, namespace='', ns_pattern='',
+                     ns_converters=None):
+    """(полное имя, имя, резолвер) — так же, как их находит reverse()"""
+    ns_converters = ns_converters or {}
+    target = resolver
+    if ns_pattern:
+        target = get_ns_resolver(
+            ns_pattern, resolver, tuple(ns_converters.items()))
+    for key in resolver.reverse_dict:
+        if isinstance(key, str):
+            yield namespace + key, key, target
+    for name, (extra, sub_resolver) in resolver.namespace_dict.items():
+        yield from _named_resolvers(
+            sub_resolver, f'{namespace}{name}:', ns_pattern + extra,
+            {**ns_converters, **sub_resolver.pattern.converters})
+
+
+class CompiledUrls:
+    """Маршруты одного URLconf по полным именам"""
+
+    def __init__(self, resolver):
+        self.routes = {}
+        for name, key, name_resolver in _named_resolvers(resolver):
+            self.routes.setdefault(name, [
+                Candidate(result, params, pattern, defaults, converters)
+                for possibility, pattern, defaults, converters
+                in name_resolver.reverse_dict.getlist(key)
+                for result, params in possibility
+            ])
+
+    def reverse(self, viewname, args=None, kwargs=None, prefix=None):
+        if args and kwargs:
+            raise ValueError(
+                "Don't mix *args and **kwargs in call to reverse()!")
+        candidates = self.routes.get(viewname)
+        if candidates is not None:
+            if prefix is None:
+                prefix = get_script_prefix()
+            for candidate in candidates:
+                url = candidate.build(prefix, args or (), kwargs or {})
+                if url is not None:
+                    return url
+        return reverse(viewname, args=args, kwargs=kwargs)
+
+
+class UrlBuilder:
+    """fast_reverse с URLconf и префиксом, взятыми один раз.
+
+    get_urlconf() и get_script_prefix() читают asgiref.Local и стоят
+    дороже самой подстановки, поэтому шаблонный тег fast_url заводит
+    один UrlBuilder на рендер шаблона.
+    """
+
+    def __init__(self):
+        self.urls = compiled_urls(get_resolver(get_urlconf()))
+        self.prefix = get_script_prefix()
+
+    def reverse(self, viewname, args=None, kwargs=None):
+        return self.urls.reverse(viewname, args, kwargs, self.prefix)
+
+
+@lru_cache(maxsize=None)
+def compiled_urls(resolver):
+    return CompiledUrls(resolver)
+
+
+def fast_reverse(viewname, args=None, kwargs=None):
+    """То же, что reverse(viewname, args=args, kwargs=kwargs)"""
+    return compiled_urls(get_resolver(get_urlconf())).reverse(
+        viewname, args, kwargs)
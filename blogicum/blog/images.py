@@ -0,0 +1,90 @@
+import posixpath
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps
+
+VARIANT_WIDTHS = (320, 640, 960, 1280)
+VARIANT_FORMATS = (
+    ('webp', 'WEBP', 'image/webp', {'quality': 80, 'method': 4}),
+    ('jpg', 'JPEG', 'image/jpeg',
+     {'quality': 82, 'optimize': True, 'progressive': True}),
+)
+# Карточка и подробная страница шириной 40rem (640px); srcset
+# отдаёт браузеру копии и для экранов с высокой плотностью точек.
+IMAGE_PRESETS = {
+    'card': {'max_width': 1280, 'fallback_width': 640,
+             'sizes': '(max-width: 640px) 100vw, 640px'},
+    'detail': {'max_width': 1280, 'fallback_width': 1280,
+               'sizes': '(max-width: 640px) 100vw, 640px'},
+}
+
+
+def variant_name(name, width, extension):
+    """posts_images/photo.jpg -> posts_images/photo.640w.webp"""
+    root, _ = posixpath.splitext(name)
+    return f'{root}.{width}w.{extension}'
+
+
+def build_variants(name, storage=default_storage):
+    """Уменьшенные копии изображения рядом с оригиналом.
+
+    Возвращает ширины созданных копий; крупнее оригинала копии
+    не делаются.
+    """
+    with storage.open(name, 'rb') as file:
+        original = ImageOps.exif_transpose(Image.open(file))
+        original.load()
+    widths = sorted({min(width, original.width) for width in VARIANT_WIDTHS})
+    for width in widths:
+        height = max(1, round(original.height * width / original.width))
+        resized = original.resize((width, height), Image.LANCZOS)
+        for extension, image_format, _, options in VARIANT_FORMATS:
+            image = resized
+            if image_format == 'JPEG' and image.mode != 'RGB':
+                image = image.convert('RGB')
+            elif image.mode not in ('RGB', 'RGBA'):
+                image = image.convert('RGBA')
+            buffer = BytesIO()
+            image.save(buffer, image_format, **options)
+            target = variant_name(name, width, extension)
+            if storage.exists(target):
+                storage.delete(target)
+            storage.save(target, ContentFile(buffer.getvalue()))
+    return widths
+
+
+def update_image_variants(post):
+    """Пересобрать копии после загрузки нового изображения"""
+    post.image_variants = build_variants(post.image.name) if post.image else []
+    post.save(update_fields=['image_variants', 'updated_at'])
+
+
+def image_sources(post, preset):
+    """URL-адреса для <picture>: srcset по форматам и запасной src"""
+    options = IMAGE_PRESETS[preset]
+    widths = [width for width in post.image_variants
+              if width <= options['max_width']]
+    if not post.image or not widths:
+        return None
+    storage = post.image.storage
+    name = post.image.name
+    sources = [
+        {
+            'type': mime_type,
+            'srcset': ', '.join(
+                f'{storage.url(variant_name(name, width, extension))} '
+                f'{width}w'
+                for width in widths),
+        }
+        for extension, _, mime_type, _ in VARIANT_FORMATS
+    ]
+    fallback = max(
+        [width for width in widths if width <= options['fallback_width']]
+        or widths[:1])
+    return {
+        'sources': sources,
+        'src': storage.url(variant_name(name, fallback, 'jpg')),
+        'sizes': options['sizes'],
+    }
@@ -0,0 +1,447 @@
+import asyncio
+import bisect
+import logging
+import os
+import socket
+import threading
+import time
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.contrib.admin.views.decorators import staff_member_required
+from django.core.cache import caches
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.http import JsonResponse
+from django.template import TemplateDoesNotExist
+from django.dispatch import receiver
+from django.template import base as template_base
+from django.template.backends import django as django_backend
+from django.template.library import TagHelperNode
+from django.template.loader_tags import IncludeNode
+
+from .backends.sqlite3.base import lock_waited
+
+logger = logging.getLogger(__name__)
+
+STATS_CACHE_ALIAS = 'default'
+STATS_PREFIX = 'viewstats'
+WORKERS_KEY = f'{STATS_PREFIX}:workers'
+UNRESOLVED_VIEW = '<unresolved>'
+
+# Верхние границы корзин гистограмм; последняя корзина — «больше».
+BUCKETS = {
+    'queries': (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89),
+    'db_ms': (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000),
+    'lock_wait_ms': (0, 1, 5, 10, 50, 100, 500, 1000, 5000),
+    'template_ms': (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000),
+    'total_ms': (5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000),
+    'response_bytes': (1024, 4096, 16384, 65536, 262144, 1048576),
+}
+
+_current = ContextVar('request_stats', default=None)
+_template_profile = ContextVar('template_profile', default=None)
+
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+
+def stats_cache():
+    return caches[STATS_CACHE_ALIAS]
+
+
+class Histogram:
+
+    def __init__(self, bounds, counts=None, total=0, maximum=0):
+        self.bounds = bounds
+        self.counts = counts or [0] * (len(bounds) + 1)
+        self.total = total
+        self.maximum = maximum
+
+    @property
+    def count(self):
+        return sum(self.counts)
+
+    def add(self, value):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.total += value
+        self.maximum = max(self.maximum, value)
+
+    def merge(self, other):
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+        self.total += other.total
+        self.maximum = max(self.maximum, other.maximum)
+
+    def percentile(self, fraction):
+        """Верхняя граница корзины, в которую попал перцентиль"""
+        count = self.count
+        if not count:
+            return None
+        threshold = fraction * count
+        seen = 0
+        for bound, bucket in zip(self.bounds, self.counts):
+            seen += bucket
+            if seen >= threshold:
+                return bound
+        return self.maximum
+
+    def to_state(self):
+        return self.counts, self.total, self.maximum
+
+    @classmethod
+    def from_state(cls, bounds, state):
+        counts, total, maximum = state
+        return cls(bounds, list(counts), total, maximum)
+
+    def summary(self):
+        count = self.count
+        return {
+            'count': count,
+            'mean': round(self.total / count, 2) if count else None,
+            'p50': self.percentile(0.5),
+            'p95': self.percentile(0.95),
+            'p99': self.percentile(0.99),
+            'max': round(self.maximum, 2),
+        }
+
+
+class RequestStats:
+
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.lock_wait_seconds = 0.0
+        self.template_seconds = 0.0
+        self.template_depth = 0
+        # async-представления делают запросы из нескольких потоков сразу.
+        self.lock = threading.Lock()
+
+    def __call__(self, execute, sql, params, many, context):
+        """Обёртка connection.execute_wrapper"""
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - start
+            with self.lock:
+                self.queries += 1
+                self.db_seconds += elapsed
+
+
+class Recorder:
+    """Гистограммы текущей минуты в памяти воркера.
+
+    Раз в VIEWSTATS_FLUSH_SECONDS они записываются в кэш под ключом
+    воркера и минуты; collect_stats складывает такие снимки всех
+    воркеров за последние VIEWSTATS_WINDOW_MINUTES.
+    """
+
+    def __init__(self):
+        self.worker = f'{socket.gethostname()}-{os.getpid()}'
+        self.minute = None
+        self.views = {}
+        self.last_flush = time.monotonic()
+        self.lock = threading.Lock()
+
+    def record(self, view_name, values):
+        with self.lock:
+            self._record(view_name, values)
+
+    def flush(self):
+        with self.lock:
+            self._flush()
+
+    def _record(self, view_name, values):
+        minute = int(time.time() // 60)
+        if minute != self.minute:
+            self._flush()
+            self.minute = minute
+            self.views = {}
+        histograms = self.views.setdefault(view_name, {
+            metric: Histogram(bounds) for metric, bounds in BUCKETS.items()
+        })
+        for metric, value in values.items():
+            if value is not None:
+                histograms[metric].add(value)
+        elapsed = time.monotonic() - self.last_flush
+        if elapsed >= settings.VIEWSTATS_FLUSH_SECONDS:
+            self._flush()
+
+    def _flush(self):
+        self.last_flush = time.monotonic()
+        if self.minute is None or not self.views:
+            return
+        cache = stats_cache()
+        window = settings.VIEWSTATS_WINDOW_MINUTES * 60
+        cache.set(
+            f'{STATS_PREFIX}:{self.worker}:{self.minute}',
+            {view_name: {metric: h.to_state()
+                         for metric, h in histograms.items()}
+             for view_name, histograms in self.views.items()},
+            window + 60)
+        workers = cache.get(WORKERS_KEY, {})
+        if workers.get(self.worker, 0) < self.minute:
+            workers[self.worker] = self.minute
+            cache.set(WORKERS_KEY, workers, None)
+
+
+recorder = Recorder()
+
+
+def collect_stats():
+    """Гистограммы по представлениям за окно, сложенные по воркерам"""
+    cache = stats_cache()
+    window = settings.VIEWSTATS_WINDOW_MINUTES
+    now = int(time.time() // 60)
+    minutes = range(now - window + 1, now + 1)
+    workers = {
+        worker: last_seen
+        for worker, last_seen in cache.get(WORKERS_KEY, {}).items()
+        if last_seen > now - window
+    }
+    snapshots = cache.get_many([
+        f'{STATS_PREFIX}:{worker}:{minute}'
+        for worker in workers for minute in minutes
+    ])
+    views = {}
+    for snapshot in snapshots.values():
+        for view_name, metrics in snapshot.items():
+            histograms = views.setdefault(view_name, {
+                metric: Histogram(bounds)
+                for metric, bounds in BUCKETS.items()
+            })
+            for metric, state in metrics.items():
+                histograms[metric].merge(
+                    Histogram.from_state(BUCKETS[metric], state))
+    return {
+        view_name: {metric: h.summary() for metric, h in histograms.items()}
+        for view_name, histograms in sorted(views.items())
+    }
+
+
+def check_budget(view_name, queries):
+    budget = settings.VIEW_QUERY_BUDGETS.get(view_name)
+    if budget is None or queries <= budget:
+        return
+    message = (f'{view_name}: {queries} SQL-запросов '
+               f'при бюджете {budget}')
+    if settings.VIEW_QUERY_BUDGET_ACTION == 'raise':
+        raise QueryBudgetExceeded(message)
+    logger.warning(message)
+
+
+@receiver(lock_waited)
+def _record_lock_wait(sender, seconds, **kwargs):
+    """Ожидание блокировки SQLite (blog.backends.sqlite3)"""
+    stats = _current.get()
+    if stats is not None:
+        with stats.lock:
+            stats.lock_wait_seconds += seconds
+
+
+def _record_current(execute, sql, params, many, context):
+    """Обёртка соединений под ASGI: запрос к БД засчитывается тому
+    HTTP-запросу, из контекста которого он выполнен
+    """
+    stats = _current.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    return stats(execute, sql, params, many, context)
+
+
+def _attach_recorder(sender, connection, **kwargs):
+    if _record_current not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_record_current)
+
+
+class ViewStatsMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = asyncio.iscoroutinefunction(get_response)
+        if self.is_async:
+            # Под ASGI запросы идут из потоков sync_to_async, у каждого
+            # из которых своё соединение: обёртка ставится при создании.
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+            connection_created.connect(
+                _attach_recorder, dispatch_uid='viewstats-recorder')
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        stats = RequestStats()
+        token = _current.set(stats)
+        start = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(stats))
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self._finish(request, stats, start, response)
+
+    async def __acall__(self, request):
+        stats = RequestStats()
+        token = _current.set(stats)
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self._finish(request, stats, start, response)
+
+    def _finish(self, request, stats, start, response):
+        match = request.resolver_match
+        view_name = match.view_name if match else UNRESOLVED_VIEW
+        recorder.record(view_name, {
+            'queries': stats.queries,
+            'db_ms': stats.db_seconds * 1000,
+            'lock_wait_ms': stats.lock_wait_seconds * 1000,
+            'template_ms': stats.template_seconds * 1000,
+            'total_ms': (time.perf_counter() - start) * 1000,
+            'response_bytes': (
+                None if response.streaming else len(response.content)),
+        })
+        check_budget(view_name, stats.queries)
+        return response
+
+
+class Template(django_backend.Template):
+
+    def render(self, context=None, request=None):
+        stats = _current.get()
+        if stats is None:
+            return super().render(context, request)
+        # Вложенный render_to_string уже входит во внешний замер.
+        stats.template_depth += 1
+        start = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            stats.template_depth -= 1
+            if not stats.template_depth:
+                stats.template_seconds += time.perf_counter() - start
+
+
+class InstrumentedDjangoTemplates(django_backend.DjangoTemplates):
+    """Шаблонизатор Django, замеряющий время рендера для ViewStats"""
+
+    def from_string(self, template_code):
+        return Template(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        try:
+            return Template(self.engine.get_template(template_name), self)
+        except TemplateDoesNotExist as exc:
+            django_backend.reraise(exc, self)
+
+
+class TemplateProfile:
+    """Время рендера по шаблонам, узлам {% include %} и тегам.
+
+    total — вместе с вложенными шаблонами и тегами, own — без них.
+    Теги считаются только из библиотек вне django.template: встроенные
+    if/for/url дробили бы замер без пользы.
+    """
+
+    def __init__(self):
+        self.entries = {}
+        self._children = []
+
+    def measure(self, key, render, *args):
+        self._children.append(0.0)
+        start = time.perf_counter()
+        try:
+            return render(*args)
+        finally:
+            elapsed = time.perf_counter() - start
+            children = self._children.pop()
+            if self._children:
+                self._children[-1] += elapsed
+            entry = self.entries.setdefault(key, [0, 0.0, 0.0])
+            entry[0] += 1
+            entry[1] += elapsed
+            entry[2] += elapsed - children
+
+    def rows(self):
+        """Строки отчёта, самые долгие первыми"""
+        return sorted((
+            {'name': key, 'calls': calls, 'total_ms': total * 1000,
+             'own_ms': own * 1000}
+            for key, (calls, total, own) in self.entries.items()
+        ), key=lambda row: row['total_ms'], reverse=True)
+
+
+def _node_key(node):
+    """Под каким именем замерять узел; None — не замерять"""
+    token = getattr(node, 'token', None)
+    if token is None:
+        return None
+    if isinstance(node, IncludeNode):
+        return (f'{{% {token.contents} %}} '
+                f'{node.origin.template_name}:{token.lineno}')
+    module = (node.func.__module__ if isinstance(node, TagHelperNode)
+              else type(node).__module__)
+    if module.startswith('django.template'):
+        return None
+    return f'{{% {token.contents.split()[0]} %}}'
+
+
+def _profiled_template_render(render):
+    def _render(self, context):
+        profile = _template_profile.get()
+        if profile is None:
+            return render(self, context)
+        return profile.measure(
+            self.name or '<string>', render, self, context)
+    return _render
+
+
+def _profiled_node_render(render):
+    def render_annotated(self, context):
+        profile = _template_profile.get()
+        key = None if profile is None else _node_key(self)
+        if key is None:
+            return render(self, context)
+        return profile.measure(key, render, self, context)
+    return render_annotated
+
+
+def install_template_profiling():
+    """Подменить рендер шаблонов и узлов замеряющим; повторно — без
+    эффекта. Вне profile_templates замер не ведётся
+    """
+    if getattr(template_base.Template._render, 'profiled', False):
+        return
+    template_base.Template._render = _profiled_template_render(
+        template_base.Template._render)
+    template_base.Node.render_annotated = _profiled_node_render(
+        template_base.Node.render_annotated)
+    template_base.Template._render.profiled = True
+
+
+@contextmanager
+def profile_templates():
+    """Замер рендера шаблонов внутри блока: with ... as profile"""
+    install_template_profiling()
+    profile = TemplateProfile()
+    token = _template_profile.set(profile)
+    try:
+        yield profile
+    finally:
+        _template_profile.reset(token)
+
+
+@staff_member_required
+def view_stats(request):
+    """Сводка замеров по представлениям (только для персонала)"""
+    recorder.flush()
+    return JsonResponse({
+        'window_minutes': settings.VIEWSTATS_WINDOW_MINUTES,
+        'views': collect_stats(),
+    }, json_dumps_params={'ensure_ascii': False})
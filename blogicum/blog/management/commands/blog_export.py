@@ -0,0 +1,42 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from blog.transfer import (DEFAULT_BATCH_SIZE, MODELS, CsvWriter,
+                           JsonLinesWriter, export)
+
+
+class Command(BaseCommand):
+    help = ('Выгружает категории, места, публикации и комментарии '
+            'потоком в JSON Lines или CSV')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--format', choices=('jsonl', 'csv'), default='jsonl')
+        parser.add_argument(
+            '-o', '--output', default='-',
+            help='Файл JSON Lines («-» — stdout) или каталог для CSV')
+        parser.add_argument(
+            '--models', nargs='*', choices=list(MODELS),
+            default=list(MODELS))
+        parser.add_argument(
+            '--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+            help='Сколько строк читать из БД за раз')
+
+    def handle(self, *args, **options):
+        output = options['output']
+        if options['format'] == 'csv':
+            if output == '-':
+                raise CommandError('Для CSV нужен каталог: --output DIR')
+            stats = export(CsvWriter(output), options['models'],
+                           options['batch_size'])
+        elif output == '-':
+            stats = export(JsonLinesWriter(sys.stdout), options['models'],
+                           options['batch_size'])
+        else:
+            with open(output, 'w', encoding='utf-8') as file:
+                stats = export(JsonLinesWriter(file), options['models'],
+                               options['batch_size'])
+        # Сводка — в stderr, чтобы не смешиваться с данными в stdout.
+        for line in stats.lines():
+            self.stderr.write(line, style_func=self.style.SUCCESS)
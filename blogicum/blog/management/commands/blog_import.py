@@ -0,0 +1,45 @@
+import sys
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import IntegrityError
+
+from blog.cache import purge_pages
+from blog.transfer import (DEFAULT_BATCH_SIZE, Importer, TransferError,
+                           read_csv, read_jsonl)
+
+
+class Command(BaseCommand):
+    help = ('Загружает категории, места, публикации и комментарии '
+            'из JSON Lines или CSV пачками bulk_create')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'source',
+            help='Файл JSON Lines («-» — stdin) или каталог с CSV')
+        parser.add_argument(
+            '--format', choices=('jsonl', 'csv'),
+            help='По умолчанию каталог — CSV, файл — JSON Lines')
+        parser.add_argument(
+            '--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+            help='Строк в одной транзакции')
+
+    def handle(self, *args, **options):
+        source = options['source']
+        file_format = options['format'] or (
+            'csv' if Path(source).is_dir() else 'jsonl')
+        importer = Importer(options['batch_size'])
+        try:
+            if file_format == 'csv':
+                stats = importer.run(read_csv(source))
+            elif source == '-':
+                stats = importer.run(read_jsonl(sys.stdin))
+            else:
+                with open(source, encoding='utf-8') as file:
+                    stats = importer.run(read_jsonl(file))
+        except (TransferError, IntegrityError) as error:
+            raise CommandError(f'Импорт прерван: {error}') from error
+        finally:
+            purge_pages()
+        for line in stats.lines():
+            self.stdout.write(self.style.SUCCESS(line))
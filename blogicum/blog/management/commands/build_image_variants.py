@@ -0,0 +1,69 @@
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import django
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.utils import timezone
+
+from blog import published
+from blog.cache import bump_version, purge_pages
+from blog.images import build_variants
+from blog.models import Post
+
+
+def _init_worker():
+    # При запуске через spawn дочерний процесс начинает с чистого листа.
+    django.setup()
+
+
+def _build(pk, name):
+    try:
+        return pk, build_variants(name), None
+    except Exception as exc:
+        return pk, None, f'{type(exc).__name__}: {exc}'
+
+
+class Command(BaseCommand):
+    help = ('Создаёт уменьшенные копии фото публикаций '
+            'в параллельных процессах')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers', type=int, default=os.cpu_count() or 1,
+            help='Число процессов-обработчиков')
+        parser.add_argument(
+            '--force', action='store_true',
+            help='Пересобрать копии и там, где они уже есть')
+
+    def handle(self, *args, **options):
+        posts = Post.objects.exclude(image='').order_by('pk')
+        tasks = [
+            (post.pk, post.image.name)
+            for post in posts.only('pk', 'image', 'image_variants').iterator()
+            if options['force'] or not post.image_variants
+        ]
+        if not tasks:
+            self.stdout.write('Новых фото нет')
+            return
+        # Открытое соединение нельзя делить с дочерними процессами.
+        connections.close_all()
+        done = failed = 0
+        with ProcessPoolExecutor(max_workers=options['workers'],
+                                 initializer=_init_worker) as executor:
+            futures = [executor.submit(_build, *task) for task in tasks]
+            for future in as_completed(futures):
+                pk, widths, error = future.result()
+                if error:
+                    failed += 1
+                    self.stderr.write(f'Публикация {pk}: {error}')
+                    continue
+                Post.objects.filter(pk=pk).update(
+                    image_variants=widths, updated_at=timezone.now())
+                # update() не шлёт сигналов: витрину обновляем сами.
+                published.sync_posts([pk])
+                bump_version('post', pk)
+                done += 1
+        purge_pages()
+        self.stdout.write(self.style.SUCCESS(
+            f'Обработано фото: {done}, с ошибками: {failed}'))
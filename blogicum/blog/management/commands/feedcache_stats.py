@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from blog.cache import page_stats, reset_page_stats
+
+
+class Command(BaseCommand):
+    help = 'Показывает попадания и промахи кэша страниц лент'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--reset', action='store_true',
+            help='Обнулить счётчики после вывода')
+
+    def handle(self, *args, **options):
+        stats = page_stats()
+        if not stats:
+            self.stdout.write('Статистики пока нет')
+        for view_name, counters in sorted(stats.items()):
+            total = counters['hit'] + counters['miss']
+            ratio = counters['hit'] / total if total else 0
+            self.stdout.write(
+                f'{view_name}: попаданий {counters["hit"]}, '
+                f'промахов {counters["miss"]}, доля попаданий {ratio:.1%}')
+        if options['reset']:
+            reset_page_stats()
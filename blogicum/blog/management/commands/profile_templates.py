@@ -0,0 +1,64 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+
+from blog.instrumentation import profile_templates
+
+DEFAULT_REQUESTS = 20
+DEFAULT_LIMIT = 25
+
+
+class Command(BaseCommand):
+    help = ('Время рендера по шаблонам, {% include %} и сторонним тегам '
+            'для GET-запросов к страницам сайта')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'paths', nargs='*', default=['/'],
+            help='Адреса страниц, по умолчанию главная')
+        parser.add_argument(
+            '--requests', type=int, default=DEFAULT_REQUESTS,
+            help='Запросов к каждой странице')
+        parser.add_argument(
+            '--user', help='Запрашивать от имени этого пользователя')
+        parser.add_argument(
+            '--limit', type=int, default=DEFAULT_LIMIT,
+            help='Сколько строк отчёта выводить')
+
+    def handle(self, *args, **options):
+        client = Client(raise_request_exception=False,
+                        HTTP_HOST='localhost')
+        if options['user']:
+            user = get_user_model().objects.filter(
+                username=options['user']).first()
+            if user is None:
+                raise CommandError(
+                    f'Пользователь {options["user"]} не найден')
+            client.force_login(user)
+        for path in options['paths']:
+            self.profile(client, path, options['requests'], options['limit'])
+
+    def profile(self, client, path, requests, limit):
+        # Первый запрос компилирует шаблоны и наполняет кэши.
+        client.get(path)
+        spent = 0.0
+        with profile_templates() as profile:
+            for _ in range(requests):
+                start = time.perf_counter()
+                response = client.get(path)
+                spent += time.perf_counter() - start
+        request_ms = spent * 1000 / requests
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            f'{path}: статус {response.status_code}, '
+            f'{request_ms:.2f} мс на запрос'))
+        self.stdout.write(
+            f'{"мс всего":>9} {"мс своих":>9} {"доля":>6} {"вызовов":>8}  '
+            'шаблон или тег')
+        for row in profile.rows()[:limit]:
+            total = row['total_ms'] / requests
+            self.stdout.write(
+                f'{total:9.3f} {row["own_ms"] / requests:9.3f} '
+                f'{total / request_ms:6.1%} '
+                f'{row["calls"] / requests:8.1f}  {row["name"]}')
@@ -0,0 +1,39 @@
+import signal
+import threading
+
+from django.core.management.base import BaseCommand
+
+from blog.published import publish_due_posts, seconds_until_next
+
+DEFAULT_INTERVAL = 5.0
+
+
+class Command(BaseCommand):
+    help = ('Планировщик отложенных публикаций: включает их в ленты, '
+            'когда наступает pub_date, с опозданием не больше --interval')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval', type=float, default=DEFAULT_INTERVAL,
+            help='Наибольшая задержка появления публикации, секунд')
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Один проход, например из cron')
+
+    def handle(self, *args, **options):
+        if options['once']:
+            self.report(publish_due_posts())
+            return
+        stop = threading.Event()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(signum, lambda *args: stop.set())
+        interval = options['interval']
+        while not stop.is_set():
+            self.report(publish_due_posts())
+            # Просыпаемся к ближайшей pub_date, если она раньше интервала.
+            stop.wait(max(0.0, seconds_until_next(limit=interval)))
+
+    def report(self, post_ids):
+        if post_ids:
+            self.stdout.write(self.style.SUCCESS(
+                f'Опубликовано: {len(post_ids)}'))
@@ -0,0 +1,41 @@
+import time
+
+from django.contrib.sessions.models import Session
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+DEFAULT_BATCH_SIZE = 1000
+
+
+class Command(BaseCommand):
+    help = ('Удаляет истёкшие сессии из django_session пачками, '
+            'не держа блокировку записи на всё удаление, как clearsessions')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+            help='Сколько сессий удалять за одну транзакцию')
+        parser.add_argument(
+            '--pause', type=float, default=0.0,
+            help='Пауза между пачками, секунд')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        # Граница фиксируется заранее, чтобы не гоняться за часами.
+        now = timezone.now()
+        expired = Session.objects.filter(expire_date__lt=now)
+        deleted = 0
+        while True:
+            with transaction.atomic():
+                keys = list(expired.values_list(
+                    'pk', flat=True)[:batch_size])
+                if keys:
+                    Session.objects.filter(pk__in=keys).delete()
+            deleted += len(keys)
+            if len(keys) < batch_size:
+                break
+            if options['pause']:
+                time.sleep(options['pause'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Удалено истёкших сессий: {deleted}'))
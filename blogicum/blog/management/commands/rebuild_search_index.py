@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from blog.search import rebuild
+
+
+class Command(BaseCommand):
+    help = 'Заново строит полнотекстовый индекс публикаций'
+
+    def handle(self, *args, **options):
+        total = rebuild()
+        self.stdout.write(self.style.SUCCESS(
+            f'Проиндексировано публикаций: {total}'))
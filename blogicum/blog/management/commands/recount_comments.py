@@ -0,0 +1,48 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from blog.models import Comment, Post
+from blog.published import sync_posts
+
+DEFAULT_BATCH_SIZE = 1000
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает Post.comment_count пачками и чинит расхождения'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+            help='Сколько публикаций проверять за одну транзакцию')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        counts = Comment.objects.filter(
+            post=OuterRef('pk')
+        ).order_by().values('post').annotate(n=Count('pk')).values('n')
+        last_id = 0
+        checked = repaired = 0
+        while True:
+            ids = list(Post.objects.filter(pk__gt=last_id).order_by(
+                'pk').values_list('pk', flat=True)[:batch_size])
+            if not ids:
+                break
+            last_id = ids[-1]
+            with transaction.atomic():
+                stale = list(Post.objects.filter(pk__in=ids).annotate(
+                    actual=Coalesce(Subquery(counts), 0)
+                ).exclude(comment_count=F('actual')).only('pk'))
+                now = timezone.now()
+                for post in stale:
+                    post.comment_count = post.actual
+                    post.updated_at = now
+                Post.objects.bulk_update(
+                    stale, ['comment_count', 'updated_at'])
+                sync_posts(post.pk for post in stale)
+            checked += len(ids)
+            repaired += len(stale)
+        self.stdout.write(self.style.SUCCESS(
+            f'Проверено публикаций: {checked}, исправлено: {repaired}'))
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from blog.cache import purge_pages
+from blog.published import rebuild
+
+
+class Command(BaseCommand):
+    help = ('Пересчитывает видимость всех публикаций и пересобирает '
+            'витрину лент PublishedPost')
+
+    def handle(self, *args, **options):
+        count = rebuild()
+        purge_pages()
+        self.stdout.write(self.style.SUCCESS(
+            f'В витрине публикаций: {count}'))
@@ -0,0 +1,39 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+def copy_sqlite(source_alias, target_alias):
+    """Снимок основной базы в реплику через sqlite3 backup API"""
+    source = connections[source_alias]
+    target = connections[target_alias]
+    source.ensure_connection()
+    target.ensure_connection()
+    source.connection.backup(target.connection)
+
+
+class Command(BaseCommand):
+    help = ('Копирует основную базу SQLite в реплики DATABASE_REPLICAS '
+            '(для локальной проверки чтения с реплики)')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval', type=float,
+            help='Повторять копирование каждые N секунд')
+
+    def handle(self, *args, **options):
+        if not settings.DATABASE_REPLICAS:
+            raise CommandError('Реплика не настроена: BLOGICUM_DB_REPLICA')
+        if connections[DEFAULT_DB_ALIAS].vendor != 'sqlite':
+            raise CommandError(
+                'Реплику сервера БД наполняет репликация самого сервера')
+        while True:
+            for alias in settings.DATABASE_REPLICAS:
+                copy_sqlite(DEFAULT_DB_ALIAS, alias)
+            self.stdout.write(self.style.SUCCESS(
+                f'Реплики обновлены: {", ".join(settings.DATABASE_REPLICAS)}'))
+            if not options['interval']:
+                return
+            time.sleep(options['interval'])
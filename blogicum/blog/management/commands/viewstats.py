@@ -0,0 +1,40 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from blog.instrumentation import collect_stats
+
+COLUMNS = (
+    ('queries', 'запросов'),
+    ('db_ms', 'БД, мс'),
+    ('lock_wait_ms', 'ожидание блокировок БД, мс'),
+    ('template_ms', 'шаблоны, мс'),
+    ('total_ms', 'всего, мс'),
+    ('response_bytes', 'ответ, байт'),
+)
+
+
+class Command(BaseCommand):
+    help = 'Сводка замеров по представлениям за скользящее окно'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--json', action='store_true',
+            help='Вывести сводку в JSON')
+
+    def handle(self, *args, **options):
+        stats = collect_stats()
+        if options['json']:
+            self.stdout.write(json.dumps(stats, ensure_ascii=False, indent=2))
+            return
+        if not stats:
+            self.stdout.write('Замеров пока нет')
+        for view_name, metrics in stats.items():
+            self.stdout.write(self.style.MIGRATE_HEADING(
+                f'{view_name} ({metrics["total_ms"]["count"]} запросов)'))
+            for metric, title in COLUMNS:
+                summary = metrics[metric]
+                self.stdout.write(
+                    f'  {title}: среднее {summary["mean"]}, '
+                    f'p50 {summary["p50"]}, p95 {summary["p95"]}, '
+                    f'p99 {summary["p99"]}, макс. {summary["max"]}')
@@ -0,0 +1,85 @@
+# Generated by Django 3.2.16 on 2026-10-18 17:05
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.utils import timezone
+
+BATCH_SIZE = 1000
+
+
+def fill_published_posts(apps, schema_editor):
+    Post = apps.get_model('blog', 'Post')
+    PublishedPost = apps.get_model('blog', 'PublishedPost')
+    posts = Post.objects.filter(
+        is_published=True, category__is_published=True,
+        pub_date__lte=timezone.now(),
+    ).select_related('author', 'category', 'location')
+    rows = []
+    for post in posts.iterator(chunk_size=BATCH_SIZE):
+        location = post.location
+        rows.append(PublishedPost(
+            id=post.id, title=post.title, text=post.text,
+            pub_date=post.pub_date, image=post.image.name or '',
+            image_variants=post.image_variants,
+            author_id=post.author_id,
+            author_username=post.author.username,
+            category_id=post.category_id,
+            category_slug=post.category.slug,
+            category_title=post.category.title,
+            location_id=post.location_id,
+            location_name=(location.name if location is not None
+                           and location.is_published else None),
+            comment_count=post.comment_count,
+        ))
+        if len(rows) == BATCH_SIZE:
+            PublishedPost.objects.bulk_create(rows)
+            rows = []
+    PublishedPost.objects.bulk_create(rows)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('blog', '0005_post_image_variants'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PublishedPost',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('title', models.CharField(max_length=256)),
+                ('text', models.TextField()),
+                ('pub_date', models.DateTimeField()),
+                ('image', models.CharField(blank=True, max_length=100)),
+                ('image_variants', models.JSONField(default=list)),
+                ('author_username', models.CharField(max_length=150)),
+                ('category_slug', models.SlugField()),
+                ('category_title', models.CharField(max_length=256)),
+                ('location_name', models.CharField(max_length=256, null=True)),
+                ('comment_count', models.PositiveIntegerField(default=0)),
+                ('author', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('category', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='blog.category')),
+                ('location', models.ForeignKey(db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='blog.location')),
+            ],
+            options={
+                'verbose_name': 'опубликованная публикация',
+                'verbose_name_plural': 'Опубликованные публикации',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='publishedpost',
+            index=models.Index(fields=['-pub_date', '-id'], name='published_feed_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='publishedpost',
+            index=models.Index(fields=['category', '-pub_date', '-id'], name='published_category_feed_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='publishedpost',
+            index=models.Index(fields=['author', '-pub_date', '-id'], name='published_author_feed_idx'),
+        ),
+        migrations.RunPython(fill_published_posts, migrations.RunPython.noop),
+    ]
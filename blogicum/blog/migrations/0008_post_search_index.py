@@ -0,0 +1,28 @@
+# Generated by Django 3.2.16 on 2026-10-18 19:40
+
+from django.db import migrations
+
+
+def create_search_index(apps, schema_editor):
+    from blog import search
+
+    search.rebuild(schema_editor.connection,
+                   apps.get_model('blog', 'Post').objects)
+
+
+def drop_search_index(apps, schema_editor):
+    from blog import search
+
+    with schema_editor.connection.cursor() as cursor:
+        search.backend_for(schema_editor.connection).drop(cursor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0007_post_is_visible'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 3.2.16 on 2026-10-18 22:30
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0009_updated_at'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='category',
+            name='category_published_idx',
+        ),
+    ]
@@ -15,6 +15,11 @@ class BaseModel(models.Model):
         auto_now_add=True,
         verbose_name='Добавлено'
     )
+    # Валидаторы условных GET, см. blog.conditional.
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Изменено'
+    )
 
     class Meta:
         abstract = True
@@ -73,10 +78,133 @@ class Post(BaseModel):
         verbose_name='Категория',
         related_name='posts'
     )
+    comment_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Количество комментариев'
+    )
+    image_variants = models.JSONField(
+        default=list,
+        blank=True,
+        editable=False,
+        verbose_name='Ширины уменьшенных копий фото'
+    )
+    # Ведёт blog.published: публикация и категория опубликованы,
+    # pub_date наступила. Отложенные включает publish_scheduled.
+    is_visible = models.BooleanField(
+        default=False,
+        editable=False,
+        verbose_name='Видна всем'
+    )
 
     class Meta:
         verbose_name = 'публикация'
         verbose_name_plural = 'Публикации'
+        indexes = (
+            # Ленты сортируются по (-pub_date, -id), см. blog.paginators.
+            models.Index(
+                fields=('category', '-pub_date', '-id'),
+                name='post_category_feed_idx',
+            ),
+            models.Index(
+                fields=('author', '-pub_date', '-id'),
+                name='post_author_feed_idx',
+            ),
+            # Очередь отложенных публикаций для планировщика.
+            models.Index(
+                fields=('pub_date',),
+                condition=models.Q(is_published=True, is_visible=False),
+                name='post_scheduled_idx',
+            ),
+        )
+
+    # Меняются отдельными UPDATE (сигналы комментариев, обработчик фото).
+    DENORMALIZED_FIELDS = ('comment_count', 'image_variants')
+
+    def save(self, force_insert=False, force_update=False, using=None,
+             update_fields=None):
+        """Полное сохранение не пишет DENORMALIZED_FIELDS.
+
+        Публикация, прочитанная в начале запроса, иначе затёрла бы
+        счётчик комментариев и копии фото, изменённые параллельно.
+        Эти поля пишутся при создании или если названы в update_fields.
+        """
+        if (update_fields is None and not force_insert
+                and not self._state.adding):
+            update_fields = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.name not in self.DENORMALIZED_FIELDS
+            ]
+        super().save(force_insert=force_insert, force_update=force_update,
+                     using=using, update_fields=update_fields)
+
+
+class PublishedPost(models.Model):
+    """Витрина публичных лент: по строке на каждую публикацию, видимую
+    всем, со всем, что нужно карточке. Ленты читают одну таблицу
+    без JOIN; строки ведёт blog.published.
+    """
+
+    id = models.BigIntegerField(primary_key=True)
+    title = models.CharField(max_length=TEXT_LENGTH)
+    text = models.TextField()
+    pub_date = models.DateTimeField()
+    image = models.CharField(max_length=100, blank=True)
+    image_variants = models.JSONField(default=list)
+    author = models.ForeignKey(
+        User, on_delete=models.DO_NOTHING, db_constraint=False,
+        related_name='+')
+    author_username = models.CharField(max_length=150)
+    category = models.ForeignKey(
+        Category, on_delete=models.DO_NOTHING, db_constraint=False,
+        related_name='+')
+    category_slug = models.SlugField()
+    category_title = models.CharField(max_length=TEXT_LENGTH)
+    location = models.ForeignKey(
+        Location, on_delete=models.DO_NOTHING, db_constraint=False,
+        null=True, related_name='+')
+    # None — места нет или оно снято с публикации.
+    location_name = models.CharField(max_length=TEXT_LENGTH, null=True)
+    comment_count = models.PositiveIntegerField(default=0)
+    # Меняется при каждой записи строки, в том числе через update().
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = 'опубликованная публикация'
+        verbose_name_plural = 'Опубликованные публикации'
+        indexes = (
+            models.Index(
+                fields=('-pub_date', '-id'),
+                name='published_feed_idx',
+            ),
+            models.Index(
+                fields=('category', '-pub_date', '-id'),
+                name='published_category_feed_idx',
+            ),
+            models.Index(
+                fields=('author', '-pub_date', '-id'),
+                name='published_author_feed_idx',
+            ),
+        )
+
+    def as_post(self):
+        """Публикация для шаблонов без обращений к БД"""
+        post = Post(
+            id=self.id, title=self.title, text=self.text,
+            pub_date=self.pub_date, image=self.image,
+            image_variants=self.image_variants,
+            comment_count=self.comment_count, is_published=True,
+            is_visible=True)
+        post.author = User(id=self.author_id, username=self.author_username)
+        post.category = Category(
+            id=self.category_id, slug=self.category_slug,
+            title=self.category_title, is_published=True)
+        if self.location_id is not None:
+            post.location = Location(
+                id=self.location_id, name=self.location_name or '',
+                is_published=self.location_name is not None)
+        return post
 
 
 class Comment(models.Model):
@@ -94,6 +222,12 @@ class Comment(models.Model):
         verbose_name = 'комментарий'
         verbose_name_plural = 'Комментарии'
         ordering = ('created_at',)
+        indexes = (
+            models.Index(
+                fields=('post', 'created_at'),
+                name='comment_post_created_idx',
+            ),
+        )
 
     def __str__(self) -> str:
         return self.text
@@ -0,0 +1,220 @@
+import base64
+import hashlib
+import json
+from collections.abc import Sequence
+
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.paginator import InvalidPage
+from django.db.models import Count, Q
+
+CURSOR_NEXT = 'n'
+CURSOR_PREVIOUS = 'p'
+COUNT_CACHE_PREFIX = 'keyset-count'
+
+
+class InvalidCursor(InvalidPage):
+    pass
+
+
+def encode_cursor(direction, values):
+    """Упаковка позиции в ленте в непрозрачный токен"""
+    raw = json.dumps([direction, *values], separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    """Распаковка токена: направление и значения ключа"""
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        direction, *values = json.loads(base64.urlsafe_b64decode(padded))
+    except (ValueError, TypeError):
+        raise InvalidCursor('Некорректный курсор')
+    if direction not in (CURSOR_NEXT, CURSOR_PREVIOUS):
+        raise InvalidCursor('Некорректное направление курсора')
+    return direction, values
+
+
+class KeysetPaginator:
+    """Постраничный вывод по ключу сортировки (seek-метод).
+
+    Вместо OFFSET следующая страница выбирается условием
+    «строго после последней строки» по полям `ordering`,
+    поэтому глубокие страницы стоят столько же, сколько первая.
+    Последнее поле `ordering` должно быть уникальным.
+    """
+
+    is_keyset = True
+
+    def __init__(self, queryset, per_page,
+                 ordering=('-pub_date', '-id'), count_cache_timeout=None,
+                 count_key=None):
+        self.queryset = queryset
+        self.per_page = int(per_page)
+        self.ordering = tuple(ordering)
+        self.count_cache_timeout = count_cache_timeout
+        self.count_key = count_key
+        self._fields = [
+            (name.lstrip('-'), name.startswith('-'))
+            for name in self.ordering
+        ]
+
+    def get_page(self, cursor=None):
+        """Страница по токену; при ошибке в токене — первая страница"""
+        try:
+            return self.page(cursor)
+        except InvalidCursor:
+            return self.page()
+
+    def page(self, cursor=None):
+        if not cursor:
+            return self._build_page(self._fetch(), first=True)
+        direction, values = decode_cursor(cursor)
+        values = self._to_python(values)
+        if direction == CURSOR_NEXT:
+            rows = self._fetch(values)
+            return self._build_page(rows, first=False)
+        rows = self._fetch(values, backwards=True)
+        if len(rows) <= self.per_page:
+            # До начала ленты меньше страницы — показываем первую целиком.
+            return self.page()
+        rows = rows[:self.per_page]
+        rows.reverse()
+        return KeysetPage(rows, self, has_previous=True, has_next=True)
+
+    @property
+    def approximate_count(self):
+        """Число записей из кэша, обновляемое раз в count_cache_timeout.
+
+        Ключ — count_key, постоянное имя ленты (представление и его
+        фильтры): текст SQL не годится, в нём есть текущее время.
+        """
+        if self.count_cache_timeout is None or self.count_key is None:
+            return None
+        key_hash = hashlib.md5(repr(self.count_key).encode()).hexdigest()
+        return cache.get_or_set(
+            f'{COUNT_CACHE_PREFIX}:{key_hash}',
+            self.queryset.count,
+            self.count_cache_timeout)
+
+    @property
+    def approximate_num_pages(self):
+        count = self.approximate_count
+        if count is None:
+            return None
+        return max(1, -(-count // self.per_page))
+
+    def position(self, obj):
+        return [self._serialize(getattr(obj, name))
+                for name, _ in self._fields]
+
+    def page_aggregate(self, cursor=None, **aggregates):
+        """Агрегаты по строкам страницы get_page(cursor) одним запросом,
+        без выборки самих строк.
+
+        Срез тот же, что у страницы, со строкой-соседом, от которой
+        зависит has_next; rows — число строк среза.
+        """
+        aggregates['rows'] = Count('pk')
+        try:
+            return self._page_aggregate(cursor, aggregates)
+        except InvalidCursor:
+            return self._page_aggregate(None, aggregates)
+
+    def _page_aggregate(self, cursor, aggregates):
+        if not cursor:
+            return self._slice().aggregate(**aggregates)
+        direction, values = decode_cursor(cursor)
+        values = self._to_python(values)
+        if direction == CURSOR_NEXT:
+            return self._slice(values).aggregate(**aggregates)
+        result = self._slice(values, backwards=True).aggregate(**aggregates)
+        if result['rows'] <= self.per_page:
+            # Как и page(): вместо неполной страницы — первая.
+            return self._page_aggregate(None, aggregates)
+        return result
+
+    def _fetch(self, values=None, backwards=False):
+        return list(self._slice(values, backwards))
+
+    def _slice(self, values=None, backwards=False):
+        queryset = self.queryset
+        if values is not None:
+            queryset = queryset.filter(self._seek(values, backwards))
+        ordering = [
+            ('-' if descending != backwards else '') + name
+            for name, descending in self._fields
+        ]
+        return queryset.order_by(*ordering)[:self.per_page + 1]
+
+    def _seek(self, values, backwards):
+        """Условие «строго после позиции» для составного ключа"""
+        condition = Q()
+        equal = {}
+        for (name, descending), value in zip(self._fields, values):
+            lookup = 'lt' if descending != backwards else 'gt'
+            condition |= Q(**equal, **{f'{name}__{lookup}': value})
+            equal[name] = value
+        return condition
+
+    def _build_page(self, rows, first):
+        has_next = len(rows) > self.per_page
+        return KeysetPage(rows[:self.per_page], self,
+                          has_previous=not first, has_next=has_next)
+
+    def _to_python(self, values):
+        if len(values) != len(self._fields):
+            raise InvalidCursor('Некорректная длина курсора')
+        opts = self.queryset.model._meta
+        try:
+            return [opts.get_field(name).to_python(value)
+                    for (name, _), value in zip(self._fields, values)]
+        except ValidationError:
+            raise InvalidCursor('Некорректные значения курсора')
+
+    @staticmethod
+    def _serialize(value):
+        if hasattr(value, 'isoformat'):
+            return value.isoformat()
+        return value
+
+
+class KeysetPage(Sequence):
+
+    def __init__(self, object_list, paginator, has_previous, has_next):
+        self.object_list = object_list
+        self.paginator = paginator
+        self._has_previous = has_previous
+        self._has_next = has_next
+
+    def __repr__(self):
+        return f'<KeysetPage of {len(self.object_list)} objects>'
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self._has_next or self._has_previous
+
+    @property
+    def next_cursor(self):
+        if not self._has_next or not self.object_list:
+            return None
+        return encode_cursor(
+            CURSOR_NEXT, self.paginator.position(self.object_list[-1]))
+
+    @property
+    def previous_cursor(self):
+        if not self._has_previous or not self.object_list:
+            return None
+        return encode_cursor(
+            CURSOR_PREVIOUS, self.paginator.position(self.object_list[0]))
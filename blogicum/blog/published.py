@@ -0,0 +1,150 @@
+"""Ведение видимости публикаций и витрины PublishedPost.
+
+Публикация видна всем, когда она и её категория опубликованы, а
+pub_date уже наступила. Правило вычисляется только здесь и хранится
+в Post.is_visible и в строках PublishedPost, так что представлениям
+не нужно сравнивать pub_date с текущим временем.
+
+Сигналы из blog.signals пересобирают строки при изменении публикаций
+и категорий и точечно обновляют денормализованные поля мест, авторов
+и счётчик комментариев. Отложенные публикации включает
+publish_due_posts — командой publish_scheduled или задачей
+promote_post в момент pub_date — и сообщает о них сигналом
+posts_published.
+"""
+from django.db import transaction
+from django.db.models import F
+from django.dispatch import Signal
+from django.utils import timezone
+
+from .models import Post, PublishedPost
+
+BATCH_SIZE = 500
+
+# Отложенные публикации стали видны: sender=Post, post_ids.
+posts_published = Signal()
+
+
+def visible_posts(now=None):
+    """Публикации, видимые всем на момент now"""
+    return Post.objects.filter(
+        is_published=True,
+        category__is_published=True,
+        pub_date__lte=now or timezone.now())
+
+
+def published_row(post):
+    """Строка витрины из публикации с автором, категорией и местом"""
+    location = post.location
+    return PublishedPost(
+        id=post.id,
+        title=post.title,
+        text=post.text,
+        pub_date=post.pub_date,
+        image=post.image.name or '',
+        image_variants=post.image_variants,
+        author_id=post.author_id,
+        author_username=post.author.username,
+        category_id=post.category_id,
+        category_slug=post.category.slug,
+        category_title=post.category.title,
+        location_id=post.location_id,
+        location_name=(location.name if location is not None
+                       and location.is_published else None),
+        comment_count=post.comment_count,
+    )
+
+
+def sync_posts(post_ids, now=None):
+    """Пересчитать видимость post_ids и их строки витрины.
+
+    Возвращает id публикаций, оказавшихся видимыми.
+    """
+    post_ids = list(post_ids)
+    visible = []
+    for start in range(0, len(post_ids), BATCH_SIZE):
+        batch = post_ids[start:start + BATCH_SIZE]
+        rows = [
+            published_row(post)
+            for post in visible_posts(now).filter(pk__in=batch)
+            .select_related('author', 'category', 'location')
+        ]
+        visible_ids = [row.pk for row in rows]
+        with transaction.atomic():
+            Post.objects.filter(pk__in=visible_ids, is_visible=False).update(
+                is_visible=True)
+            Post.objects.filter(pk__in=batch, is_visible=True).exclude(
+                pk__in=visible_ids).update(is_visible=False)
+            PublishedPost.objects.filter(pk__in=batch).delete()
+            PublishedPost.objects.bulk_create(rows)
+        visible.extend(visible_ids)
+    return visible
+
+
+def sync_matching(**filters):
+    """Пересобрать строки всех публикаций, подходящих под filters"""
+    post_ids = Post.objects.filter(**filters).order_by('pk').values_list(
+        'pk', flat=True)
+    return sync_posts(post_ids.iterator(chunk_size=BATCH_SIZE))
+
+
+def due_posts(now=None):
+    """Отложенные публикации, чья pub_date наступила"""
+    return visible_posts(now).filter(is_visible=False)
+
+
+def publish_due_posts(now=None):
+    """Включить наступившие отложенные публикации; возвращает их id"""
+    now = now or timezone.now()
+    post_ids = sync_posts(
+        due_posts(now).order_by('pk').values_list('pk', flat=True), now)
+    if post_ids:
+        posts_published.send(sender=Post, post_ids=post_ids)
+    return post_ids
+
+
+def seconds_until_next(now=None, limit=None):
+    """Секунд до ближайшей отложенной публикации, не больше limit"""
+    now = now or timezone.now()
+    next_pub_date = Post.objects.filter(
+        is_published=True, is_visible=False, pub_date__gt=now,
+    ).order_by('pub_date').values_list('pub_date', flat=True).first()
+    if next_pub_date is None:
+        return limit
+    seconds = (next_pub_date - now).total_seconds()
+    return seconds if limit is None else min(limit, seconds)
+
+
+def rebuild(now=None):
+    """Видимость и витрина целиком заново; возвращает число видимых"""
+    with transaction.atomic():
+        PublishedPost.objects.all().delete()
+        return len(sync_posts(
+            Post.objects.order_by('pk').values_list('pk', flat=True), now))
+
+
+def update_location(location):
+    PublishedPost.objects.filter(location_id=location.pk).update(
+        location_name=location.name if location.is_published else None,
+        updated_at=timezone.now())
+
+
+def forget_location(location_id):
+    """Место удалено: у публикаций оно обнулено через SET NULL"""
+    PublishedPost.objects.filter(location_id=location_id).update(
+        location=None, location_name=None, updated_at=timezone.now())
+
+
+def update_author(user):
+    """Новое имя автора; вход пользователя строки не трогает"""
+    PublishedPost.objects.filter(author_id=user.pk).exclude(
+        author_username=user.username).update(
+        author_username=user.username, updated_at=timezone.now())
+
+
+def change_comment_count(post_id, delta):
+    rows = PublishedPost.objects.filter(pk=post_id)
+    if delta < 0:
+        rows = rows.filter(comment_count__gte=-delta)
+    rows.update(comment_count=F('comment_count') + delta,
+                updated_at=timezone.now())
@@ -0,0 +1,95 @@
+"""Чтение лент и публикаций с реплики.
+
+Представления, помеченные @read_from_replica, читают с одной из
+DATABASE_REPLICAS; всё остальное, в том числе любая запись, идёт в
+default. После POST и других изменяющих запросов
+PrimaryStickinessMiddleware ставит cookie, и ещё
+REPLICA_STICKY_SECONDS читатель видит основную базу — собственный
+комментарий не пропадёт из-за отставания реплики.
+
+Любое изменение сбрасывает кэш страниц и меняет версии карточек, и
+следующий рендер кладёт HTML уже под новые ключи. Поэтому
+REPLICA_LAG_SECONDS после сброса все читают основную базу: иначе в
+кэш под новой меткой попали бы данные отстающей реплики.
+"""
+import asyncio
+import random
+from contextvars import ContextVar
+from functools import wraps
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+from django.utils.deprecation import MiddlewareMixin
+
+from .cache import purged_within
+
+STICKY_COOKIE = 'use_primary'
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+_read_alias = ContextVar('read_alias', default=None)
+
+
+class ReplicaRouter:
+
+    def db_for_read(self, model, **hints):
+        instance = hints.get('instance')
+        if instance is not None and instance._state.db:
+            return instance._state.db
+        return _read_alias.get() or DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Реплики получают схему вместе с данными от основной базы.
+        return db not in settings.DATABASE_REPLICAS
+
+
+def replica_for(request):
+    """Алиас реплики для запроса или None, если читать с основной"""
+    if (not settings.DATABASE_REPLICAS
+            or request.method not in SAFE_METHODS
+            or STICKY_COOKIE in request.COOKIES
+            or purged_within(settings.REPLICA_LAG_SECONDS)):
+        return None
+    return random.choice(settings.DATABASE_REPLICAS)
+
+
+def read_from_replica(view):
+    """Чтения представления — с реплики (подходит и для async)"""
+    if asyncio.iscoroutinefunction(view):
+        @wraps(view)
+        async def async_wrapper(request, *args, **kwargs):
+            token = _read_alias.set(replica_for(request))
+            try:
+                return await view(request, *args, **kwargs)
+            finally:
+                _read_alias.reset(token)
+
+        return async_wrapper
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        token = _read_alias.set(replica_for(request))
+        try:
+            return view(request, *args, **kwargs)
+        finally:
+            _read_alias.reset(token)
+
+    return wrapper
+
+
+class PrimaryStickinessMiddleware(MiddlewareMixin):
+    """После изменяющего запроса — cookie «читать с основной базы»"""
+
+    def process_response(self, request, response):
+        if (settings.DATABASE_REPLICAS
+                and request.method not in SAFE_METHODS):
+            response.set_cookie(
+                STICKY_COOKIE, '1',
+                max_age=settings.REPLICA_STICKY_SECONDS,
+                httponly=True, samesite='Lax')
+        return response
@@ -0,0 +1,206 @@
+"""Полнотекстовый поиск по заголовкам и текстам публикаций.
+
+SQLite: виртуальная таблица FTS5 blog_post_fts. Русского стеммера у
+FTS5 нет, поэтому слова сводятся к основам snowball-стеммером здесь,
+а запрос проходит тот же путь. PostgreSQL: таблица blog_post_search с
+tsvector по конфигурации 'russian' и GIN-индексом.
+
+Индекс покрывает все публикации и обновляется сигналами Post.
+Видимость даёт витрина PublishedPost, с которой соединяется
+результат, поэтому поиск показывает ровно то, что и ленты.
+Найденное сортируется как лента, по (pub_date, id), и листается
+тем же курсором.
+"""
+import re
+from functools import lru_cache
+
+import snowballstemmer
+from django.db import NotSupportedError, connections, router, transaction
+from django.db.models import BooleanField, Q
+from django.db.models.expressions import RawSQL
+
+from .models import Post, PublishedPost
+
+WORD = re.compile(r'\w+')
+MAX_QUERY_WORDS = 16
+BATCH_SIZE = 1000
+# С какого числа совпадений SQLite выгоднее идти по индексу ленты и
+# проверять каждую строку в FTS, чем собирать все совпадения в IN.
+DENSE_MATCHES = 5000
+
+_stemmer = snowballstemmer.stemmer('russian')
+
+
+@lru_cache(maxsize=100_000)
+def stem(word):
+    return _stemmer.stemWord(word)
+
+
+def stems(text):
+    """Основы слов текста: нижний регистр, ё как е"""
+    return [stem(word)
+            for word in WORD.findall(text.lower().replace('ё', 'е'))]
+
+
+class SQLiteSearch:
+    table = 'blog_post_fts'
+
+    def create(self, cursor):
+        cursor.execute(
+            f'CREATE VIRTUAL TABLE IF NOT EXISTS {self.table} USING '
+            "fts5(body, tokenize='unicode61 remove_diacritics 2')")
+
+    def drop(self, cursor):
+        cursor.execute(f'DROP TABLE IF EXISTS {self.table}')
+
+    def index(self, cursor, posts):
+        """Индексирует posts — кортежи (id, title, text)"""
+        posts = list(posts)
+        self.remove(cursor, [pk for pk, _, _ in posts])
+        self.insert(cursor, posts)
+
+    def insert(self, cursor, posts):
+        """Только добавление: публикаций ещё нет в индексе"""
+        cursor.executemany(
+            f'INSERT INTO {self.table} (rowid, body) VALUES (%s, %s)',
+            [(pk, ' '.join(stems(f'{title} {text}')))
+             for pk, title, text in posts])
+
+    def remove(self, cursor, post_ids):
+        cursor.executemany(
+            f'DELETE FROM {self.table} WHERE rowid = %s',
+            [(pk,) for pk in post_ids])
+
+    def condition(self, cursor, query):
+        """Условие на PublishedPost или None, если искать нечего.
+
+        Редкие слова: id совпадений собираются в IN, их немного.
+        Частые: страницу дают первые строки индекса ленты, каждая
+        проверяется в FTS по rowid, и все совпадения не читаются.
+        """
+        words = stems(query)[:MAX_QUERY_WORDS]
+        if not words:
+            return None
+        # Слова из \w+ не содержат кавычек; в кавычках они не станут
+        # операторами FTS5. Пробел между ними — AND.
+        expression = ' '.join(f'"{word}"' for word in words)
+        cursor.execute(
+            f'SELECT count(*) FROM (SELECT 1 FROM {self.table} '
+            f'WHERE {self.table} MATCH %s LIMIT %s)',
+            [expression, DENSE_MATCHES])
+        if cursor.fetchone()[0] < DENSE_MATCHES:
+            return Q(id__in=RawSQL(
+                f'SELECT rowid FROM {self.table} '
+                f'WHERE {self.table} MATCH %s', [expression]))
+        return RawSQL(
+            f'EXISTS (SELECT 1 FROM {self.table} '
+            f'WHERE {self.table} MATCH %s '
+            f'AND {self.table}.rowid = {PublishedPost._meta.db_table}.id)',
+            [expression], output_field=BooleanField())
+
+
+class PostgresSearch:
+    table = 'blog_post_search'
+    config = 'russian'
+
+    def create(self, cursor):
+        cursor.execute(
+            f'CREATE TABLE IF NOT EXISTS {self.table} ('
+            'post_id bigint PRIMARY KEY, document tsvector NOT NULL)')
+        cursor.execute(
+            f'CREATE INDEX IF NOT EXISTS {self.table}_document_idx '
+            f'ON {self.table} USING gin (document)')
+
+    def drop(self, cursor):
+        cursor.execute(f'DROP TABLE IF EXISTS {self.table}')
+
+    def index(self, cursor, posts):
+        cursor.executemany(
+            f'INSERT INTO {self.table} (post_id, document) '
+            f"VALUES (%s, to_tsvector('{self.config}', %s)) "
+            'ON CONFLICT (post_id) DO UPDATE '
+            'SET document = EXCLUDED.document',
+            [(pk, f'{title} {text}') for pk, title, text in posts])
+
+    insert = index
+
+    def remove(self, cursor, post_ids):
+        cursor.execute(
+            f'DELETE FROM {self.table} WHERE post_id = ANY(%s)',
+            [list(post_ids)])
+
+    def condition(self, cursor, query):
+        # Выбор между GIN и индексом ленты делает планировщик.
+        if not WORD.search(query):
+            return None
+        return Q(id__in=RawSQL(
+            f'SELECT post_id FROM {self.table} '
+            f"WHERE document @@ plainto_tsquery('{self.config}', %s)",
+            [query]))
+
+
+BACKENDS = {
+    'sqlite': SQLiteSearch,
+    'postgresql': PostgresSearch,
+}
+
+
+def backend_for(connection):
+    try:
+        return BACKENDS[connection.vendor]()
+    except KeyError:
+        raise NotSupportedError(
+            f'Поиск не поддерживает {connection.vendor}') from None
+
+
+def _write_connection():
+    return connections[router.db_for_write(Post)]
+
+
+def index_posts(posts):
+    """Переиндексировать публикации (экземпляры Post)"""
+    connection = _write_connection()
+    with connection.cursor() as cursor:
+        backend_for(connection).index(
+            cursor, [(post.pk, post.title, post.text) for post in posts])
+
+
+def remove_posts(post_ids):
+    connection = _write_connection()
+    with connection.cursor() as cursor:
+        backend_for(connection).remove(cursor, post_ids)
+
+
+def rebuild(connection=None, posts=None):
+    """Индекс заново по posts (по умолчанию — все Post);
+    возвращает число публикаций
+    """
+    connection = connection or _write_connection()
+    if posts is None:
+        posts = Post.objects.using(connection.alias)
+    backend = backend_for(connection)
+    total = 0
+    with transaction.atomic(using=connection.alias), \
+            connection.cursor() as cursor:
+        backend.drop(cursor)
+        backend.create(cursor)
+        batch = []
+        for row in posts.order_by('pk').values_list(
+                'pk', 'title', 'text').iterator(chunk_size=BATCH_SIZE):
+            batch.append(row)
+            if len(batch) == BATCH_SIZE:
+                backend.insert(cursor, batch)
+                total += len(batch)
+                batch = []
+        backend.insert(cursor, batch)
+    return total + len(batch)
+
+
+def search_posts(query):
+    """Видимые публикации (строки PublishedPost) по запросу"""
+    connection = connections[router.db_for_read(PublishedPost)]
+    with connection.cursor() as cursor:
+        condition = backend_for(connection).condition(cursor, query)
+    if condition is None:
+        return PublishedPost.objects.none()
+    return PublishedPost.objects.filter(condition)
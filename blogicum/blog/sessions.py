@@ -0,0 +1,111 @@
+"""Сессии в подписанной cookie, крупные — в кэше и БД.
+
+Пока подписанные данные сессии укладываются в
+SESSION_COOKIE_DATA_LIMIT байт, они целиком живут в cookie, и
+django_session не читается и не пишется: ни на каждом запросе
+вошедшего пользователя, ни при входе. Крупная сессия переезжает в
+cached_db — cookie несёт обычный ключ, данные читаются из кэша
+SESSION_CACHE_ALIAS и только при промахе из БД. Старые ключи без
+префикса по-прежнему читаются из django_session.
+
+Загрузка ленивая, как в SessionBase: без cookie сессии нет и
+обращений к хранилищу. Запись пропускается, если данные не
+изменились с загрузки, — повторное присваивание тех же значений не
+трогает ни cookie, ни базу.
+
+Cookie подписана, но не зашифрована и не отзывается на сервере:
+выход удаляет её у браузера, а смена пароля делает её недействительной
+через хэш сессии django.contrib.auth.
+"""
+from django.conf import settings
+from django.contrib.sessions.backends.cached_db import (
+    SessionStore as CachedDBStore,
+)
+from django.core import signing
+
+COOKIE_PREFIX = 'c:'
+COOKIE_SALT = 'blog.sessions'
+DEFAULT_COOKIE_DATA_LIMIT = 2048
+
+
+def in_cookie(session_key):
+    return bool(session_key) and session_key.startswith(COOKIE_PREFIX)
+
+
+class SessionStore(CachedDBStore):
+
+    def __init__(self, session_key=None):
+        super().__init__(session_key)
+        self._stored = None
+
+    def _serialize(self, data):
+        return self.serializer().dumps(data)
+
+    def _signed(self, data):
+        return COOKIE_PREFIX + signing.dumps(
+            data, compress=True, salt=COOKIE_SALT,
+            serializer=self.serializer)
+
+    def load(self):
+        session_key = self.session_key
+        if not in_cookie(session_key):
+            data = super().load()
+        else:
+            try:
+                data = signing.loads(
+                    session_key[len(COOKIE_PREFIX):], salt=COOKIE_SALT,
+                    serializer=self.serializer,
+                    max_age=self.get_session_cookie_age())
+            except Exception:
+                # Подпись, сжатие или JSON не сошлись — новая сессия.
+                self._session_key = None
+                data = {}
+        self._stored = self._serialize(data) if self.session_key else None
+        return data
+
+    def save(self, must_create=False):
+        data = self._get_session(no_load=must_create)
+        serialized = self._serialize(data)
+        if not must_create and self.session_key and (
+                serialized == self._stored):
+            return
+        signed = self._signed(data)
+        limit = getattr(settings, 'SESSION_COOKIE_DATA_LIMIT',
+                        DEFAULT_COOKIE_DATA_LIMIT)
+        if len(signed) <= limit:
+            if self.session_key and not in_cookie(self.session_key):
+                super().delete(self.session_key)
+            self._session_key = signed
+        else:
+            if in_cookie(self.session_key):
+                self._session_key = None
+            super().save(must_create)
+        self._stored = serialized
+        self.modified = True
+
+    def exists(self, session_key):
+        if in_cookie(session_key):
+            return False
+        return super().exists(session_key)
+
+    def delete(self, session_key=None):
+        if session_key is None:
+            session_key = self.session_key
+        if session_key and not in_cookie(session_key):
+            super().delete(session_key)
+        if session_key == self.session_key:
+            self._session_key = ''
+            self._session_cache = {}
+            self._stored = None
+            self.modified = True
+
+    def cycle_key(self):
+        """Новый ключ без записи: он появится при сохранении"""
+        data = self._session
+        session_key = self.session_key
+        if session_key and not in_cookie(session_key):
+            super().delete(session_key)
+        self._session_key = None
+        self._session_cache = data
+        self._stored = None
+        self.modified = True
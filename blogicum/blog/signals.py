@@ -0,0 +1,176 @@
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from . import published, search
+from .cache import bump_version, purge_pages
+from .models import Category, Comment, Location, Post, PublishedPost
+from .published import posts_published
+from .tasks import promote_post
+
+User = get_user_model()
+
+# Публикации, записанные loaddata: витрина для них собирается после коммита.
+_loaded_post_ids = set()
+
+
+@receiver(post_save, sender=Comment)
+def increment_comment_count(sender, instance, created, raw=False, **kwargs):
+    """Новый комментарий увеличивает счётчик публикации"""
+    if created and not raw:
+        Post.objects.filter(pk=instance.post_id).update(
+            comment_count=F('comment_count') + 1, updated_at=timezone.now())
+        published.change_comment_count(instance.post_id, 1)
+
+
+@receiver(post_delete, sender=Comment)
+def decrement_comment_count(sender, instance, **kwargs):
+    """Удаление комментария (и из админки) уменьшает счётчик"""
+    Post.objects.filter(pk=instance.post_id, comment_count__gt=0).update(
+        comment_count=F('comment_count') - 1, updated_at=timezone.now())
+    published.change_comment_count(instance.post_id, -1)
+
+
+@receiver(post_save, sender=Comment)
+def touch_commented_post(sender, instance, created, raw=False, **kwargs):
+    """Правка комментария меняет страницу публикации: у Comment нет
+    своей отметки изменения, поэтому сдвигается Post.updated_at
+    """
+    if not created and not raw:
+        Post.objects.filter(pk=instance.post_id).update(
+            updated_at=timezone.now())
+
+
+@receiver(post_save, sender=Post)
+def sync_published_post(sender, instance, raw=False, update_fields=None,
+                        **kwargs):
+    """Строка витрины публикации; отложенную поднимет задача"""
+    if raw:
+        _loaded_post_ids.add(instance.pk)
+        transaction.on_commit(sync_loaded_posts)
+        return
+    published.sync_posts([instance.pk])
+    if update_fields is not None and not (
+            {'pub_date', 'is_published'} & set(update_fields)):
+        return
+    if instance.is_published and instance.pub_date > timezone.now():
+        promote_post.schedule(instance.pub_date, instance.pk)
+
+
+def sync_loaded_posts():
+    """Видимость и витрина публикаций из фикстуры — после коммита, когда
+    их категории, места и авторы уже в базе
+    """
+    post_ids = sorted(_loaded_post_ids)
+    _loaded_post_ids.clear()
+    if post_ids:
+        published.sync_posts(post_ids)
+        purge_pages()
+
+
+@receiver(post_delete, sender=Post)
+def forget_published_post(sender, instance, **kwargs):
+    PublishedPost.objects.filter(pk=instance.pk).delete()
+
+
+@receiver(post_save, sender=Category)
+def sync_published_category(sender, instance, raw=False, **kwargs):
+    """Снятие с публикации, slug и заголовок — у всех публикаций
+    категории
+    """
+    if not raw:
+        published.sync_matching(category_id=instance.pk)
+
+
+@receiver(post_delete, sender=Category)
+def forget_published_category(sender, instance, **kwargs):
+    PublishedPost.objects.filter(category_id=instance.pk).delete()
+
+
+@receiver(post_save, sender=Location)
+def sync_published_location(sender, instance, raw=False, **kwargs):
+    if not raw:
+        published.update_location(instance)
+
+
+@receiver(post_delete, sender=Location)
+def forget_published_location(sender, instance, **kwargs):
+    published.forget_location(instance.pk)
+
+
+def only_login(update_fields):
+    """Сохранение при входе: меняется только last_login"""
+    return update_fields is not None and set(update_fields) <= {'last_login'}
+
+
+@receiver(post_save, sender=User)
+def sync_published_author(sender, instance, raw=False, update_fields=None,
+                          **kwargs):
+    if not raw and not only_login(update_fields):
+        published.update_author(instance)
+
+
+@receiver(post_save, sender=Post)
+def index_post_text(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and not (
+            {'title', 'text'} & set(update_fields)):
+        return
+    search.index_posts([instance])
+
+
+@receiver(post_delete, sender=Post)
+def remove_post_text(sender, instance, **kwargs):
+    search.remove_posts([instance.pk])
+
+
+def invalidate_on_commit(kind, pk):
+    """Сброс сразу и повторно после коммита: карточку, собранную
+    параллельным запросом из ещё не закоммиченных данных, не вернуть
+    """
+    def invalidate():
+        bump_version(kind, pk)
+        purge_pages()
+
+    invalidate()
+    transaction.on_commit(invalidate)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def invalidate_post_card(sender, instance, **kwargs):
+    invalidate_on_commit('post', instance.pk)
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def invalidate_post_card_comments(sender, instance, **kwargs):
+    """Карточка показывает число комментариев"""
+    invalidate_on_commit('post', instance.post_id)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_category_cards(sender, instance, **kwargs):
+    invalidate_on_commit('category', instance.pk)
+
+
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+def invalidate_location_cards(sender, instance, **kwargs):
+    invalidate_on_commit('location', instance.pk)
+
+
+@receiver(post_save, sender=User)
+def invalidate_author_cards(sender, instance, update_fields=None, **kwargs):
+    """Карточка показывает имя автора; вход его не меняет"""
+    if not only_login(update_fields):
+        invalidate_on_commit('author', instance.pk)
+
+
+@receiver(posts_published)
+def purge_pages_on_publish(sender, post_ids, **kwargs):
+    """Карточки новых публикаций не менялись, меняются ленты"""
+    purge_pages()
@@ -0,0 +1,25 @@
+from jobs.queue import task
+
+from .images import update_image_variants
+from .models import Post
+from .published import publish_due_posts
+
+
+@task
+def build_post_image_variants(post_id, image_name):
+    """Уменьшенные копии фото; устаревшая задача ничего не делает"""
+    post = Post.objects.filter(pk=post_id).first()
+    if post is None or post.image.name != image_name:
+        return
+    update_image_variants(post)
+
+
+@task
+def promote_post(post_id):
+    """Отложенная публикация появляется в лентах в момент pub_date.
+
+    Задача ставится на pub_date при каждом сохранении и включает все
+    наступившие публикации, как и команда publish_scheduled; если дату
+    перенесли, ранняя задача ничего не добавит.
+    """
+    publish_due_posts()
@@ -0,0 +1,30 @@
+from django import template
+
+from blog.cache import render_post_cards
+from blog.fasturls import UrlBuilder
+from blog.images import image_sources
+
+register = template.Library()
+
+URL_BUILDER_KEY = 'blog_tags.url_builder'
+
+
+@register.simple_tag
+def cached_post_cards(posts):
+    """Карточки публикаций страницы из кэша фрагментов"""
+    return render_post_cards(posts)
+
+
+@register.inclusion_tag('includes/post_picture.html')
+def post_picture(post, preset='card'):
+    """Фото публикации: уменьшенные копии через srcset, если они есть"""
+    return {'post': post, 'picture': image_sources(post, preset)}
+
+
+@register.simple_tag(takes_context=True)
+def fast_url(context, viewname, *args, **kwargs):
+    """{% url %} по скомпилированным маршрутам blog.fasturls"""
+    urls = context.render_context.get(URL_BUILDER_KEY)
+    if urls is None:
+        urls = context.render_context[URL_BUILDER_KEY] = UrlBuilder()
+    return urls.reverse(viewname, args, kwargs)
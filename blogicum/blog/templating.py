@@ -0,0 +1,60 @@
+"""Прогрев кэширующего загрузчика шаблонов.
+
+С BLOGICUM_TEMPLATE_CACHE=1 шаблоны грузит django.template.loaders.
+cached.Loader: каждый компилируется один раз на процесс. warm_up
+вызывается из wsgi.py и asgi.py и компилирует заранее все шаблоны из
+каталогов DIRS, чтобы первые запросы воркера не платили за разбор
+base.html, карточек и тегов django_bootstrap5.
+"""
+import logging
+import time
+from pathlib import Path
+
+from django.template import TemplateDoesNotExist, TemplateSyntaxError
+from django.template import engines
+from django.template.backends.django import DjangoTemplates
+from django.template.loaders.cached import Loader as CachedLoader
+
+logger = logging.getLogger(__name__)
+
+TEMPLATE_SUFFIXES = ('.html', '.txt')
+
+
+def template_names(directories):
+    """Имена шаблонов из каталогов относительно каталога"""
+    for directory in map(Path, directories):
+        for path in sorted(directory.rglob('*')):
+            if path.is_file() and path.suffix in TEMPLATE_SUFFIXES:
+                yield path.relative_to(directory).as_posix()
+
+
+def is_cached(engine):
+    return any(isinstance(loader, CachedLoader)
+               for loader in engine.template_loaders)
+
+
+def warm_up():
+    """Скомпилировать шаблоны в кэш загрузчика; возвращает их число.
+
+    Без кэширующего загрузчика ничего не делает. Шаблон с ошибкой
+    пишется в лог и не мешает прогреву остальных.
+    """
+    start = time.perf_counter()
+    compiled = 0
+    for backend in engines.all():
+        if not isinstance(backend, DjangoTemplates):
+            continue
+        engine = backend.engine
+        if not is_cached(engine):
+            continue
+        for name in template_names(engine.dirs):
+            try:
+                engine.get_template(name)
+            except (TemplateDoesNotExist, TemplateSyntaxError):
+                logger.exception('Шаблон %s не скомпилирован', name)
+                continue
+            compiled += 1
+    if compiled:
+        logger.info('Скомпилировано шаблонов: %d за %.0f мс', compiled,
+                    (time.perf_counter() - start) * 1000)
+    return compiled
@@ -0,0 +1,411 @@
+"""Потоковый импорт и экспорт содержимого блога.
+
+Форматы: JSON Lines — один поток, строка на объект вида
+{"model": "post", "id": 1, ...}, модели идут в порядке зависимостей;
+CSV — каталог с файлами category.csv, location.csv, post.csv,
+comment.csv. Авторы передаются по username.
+
+Импорт читает поток построчно и пишет пачками bulk_create, каждая
+пачка — своя транзакция, поэтому память не зависит от объёма.
+Внешние ключи переводятся картами id: категории сопоставляются по
+slug (существующие обновляются bulk_update), новым категориям, местам,
+публикациям и комментариям достаются id со сдвигом на занятые в этой
+базе. Ссылка на место или публикацию, которых нет в файле, —
+TransferError. Витрина лент, поисковый индекс, счётчики комментариев,
+версии карточек и задачи отложенных публикаций обновляются по каждой
+пачке: массовые запросы не отправляют сигналов.
+"""
+import csv
+import json
+import time
+from collections import Counter, defaultdict
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.color import no_style
+from django.db import connection, reset_queries, transaction
+from django.db.models import F, Max
+from django.utils import timezone
+
+from . import published, search
+from .cache import bump_version, purge_pages
+from .models import Category, Comment, Location, Post, PublishedPost
+from .tasks import promote_post
+
+User = get_user_model()
+
+MODELS = {
+    'category': Category,
+    'location': Location,
+    'post': Post,
+    'comment': Comment,
+}
+# Поле файла → выражение для values_list при экспорте.
+FIELDS = {
+    'category': {
+        'id': 'id', 'title': 'title', 'description': 'description',
+        'slug': 'slug', 'is_published': 'is_published',
+        'created_at': 'created_at',
+    },
+    'location': {
+        'id': 'id', 'name': 'name', 'is_published': 'is_published',
+        'created_at': 'created_at',
+    },
+    'post': {
+        'id': 'id', 'title': 'title', 'text': 'text',
+        'pub_date': 'pub_date', 'image': 'image',
+        'author': 'author__username', 'location': 'location_id',
+        'category': 'category_id', 'is_published': 'is_published',
+        'created_at': 'created_at',
+    },
+    'comment': {
+        'id': 'id', 'post': 'post_id', 'author': 'author__username',
+        'text': 'text', 'created_at': 'created_at',
+    },
+}
+DEFAULT_BATCH_SIZE = 1000
+
+
+class TransferError(Exception):
+    pass
+
+
+class Stats:
+    """Строки и скорость по моделям"""
+
+    def __init__(self):
+        self.rows = Counter()
+        self.seconds = Counter()
+
+    def add(self, model_name, rows, seconds):
+        self.rows[model_name] += rows
+        self.seconds[model_name] += seconds
+
+    def lines(self):
+        for model_name in MODELS:
+            if model_name in self.rows:
+                rows = self.rows[model_name]
+                seconds = self.seconds[model_name]
+                rate = rows / seconds if seconds else 0
+                yield (f'{model_name}: {rows} строк за {seconds:.1f} с '
+                       f'({rate:.0f} строк/с)')
+
+
+def _serialize(value):
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return value
+
+
+def export_rows(model_name, batch_size=DEFAULT_BATCH_SIZE):
+    """Строки модели словарями, потоком по batch_size"""
+    fields = FIELDS[model_name]
+    rows = MODELS[model_name].objects.order_by('pk').values_list(
+        *fields.values()).iterator(chunk_size=batch_size)
+    for values in rows:
+        yield dict(zip(fields, map(_serialize, values)))
+
+
+class JsonLinesWriter:
+
+    def __init__(self, stream):
+        self.stream = stream
+
+    def write(self, model_name, row):
+        self.stream.write(
+            json.dumps({'model': model_name, **row}, ensure_ascii=False))
+        self.stream.write('\n')
+
+    def close(self):
+        pass
+
+
+class CsvWriter:
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.files = {}
+        self.writers = {}
+
+    def write(self, model_name, row):
+        if model_name not in self.writers:
+            file = open(self.directory / f'{model_name}.csv', 'w',
+                        encoding='utf-8', newline='')
+            self.files[model_name] = file
+            self.writers[model_name] = csv.DictWriter(
+                file, fieldnames=list(FIELDS[model_name]))
+            self.writers[model_name].writeheader()
+        self.writers[model_name].writerow(row)
+
+    def close(self):
+        for file in self.files.values():
+            file.close()
+
+
+def export(writer, model_names=tuple(MODELS),
+           batch_size=DEFAULT_BATCH_SIZE):
+    stats = Stats()
+    for model_name in MODELS:
+        if model_name not in model_names:
+            continue
+        started = time.perf_counter()
+        rows = 0
+        for row in export_rows(model_name, batch_size):
+            writer.write(model_name, row)
+            rows += 1
+        stats.add(model_name, rows, time.perf_counter() - started)
+    writer.close()
+    return stats
+
+
+def read_jsonl(stream):
+    for line_number, line in enumerate(stream, 1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+            model_name = row.pop('model')
+        except (ValueError, KeyError):
+            raise TransferError(
+                f'строка {line_number}: не объект JSON с полем model'
+            ) from None
+        yield model_name, row
+
+
+def read_csv(directory):
+    directory = Path(directory)
+    for model_name in MODELS:
+        path = directory / f'{model_name}.csv'
+        if not path.exists():
+            continue
+        with open(path, encoding='utf-8', newline='') as file:
+            for row in csv.DictReader(file):
+                # В CSV нет null: пустое поле — None.
+                yield model_name, {
+                    key: value if value != '' else None
+                    for key, value in row.items()
+                }
+
+
+def bulk_insert(model, objs):
+    """bulk_create объектов с id из карт.
+
+    bulk_create вызывает pre_save, и auto_now_add затирает даты из
+    файла: они возвращаются вторым запросом bulk_update по тем же id.
+    """
+    if not objs:
+        return
+    names = [field.attname for field in model._meta.concrete_fields
+             if getattr(field, 'auto_now_add', False)]
+    dates = [[getattr(obj, name) for name in names] for obj in objs]
+    model.objects.bulk_create(objs)
+    for obj, values in zip(objs, dates):
+        for name, value in zip(names, values):
+            setattr(obj, name, value)
+    model.objects.bulk_update(objs, names)
+
+
+class OffsetIdMap:
+    """Исходный id → id в этой базе сдвигом на наибольший занятый.
+
+    Хранит только id, уже прочитанные из файла, порядок id
+    сохраняется; в пустой базе id остаются прежними.
+    """
+
+    def __init__(self, model):
+        self.model = model
+        self.offset = None
+        self.source_ids = set()
+
+    def add(self, source_id):
+        """Новый id для объекта из файла"""
+        self.source_ids.add(int(source_id))
+        return self[source_id]
+
+    def __contains__(self, source_id):
+        return source_id is None or int(source_id) in self.source_ids
+
+    def __getitem__(self, source_id):
+        if source_id is None:
+            return None
+        if self.offset is None:
+            self.offset = self.model.objects.aggregate(
+                top=Max('pk'))['top'] or 0
+        return int(source_id) + self.offset
+
+
+class Importer:
+
+    def __init__(self, batch_size=DEFAULT_BATCH_SIZE):
+        self.batch_size = batch_size
+        self.stats = Stats()
+        self.category_ids = {}
+        self.new_category_ids = OffsetIdMap(Category)
+        self.location_ids = OffsetIdMap(Location)
+        self.post_ids = OffsetIdMap(Post)
+        self.comment_ids = OffsetIdMap(Comment)
+        self.buffer = []
+        self.buffer_model = None
+
+    def run(self, rows):
+        for model_name, row in rows:
+            if model_name not in MODELS:
+                raise TransferError(f'неизвестная модель {model_name}')
+            if (model_name != self.buffer_model
+                    or len(self.buffer) >= self.batch_size):
+                self.flush()
+                self.buffer_model = model_name
+            self.buffer.append(row)
+        self.flush()
+        self.reset_sequences()
+        return self.stats
+
+    def flush(self):
+        if not self.buffer:
+            return
+        started = time.perf_counter()
+        with transaction.atomic():
+            getattr(self, f'import_{self.buffer_model}')(self.buffer)
+        self.stats.add(self.buffer_model, len(self.buffer),
+                       time.perf_counter() - started)
+        self.buffer = []
+        # При DEBUG журнал запросов копил бы тексты многострочных INSERT.
+        reset_queries()
+
+    @staticmethod
+    def values(model, row, names):
+        values = {}
+        for name in names:
+            field = model._meta.get_field(name)
+            value = row.get(name)
+            if value is None and not field.null:
+                # Нет даты создания — как при обычном сохранении.
+                value = (timezone.now() if name == 'created_at'
+                         else field.get_default())
+            values[name] = field.to_python(value)
+        return values
+
+    def authors(self, rows):
+        """Id авторов по username; недостающие создаются без пароля"""
+        usernames = {row['author'] for row in rows}
+        ids = dict(User.objects.filter(username__in=usernames).values_list(
+            'username', 'id'))
+        missing = usernames - ids.keys()
+        if missing:
+            password = make_password(None)
+            User.objects.bulk_create([
+                User(username=username, password=password)
+                for username in missing
+            ])
+            ids.update(User.objects.filter(
+                username__in=missing).values_list('username', 'id'))
+        return ids
+
+    def import_category(self, rows):
+        fields = ('title', 'description', 'slug', 'is_published',
+                  'created_at')
+        existing = Category.objects.in_bulk(
+            [row['slug'] for row in rows], field_name='slug')
+        created, updated = [], []
+        for row in rows:
+            values = self.values(Category, row, fields)
+            category = existing.get(values['slug'])
+            if category is None:
+                created.append(Category(
+                    id=self.new_category_ids.add(row['id']), **values))
+                continue
+            for name in ('title', 'description', 'is_published'):
+                setattr(category, name, values[name])
+            updated.append(category)
+        bulk_insert(Category, created)
+        Category.objects.bulk_update(
+            updated, ['title', 'description', 'is_published'])
+        ids = dict(Category.objects.filter(
+            slug__in=[row['slug'] for row in rows]
+        ).values_list('slug', 'id'))
+        for row in rows:
+            self.category_ids[int(row['id'])] = ids[row['slug']]
+        if updated:
+            published.sync_matching(
+                category_id__in=[category.pk for category in updated])
+            for category in updated:
+                bump_version('category', category.pk)
+            purge_pages()
+
+    def import_location(self, rows):
+        bulk_insert(Location, [
+            Location(id=self.location_ids.add(row['id']), **self.values(
+                Location, row, ('name', 'is_published', 'created_at')))
+            for row in rows
+        ])
+
+    def import_post(self, rows):
+        authors = self.authors(rows)
+        posts = []
+        for row in rows:
+            category = row.get('category')
+            if category is not None and int(category) not in \
+                    self.category_ids:
+                raise TransferError(
+                    f'публикация {row["id"]}: категории {category} '
+                    'нет в файле')
+            location = row.get('location')
+            if location not in self.location_ids:
+                raise TransferError(
+                    f'публикация {row["id"]}: места {location} нет в файле')
+            posts.append(Post(
+                id=self.post_ids.add(row['id']),
+                author_id=authors[row['author']],
+                category_id=(self.category_ids[int(category)]
+                             if category is not None else None),
+                location_id=self.location_ids[location],
+                **self.values(Post, row, (
+                    'title', 'text', 'pub_date', 'image', 'is_published',
+                    'created_at')),
+            ))
+        bulk_insert(Post, posts)
+        published.sync_posts(post.pk for post in posts)
+        search.index_posts(posts)
+        now = timezone.now()
+        for post in posts:
+            if post.is_published and post.pub_date > now:
+                promote_post.schedule(post.pub_date, post.pk)
+
+    def import_comment(self, rows):
+        authors = self.authors(rows)
+        comments = []
+        for row in rows:
+            if row['post'] not in self.post_ids:
+                raise TransferError(
+                    f'комментарий {row["id"]}: публикации {row["post"]} '
+                    'нет в файле')
+            comments.append(Comment(
+                id=self.comment_ids.add(row['id']),
+                post_id=self.post_ids[row['post']],
+                author_id=authors[row['author']],
+                **self.values(Comment, row, ('text', 'created_at'))))
+        bulk_insert(Comment, comments)
+        self.add_comment_counts(Counter(c.post_id for c in comments))
+
+    @staticmethod
+    def add_comment_counts(counts):
+        by_count = defaultdict(list)
+        for post_id, count in counts.items():
+            by_count[count].append(post_id)
+        for count, post_ids in by_count.items():
+            now = timezone.now()
+            Post.objects.filter(pk__in=post_ids).update(
+                comment_count=F('comment_count') + count, updated_at=now)
+            PublishedPost.objects.filter(pk__in=post_ids).update(
+                comment_count=F('comment_count') + count, updated_at=now)
+            for post_id in post_ids:
+                bump_version('post', post_id)
+
+    def reset_sequences(self):
+        """После явных id последовательности PostgreSQL отстают"""
+        with connection.cursor() as cursor:
+            for sql in connection.ops.sequence_reset_sql(
+                    no_style(), [Category, Location, Post, Comment]):
+                cursor.execute(sql)
@@ -1,6 +1,10 @@
+from django.conf import settings
 from django.urls import include, path
 
-from . import views
+from . import async_views, views
+
+# Читающие представления: асинхронные под ASGI, см. BLOG_ASYNC_VIEWS.
+read_views = async_views if settings.BLOG_ASYNC_VIEWS else views
 
 app_name = 'blog'
 
@@ -8,11 +12,13 @@ post_urls = [
     path('create/',
          views.create_post, name='create_post'),
     path('<int:post_id>/',
-         views.post_detail, name='post_detail'),
+         read_views.post_detail, name='post_detail'),
     path('<int:post_id>/edit/',
          views.edit_post, name='edit_post'),
     path('<int:post_id>/delete/',
          views.delete_post, name='delete_post'),
+    path('<int:post_id>/comments/',
+         views.post_comments, name='post_comments'),
     path('<int:post_id>/comment/',
          views.add_comment, name='add_comment'),
     path('<int:post_id>/edit_comment/<int:comment_id>/',
@@ -25,14 +31,16 @@ profile_urls = [
     path('edit/',
          views.edit_profile, name='edit_profile'),
     path('<slug:username>/',
-         views.profile, name='profile'),
+         read_views.profile, name='profile'),
 ]
 
 urlpatterns = [
     path('',
-         views.index, name='index'),
+         read_views.index, name='index'),
     path('category/<slug:category_slug>/',
-         views.category_posts, name='category_posts'),
+         read_views.category_posts, name='category_posts'),
+    path('search/',
+         read_views.search, name='search'),
     path('posts/', include(post_urls)),
     path('profile/', include(profile_urls)),
 ]
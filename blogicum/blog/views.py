@@ -1,15 +1,27 @@
-from datetime import datetime
-
 from django.core.paginator import Paginator
 from django.contrib.auth.decorators import login_required
-from django.db.models import Count
+from django.db import transaction
+from django.db.models import Count, Max, Sum
+from django.http import Http404, StreamingHttpResponse
 from django.shortcuts import render, get_object_or_404, redirect
+from django.template.loader import render_to_string
 
+from .cache import anonymous_page_cache
+from .conditional import conditional_page, latest
 from .forms import PostForm, CommentForm, UserForm
-from .models import Post, Category, User, Comment
+from .models import Post, Category, User, Comment, PublishedPost
+from .paginators import KeysetPaginator
+from .routers import read_from_replica
+from .search import search_posts
+from .tasks import build_post_image_variants
 
 
 NUMBER_OF_PAGINATOR_PAGES = 10
+FEED_ORDERING = ('-pub_date', '-id')
+FEED_COUNT_CACHE_TIMEOUT = 300
+COMMENTS_PER_PAGE = 50
+COMMENTS_ORDERING = ('created_at', 'id')
+COMMENTS_STREAM_CHUNK = 200
 
 
 def get_posts(**kwargs):
@@ -18,66 +30,236 @@ def get_posts(**kwargs):
         'category',
         'location',
         'author'
-    ).annotate(comment_count=Count('comments')
-               ).filter(**kwargs).order_by('-pub_date')
+    ).filter(**kwargs).order_by('-pub_date')
+
+
+def get_published_posts(**kwargs):
+    """Публичная лента из витрины PublishedPost: одна таблица, без JOIN"""
+    return PublishedPost.objects.filter(**kwargs).order_by(*FEED_ORDERING)
+
+
+def is_post_public(post):
+    """Видна ли публикация всем (то же состояние, что и у лент)"""
+    return post.is_visible
 
 
 def get_paginator(request, queryset,
-                  number_of_pages=NUMBER_OF_PAGINATOR_PAGES):
+                  number_of_pages=NUMBER_OF_PAGINATOR_PAGES, count_key=None):
     """Представление queryset в виде пагинатора,
-       по N-шт на странице"""
-    paginator = Paginator(queryset, number_of_pages)
+    по N-шт на странице.
+
+    Лента листается курсором ?cursor= по (pub_date, id);
+    старые ссылки вида ?page=N обслуживаются Paginator.
+    """
     page_number = request.GET.get('page')
-    return paginator.get_page(page_number)
+    if page_number is not None:
+        paginator = Paginator(queryset, number_of_pages)
+        return paginator.get_page(page_number)
+    return get_keyset_paginator(
+        queryset, number_of_pages, count_key=count_key,
+    ).get_page(request.GET.get('cursor'))
+
+
+def get_keyset_paginator(queryset,
+                         number_of_pages=NUMBER_OF_PAGINATOR_PAGES,
+                         count_key=None):
+    return KeysetPaginator(
+        queryset, number_of_pages,
+        ordering=FEED_ORDERING,
+        count_cache_timeout=FEED_COUNT_CACHE_TIMEOUT,
+        count_key=count_key)
+
+
+def get_feed_page(request, posts, count_key=None):
+    """Страница ленты; строки витрины становятся публикациями.
+
+    count_key — имя ленты для кэша числа её публикаций.
+    """
+    page_obj = get_paginator(request, posts, count_key=count_key)
+    if posts.model is PublishedPost:
+        page_obj.object_list = [row.as_post() for row in page_obj.object_list]
+    return page_obj
+
 
+def feed_state(request, posts, modified=None, parts=()):
+    """Состояние страницы ленты для conditional_page: агрегат по её
+    строкам. Витрина меняет updated_at строки при любой правке
+    карточки; у собственных публикаций автора места и категории
+    берутся из своих таблиц. Удалённую строку видно по rows и ids.
 
+    Старые ссылки ?page=N показывают число страниц всей ленты —
+    им валидаторы не ставятся.
+    """
+    if request.GET.get('page') is not None:
+        return None
+    aggregates = {'updated': Max('updated_at'), 'ids': Sum('pk')}
+    if posts.model is Post:
+        aggregates.update(category=Max('category__updated_at'),
+                          location=Max('location__updated_at'))
+    page = get_keyset_paginator(posts).page_aggregate(
+        request.GET.get('cursor'), **aggregates)
+    modified = latest(modified, page['updated'], page.get('category'),
+                      page.get('location'))
+    return modified, (parts, page['rows'], page['ids'])
+
+
+def index_state(request):
+    return feed_state(request, get_published_posts())
+
+
+@read_from_replica
+@anonymous_page_cache
+@conditional_page(index_state)
 def index(request):
     """Главная страница / Лента публикаций"""
-    posts = get_posts(
-        is_published=True,
-        category__is_published=True,
-        pub_date__lte=datetime.now())
-    page_obj = get_paginator(request, posts)
+    page_obj = get_feed_page(request, get_published_posts(), ('index',))
     context = {'page_obj': page_obj}
     return render(request, 'blog/index.html', context)
 
 
+def category_posts_state(request, category_slug):
+    category = Category.objects.filter(
+        slug=category_slug, is_published=True,
+    ).values_list('pk', 'updated_at').first()
+    if category is None:
+        return None
+    category_id, modified = category
+    return feed_state(request, get_published_posts(category=category_id),
+                      modified)
+
+
+@read_from_replica
+@anonymous_page_cache
+@conditional_page(category_posts_state)
 def category_posts(request, category_slug):
     """Отображение публикаций в категории"""
     category = get_object_or_404(
         Category,
         slug=category_slug,
         is_published=True)
-    posts = get_posts(
-        is_published=True,
-        category__is_published=True,
-        pub_date__lte=datetime.now(),
-        category=category)
-    page_obj = get_paginator(request, posts)
+    page_obj = get_feed_page(request, get_published_posts(category=category),
+                             ('category_posts', category.pk))
     context = {'category': category,
                'page_obj': page_obj}
     return render(request, 'blog/post_list.html', context)
 
 
+def get_search_posts(query):
+    return search_posts(query).order_by(*FEED_ORDERING)
+
+
+@read_from_replica
+@anonymous_page_cache
+def search(request):
+    """Поиск по заголовкам и текстам публикаций"""
+    query = request.GET.get('q', '').strip()
+    context = {'query': query}
+    if query:
+        context['page_obj'] = get_feed_page(
+            request, get_search_posts(query), ('search', query))
+    return render(request, 'blog/search.html', context)
+
+
+def get_visible_post(request, post_id):
+    """Публикация с автором, категорией и местом одним запросом;
+    чужие неопубликованные публикации — 404
+    """
+    post = get_object_or_404(
+        Post.objects.select_related('category', 'location', 'author'),
+        id=post_id)
+    if request.user.id != post.author_id and not is_post_public(post):
+        raise Http404
+    return post
+
+
+def get_comments(post):
+    return Comment.objects.select_related('author').filter(post=post)
+
+
+def get_comments_page(post, cursor):
+    """Порция комментариев по курсору (created_at, id)"""
+    paginator = KeysetPaginator(
+        get_comments(post), COMMENTS_PER_PAGE, ordering=COMMENTS_ORDERING)
+    return paginator.get_page(cursor)
+
+
+def post_detail_state(request, post_id):
+    """Публикация, её категория, место и комментарии одним запросом.
+
+    Правки комментариев сдвигают Post.updated_at (blog.signals),
+    добавление и удаление видно и по агрегатам комментариев.
+    """
+    post = Post.objects.filter(pk=post_id).values(
+        'author_id', 'is_visible', 'updated_at', 'category__updated_at',
+        'location__updated_at', 'author__username',
+    ).annotate(
+        last_comment=Max('comments__created_at'),
+        comment_rows=Count('comments'),
+        comment_ids=Sum('comments__id'),
+    ).first()
+    if post is None or (request.user.id != post['author_id']
+                        and not post['is_visible']):
+        return None
+    modified = latest(post['updated_at'], post['category__updated_at'],
+                      post['location__updated_at'], post['last_comment'])
+    return modified, (post['author__username'], post['comment_rows'],
+                      post['comment_ids'])
+
+
+@read_from_replica
+@conditional_page(post_detail_state)
 def post_detail(request, post_id):
     """Отображение полного описания выбранной публикации"""
-    post = get_object_or_404(Post, id=post_id)
-    if request.user != post.author:
-        post = get_object_or_404(
-            Post,
-            id=post_id,
-            is_published=True,
-            category__is_published=True,
-            pub_date__lte=datetime.now())
+    post = get_visible_post(request, post_id)
     form = CommentForm(request.POST or None)
-    comments = Comment.objects.select_related(
-        'author').filter(post=post)
+    comments = get_comments_page(post, request.GET.get('comments'))
     context = {'post': post,
                'form': form,
                'comments': comments}
     return render(request, 'blog/post_detail.html', context)
 
 
+def stream_comments(request, post):
+    """Вся ветка комментариев кусками по COMMENTS_STREAM_CHUNK.
+
+    Генератор работает уже после выхода из read_from_replica, поэтому
+    база берётся явно — та, из которой прочитана публикация.
+    """
+    comments = get_comments(post).using(post._state.db).order_by(
+        *COMMENTS_ORDERING).iterator(chunk_size=COMMENTS_STREAM_CHUNK)
+    chunk = []
+    for comment in comments:
+        chunk.append(comment)
+        if len(chunk) == COMMENTS_STREAM_CHUNK:
+            yield render_to_string('includes/comment_list.html',
+                                   {'post': post, 'comments': chunk},
+                                   request)
+            chunk = []
+    if chunk:
+        yield render_to_string('includes/comment_list.html',
+                               {'post': post, 'comments': chunk}, request)
+
+
+@read_from_replica
+def post_comments(request, post_id):
+    """Следующая порция комментариев HTML-фрагментом;
+    с ?stream=1 — вся ветка потоком
+    """
+    post = get_visible_post(request, post_id)
+    if request.GET.get('stream'):
+        return StreamingHttpResponse(stream_comments(request, post))
+    comments = get_comments_page(post, request.GET.get('cursor'))
+    context = {'post': post,
+               'comments': comments}
+    return render(request, 'includes/comment_list.html', context)
+
+
+def schedule_image_variants(post):
+    """Уменьшенные копии фото строятся обработчиком очереди"""
+    if post.image:
+        build_post_image_variants.delay(post.pk, post.image.name)
+
+
 @login_required
 def create_post(request):
     """Создание публикации"""
@@ -86,6 +268,7 @@ def create_post(request):
         post = form.save(commit=False)
         post.author = request.user
         post.save()
+        schedule_image_variants(post)
         return redirect('blog:profile', request.user)
     context = {'form': form}
     return render(request, 'blog/create.html', context)
@@ -97,9 +280,17 @@ def edit_post(request, post_id):
     post = get_object_or_404(Post, id=post_id)
     if request.user != post.author:
         return redirect('blog:post_detail', post_id)
-    form = PostForm(request.POST or None, instance=post)
+    form = PostForm(request.POST or None, files=request.FILES or None,
+                    instance=post)
     if form.is_valid():
+        image_changed = 'image' in form.changed_data
+        if image_changed:
+            # Копии старого фото к новому не подходят.
+            post.image_variants = []
+            post.save(update_fields=['image_variants'])
         form.save()
+        if image_changed:
+            schedule_image_variants(post)
         return redirect('blog:post_detail', post_id)
     context = {'form': form}
     return render(request, 'blog/create.html', context)
@@ -128,7 +319,8 @@ def add_comment(request, post_id):
         comment = form.save(commit=False)
         comment.author = request.user
         comment.post = post
-        comment.save()
+        with transaction.atomic():
+            comment.save()
     return redirect('blog:post_detail', post_id)
 
 
@@ -154,25 +346,42 @@ def delete_comment(request, post_id, comment_id):
     if request.user != comment.author:
         return redirect('blog:post_detail', post_id)
     if request.method == 'POST':
-        comment.delete()
+        with transaction.atomic():
+            comment.delete()
         return redirect('blog:post_detail', post_id)
     context = {'comment': comment}
     return render(request, 'blog/comment.html', context)
 
 
+def profile_state(request, username):
+    """У пользователя нет отметки изменения: его поля входят
+    только в ETag
+    """
+    profile = User.objects.filter(username=username).values_list(
+        'pk', 'first_name', 'last_name', 'date_joined', 'is_staff',
+    ).first()
+    if profile is None:
+        return None
+    if request.user.id == profile[0]:
+        posts = get_posts(author=profile[0])
+    else:
+        posts = get_published_posts(author=profile[0])
+    return feed_state(request, posts, parts=profile)
+
+
+@read_from_replica
+@conditional_page(profile_state)
 def profile(request, username):
     """Отображение страницы пользователя"""
     profile = get_object_or_404(
         User,
         username=username)
-    posts = get_posts(author=profile)
-    if request.user != profile:
-        posts = get_posts(
-            is_published=True,
-            category__is_published=True,
-            pub_date__lte=datetime.now(),
-            author=profile)
-    page_obj = get_paginator(request, posts)
+    own = request.user == profile
+    if own:
+        posts = get_posts(author=profile)
+    else:
+        posts = get_published_posts(author=profile)
+    page_obj = get_feed_page(request, posts, ('profile', profile.pk, own))
     context = {'profile': profile,
                'page_obj': page_obj}
     return render(request, 'blog/profile.html', context)
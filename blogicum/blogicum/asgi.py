@@ -11,6 +11,12 @@ import os
 
 from django.core.asgi import get_asgi_application
 
+from blog.templating import warm_up
+
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'blogicum.settings')
+os.environ.setdefault('BLOGICUM_ASYNC_VIEWS', '1')
 
 application = get_asgi_application()
+
+# Шаблоны компилируются до первого запроса (при BLOGICUM_TEMPLATE_CACHE=1).
+warm_up()
@@ -4,6 +4,7 @@ Django settings for blogicum project.
 
 from pathlib import Path
 import os
+import tempfile
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -48,10 +49,13 @@ INSTALLED_APPS = [
     'django.contrib.staticfiles',
     'blog.apps.BlogConfig',
     'pages.apps.PagesConfig',
+    'jobs.apps.JobsConfig',
     'django_bootstrap5',
 ]
 
 MIDDLEWARE = [
+    'blog.instrumentation.ViewStatsMiddleware',
+    'blog.routers.PrimaryStickinessMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -65,11 +69,21 @@ ROOT_URLCONF = 'blogicum.urls'
 
 TEMPLATES_DIR = BASE_DIR / 'templates'
 
+# BLOGICUM_TEMPLATE_CACHE: 1 — скомпилированные шаблоны хранятся в памяти
+#   процесса (cached.Loader) и прогреваются при старте воркера
+#   (blog.templating); по умолчанию включено, когда DEBUG выключен.
+#   Время рендера по шаблонам и {% include %}: manage.py profile_templates.
+TEMPLATE_CACHE = os.getenv(
+    'BLOGICUM_TEMPLATE_CACHE', '0' if DEBUG else '1') == '1'
+TEMPLATE_LOADERS = [
+    'django.template.loaders.filesystem.Loader',
+    'django.template.loaders.app_directories.Loader',
+]
+
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'BACKEND': 'blog.instrumentation.InstrumentedDjangoTemplates',
         'DIRS': [TEMPLATES_DIR],
-        'APP_DIRS': True,
         'OPTIONS': {
             'context_processors': [
                 'django.template.context_processors.debug',
@@ -77,6 +91,9 @@ TEMPLATES = [
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
             ],
+            'loaders': (
+                [('django.template.loaders.cached.Loader', TEMPLATE_LOADERS)]
+                if TEMPLATE_CACHE else TEMPLATE_LOADERS),
         },
     },
 ]
@@ -86,13 +103,181 @@ WSGI_APPLICATION = 'blogicum.wsgi.application'
 
 # Database
 # https://docs.djangoproject.com/en/3.2/ref/settings/#databases
+# BLOGICUM_DB_ENGINE:
+#   sqlite     — файл BLOGICUM_DB_NAME (db.sqlite3); PRAGMA из SQLITE_PRAGMAS
+#                ставятся каждому новому соединению (blog.db), запись и
+#                повторы при SQLITE_BUSY — в бэкенде blog.backends.sqlite3
+#   postgresql — параметры в BLOGICUM_DB_NAME/USER/PASSWORD/HOST/PORT;
+#                пул соединений — PgBouncer (BLOGICUM_DB_PGBOUNCER=1)
+# BLOGICUM_DB_CONN_MAX_AGE: сколько секунд соединение живёт между
+#   запросами; 0 — закрывать после каждого, none — без ограничения.
+# BLOGICUM_DB_HEALTH_CHECKS: проверять сохранённое соединение перед
+#   запросом и переоткрывать, если оно оборвалось.
+
+DB_ENGINE = os.getenv('BLOGICUM_DB_ENGINE', 'sqlite')
+DB_CONN_MAX_AGE = os.getenv('BLOGICUM_DB_CONN_MAX_AGE', '60')
+DB_HEALTH_CHECKS = os.getenv('BLOGICUM_DB_HEALTH_CHECKS', '1') == '1'
+SQLITE_TUNING = os.getenv('BLOGICUM_SQLITE_TUNING', '1') == '1'
+SQLITE_PRAGMAS = {
+    'journal_mode': 'wal',
+    'synchronous': 'normal',
+    'busy_timeout': 5000,
+    # Отрицательное значение — размер кэша страниц в КиБ.
+    'cache_size': -64 * 1024,
+    'mmap_size': 256 * 1024 * 1024,
+    'temp_store': 'memory',
+}
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+if DB_ENGINE == 'postgresql':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.getenv('BLOGICUM_DB_NAME', 'blogicum'),
+            'USER': os.getenv('BLOGICUM_DB_USER', 'blogicum'),
+            'PASSWORD': os.getenv('BLOGICUM_DB_PASSWORD', ''),
+            'HOST': os.getenv('BLOGICUM_DB_HOST', '127.0.0.1'),
+            'PORT': os.getenv('BLOGICUM_DB_PORT', '5432'),
+            # В режиме pool_mode=transaction серверные курсоры не живут
+            # дольше транзакции.
+            'DISABLE_SERVER_SIDE_CURSORS': (
+                os.getenv('BLOGICUM_DB_PGBOUNCER', '0') == '1'),
+        }
     }
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'blog.backends.sqlite3',
+            'NAME': Path(os.getenv('BLOGICUM_DB_NAME',
+                                   BASE_DIR / 'db.sqlite3')),
+        }
+    }
+DATABASES['default']['CONN_MAX_AGE'] = (
+    None if DB_CONN_MAX_AGE == 'none' else int(DB_CONN_MAX_AGE))
+
+# Read replica
+# BLOGICUM_DB_REPLICA: файл SQLite (или хост PostgreSQL) реплики только
+# для чтения. Ленты и публикации читаются с неё (blog.routers), запись и
+# запросы в течение REPLICA_STICKY_SECONDS после POST — с default, а
+# все чтения REPLICA_LAG_SECONDS после сброса кэша страниц — тоже с default.
+# Две локальные базы SQLite синхронизирует manage.py sync_replica.
+
+DB_REPLICA = os.getenv('BLOGICUM_DB_REPLICA')
+DATABASE_REPLICAS = ()
+if DB_REPLICA:
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'HOST' if DB_ENGINE == 'postgresql' else 'NAME': DB_REPLICA,
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS = ('replica',)
+DATABASE_ROUTERS = ['blog.routers.ReplicaRouter']
+REPLICA_STICKY_SECONDS = 10
+REPLICA_LAG_SECONDS = REPLICA_STICKY_SECONDS
+
+
+# Cache
+# https://docs.djangoproject.com/en/3.2/topics/cache/
+# BLOGICUM_CACHE_BACKEND:
+#   file   — по умолчанию: файловый кэш, общий для всех процессов машины
+#            (воркеры, runworker, команды manage.py видят одни версии
+#            карточек и сбросы страниц). Каталог BLOGICUM_CACHE_DIR —
+#            в /dev/shm, если он есть, иначе во временном каталоге
+#            системы, не в дереве исходников. Очистка при переполнении
+#            перебирает все файлы, поэтому MAX_ENTRIES у него в десять
+#            раз меньше
+#   redis  — общий кэш нескольких машин (пакет django-redis), адрес
+#            в BLOGICUM_REDIS_URL
+#   locmem — кэш внутри одного процесса; им пользуются тесты
+
+CACHE_BACKEND = os.getenv('BLOGICUM_CACHE_BACKEND', 'file')
+SHARED_MEMORY_DIR = Path('/dev/shm')
+CACHE_DIR = Path(os.getenv('BLOGICUM_CACHE_DIR', (
+    SHARED_MEMORY_DIR if SHARED_MEMORY_DIR.is_dir()
+    else Path(tempfile.gettempdir())) / 'blogicum-cache'))
+FILE_CACHE_ENTRIES_DIVISOR = 10
+CACHE_REDIS_URL = os.getenv('BLOGICUM_REDIS_URL', 'redis://127.0.0.1:6379')
+
+CACHE_OPTIONS = {
+    'default': {'TIMEOUT': 300, 'MAX_ENTRIES': 1000},
+    'fragments': {'TIMEOUT': 60 * 60 * 24, 'MAX_ENTRIES': 20000},
+    'sessions': {'TIMEOUT': 60 * 60 * 24 * 14, 'MAX_ENTRIES': 50000},
+    'feeds': {'TIMEOUT': 300, 'MAX_ENTRIES': 5000},
+}
+
+if CACHE_BACKEND == 'redis':
+    CACHES = {
+        alias: {
+            'BACKEND': 'django_redis.cache.RedisCache',
+            'LOCATION': f'{CACHE_REDIS_URL}/{db}',
+            'TIMEOUT': options['TIMEOUT'],
+            'KEY_PREFIX': 'blogicum',
+        }
+        for db, (alias, options) in enumerate(CACHE_OPTIONS.items())
+    }
+elif CACHE_BACKEND == 'locmem':
+    CACHES = {
+        alias: {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': alias,
+            'TIMEOUT': options['TIMEOUT'],
+            'OPTIONS': {'MAX_ENTRIES': options['MAX_ENTRIES']},
+        }
+        for alias, options in CACHE_OPTIONS.items()
+    }
+else:
+    CACHES = {
+        alias: {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': CACHE_DIR / alias,
+            'TIMEOUT': options['TIMEOUT'],
+            'OPTIONS': {'MAX_ENTRIES': (
+                options['MAX_ENTRIES'] // FILE_CACHE_ENTRIES_DIVISOR)},
+        }
+        for alias, options in CACHE_OPTIONS.items()
+    }
+
+
+# Sessions
+# https://docs.djangoproject.com/en/3.2/topics/http/sessions/
+# blog.sessions держит сессию в подписанной cookie, пока она не длиннее
+# SESSION_COOKIE_DATA_LIMIT, и только крупные — в кэше sessions и БД.
+# BLOGICUM_SESSION_ENGINE=django.contrib.sessions.backends.db вернёт
+# хранение в БД. Истёкшие записи удаляет manage.py purge_sessions.
+
+SESSION_ENGINE = os.getenv('BLOGICUM_SESSION_ENGINE', 'blog.sessions')
+SESSION_CACHE_ALIAS = 'sessions'
+SESSION_COOKIE_DATA_LIMIT = 2048
+
+
+# Request instrumentation
+# Замеры по представлениям: /admin/viewstats/ и manage.py viewstats.
+# BLOGICUM_QUERY_BUDGET_ACTION: log — предупреждение в лог, raise — ошибка.
+
+VIEWSTATS_WINDOW_MINUTES = 15
+VIEWSTATS_FLUSH_SECONDS = 10
+VIEW_QUERY_BUDGETS = {
+    'blog:index': 6,
+    'blog:category_posts': 7,
+    'blog:post_detail': 5,
+    'blog:profile': 6,
 }
+VIEW_QUERY_BUDGET_ACTION = os.getenv('BLOGICUM_QUERY_BUDGET_ACTION', 'log')
+
+
+# Async views
+# Под ASGI (blogicum/asgi.py) ленты и страница публикации обслуживаются
+# асинхронными представлениями blog.async_views, под WSGI — обычными.
+
+BLOG_ASYNC_VIEWS = os.getenv('BLOGICUM_ASYNC_VIEWS', '0') == '1'
+
+
+# Conditional GET
+# Ленты и страница публикации отдают ETag и Last-Modified (blog.conditional)
+# и на повторный запрос без изменений отвечают 304, не рендеря шаблон.
+# BLOGICUM_RELEASE — метка выкладки: входит в ETag, чтобы после обновления
+# вёрстки браузеры и CDN не держались за старые страницы.
+
+PAGE_ETAG_RELEASE = os.getenv('BLOGICUM_RELEASE', '')
 
 
 # Password validation
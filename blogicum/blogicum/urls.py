@@ -1,10 +1,14 @@
 from django.contrib import admin
+from django.contrib.auth import views as auth_views
 from django.contrib.auth.forms import UserCreationForm
 from django.conf import settings
 from django.conf.urls.static import static
 from django.views.generic.edit import CreateView
 from django.urls import include, path, reverse_lazy
 
+from blog.instrumentation import view_stats
+from users.forms import QueuedPasswordResetForm
+
 
 handler404 = 'pages.views.page_not_found'
 handler500 = 'pages.views.internal_server_error'
@@ -12,7 +16,14 @@ handler500 = 'pages.views.internal_server_error'
 urlpatterns = [
     path('', include('blog.urls')),
     path('pages/', include('pages.urls')),
+    path('admin/viewstats/', view_stats, name='viewstats'),
     path('admin/', admin.site.urls),
+    path(
+        'auth/password_reset/',
+        auth_views.PasswordResetView.as_view(
+            form_class=QueuedPasswordResetForm),
+        name='password_reset',
+    ),
     path('auth/', include('django.contrib.auth.urls')),
     path(
         'auth/registration/',
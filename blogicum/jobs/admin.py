@@ -0,0 +1,27 @@
+from django.contrib import admin
+from django.db import transaction
+from django.utils import timezone
+
+from .models import DeadJob, Job
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ('name', 'attempts', 'run_after', 'locked_by', 'created_at')
+    list_filter = ('name',)
+
+
+@admin.register(DeadJob)
+class DeadJobAdmin(admin.ModelAdmin):
+    list_display = ('name', 'attempts', 'failed_at', 'created_at')
+    list_filter = ('name',)
+    actions = ('requeue',)
+
+    @admin.action(description='Вернуть в очередь')
+    def requeue(self, request, queryset):
+        with transaction.atomic():
+            Job.objects.bulk_create(
+                Job(name=dead.name, payload=dead.payload,
+                    max_attempts=dead.attempts, run_after=timezone.now())
+                for dead in queryset)
+            queryset.delete()
@@ -0,0 +1,56 @@
+import multiprocessing
+import signal
+
+import django
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from jobs.queue import work, worker_name
+
+
+def _run(stop, poll_interval, burst):
+    # Сигналы ловит родитель и передаёт остановку через stop.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    django.setup()
+    work(worker_name(), burst=burst, poll_interval=poll_interval, stop=stop)
+
+
+class Command(BaseCommand):
+    help = 'Запускает обработчики очереди фоновых задач'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--processes', type=int, default=1,
+            help='Число процессов-обработчиков')
+        parser.add_argument(
+            '--poll-interval', type=float, default=1.0,
+            help='Пауза в секундах, когда очередь пуста')
+        parser.add_argument(
+            '--burst', action='store_true',
+            help='Выйти, как только очередь опустеет')
+
+    def handle(self, *args, **options):
+        processes = options['processes']
+        if processes == 1:
+            done = work(burst=options['burst'],
+                        poll_interval=options['poll_interval'])
+            self.stdout.write(f'Выполнено задач: {done}')
+            return
+
+        stop = multiprocessing.Event()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(signum, lambda *args: stop.set())
+        # Открытое соединение нельзя делить с дочерними процессами.
+        connections.close_all()
+        children = [
+            multiprocessing.Process(
+                target=_run,
+                args=(stop, options['poll_interval'], options['burst']),
+                daemon=True)
+            for _ in range(processes)
+        ]
+        for child in children:
+            child.start()
+        self.stdout.write(f'Запущено обработчиков: {processes}')
+        for child in children:
+            child.join()
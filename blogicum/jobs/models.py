@@ -0,0 +1,62 @@
+from django.db import models
+
+NAME_LENGTH = 128
+
+
+class Job(models.Model):
+    name = models.CharField(max_length=NAME_LENGTH, verbose_name='Задача')
+    payload = models.JSONField(default=dict, verbose_name='Аргументы')
+    attempts = models.PositiveSmallIntegerField(
+        default=0,
+        verbose_name='Попыток'
+    )
+    max_attempts = models.PositiveSmallIntegerField(
+        verbose_name='Максимум попыток'
+    )
+    run_after = models.DateTimeField(verbose_name='Выполнить после')
+    locked_by = models.CharField(
+        max_length=NAME_LENGTH,
+        blank=True,
+        verbose_name='Обработчик'
+    )
+    locked_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='Взята в работу'
+    )
+    last_error = models.TextField(blank=True, verbose_name='Последняя ошибка')
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Добавлено'
+    )
+
+    class Meta:
+        verbose_name = 'задача'
+        verbose_name_plural = 'Очередь задач'
+        ordering = ('run_after', 'id')
+        indexes = (
+            models.Index(fields=('run_after', 'id'), name='job_run_after_idx'),
+        )
+
+    def __str__(self):
+        return f'{self.name} #{self.pk}'
+
+
+class DeadJob(models.Model):
+    name = models.CharField(max_length=NAME_LENGTH, verbose_name='Задача')
+    payload = models.JSONField(default=dict, verbose_name='Аргументы')
+    attempts = models.PositiveSmallIntegerField(verbose_name='Попыток')
+    last_error = models.TextField(blank=True, verbose_name='Последняя ошибка')
+    created_at = models.DateTimeField(verbose_name='Добавлено')
+    failed_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Отброшена'
+    )
+
+    class Meta:
+        verbose_name = 'отброшенная задача'
+        verbose_name_plural = 'Отброшенные задачи'
+        ordering = ('-failed_at',)
+
+    def __str__(self):
+        return f'{self.name} #{self.pk}'
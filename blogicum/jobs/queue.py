@@ -0,0 +1,163 @@
+import logging
+import os
+import random
+import socket
+import time
+import traceback
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import DeadJob, Job
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_ATTEMPTS = 5
+RETRY_BASE_SECONDS = 10
+RETRY_MAX_SECONDS = 60 * 60
+# Задача, взятая упавшим обработчиком, снова станет доступной.
+LOCK_TIMEOUT = timedelta(minutes=10)
+CLAIM_CANDIDATES = 10
+
+_registry = {}
+
+
+class UnknownTask(Exception):
+    pass
+
+
+def task(func=None, *, name=None, max_attempts=DEFAULT_MAX_ATTEMPTS):
+    """Регистрирует функцию как задачу; func.delay(...) ставит её в очередь,
+    func.schedule(run_after, ...) — на момент run_after.
+
+    Аргументы должны сериализоваться в JSON.
+    """
+    def register(func):
+        task_name = name or f'{func.__module__}.{func.__name__}'
+        _registry[task_name] = (func, max_attempts)
+
+        def delay(*args, **kwargs):
+            return enqueue(task_name, *args, **kwargs)
+
+        def schedule(run_after, *args, **kwargs):
+            return enqueue_at(run_after, task_name, *args, **kwargs)
+
+        func.task_name = task_name
+        func.delay = delay
+        func.schedule = schedule
+        return func
+
+    return register(func) if func is not None else register
+
+
+def enqueue(task_name, *args, **kwargs):
+    """Запись задачи в очередь в текущей транзакции"""
+    return enqueue_at(timezone.now(), task_name, *args, **kwargs)
+
+
+def enqueue_at(run_after, task_name, *args, **kwargs):
+    """Задача, которую обработчики возьмут не раньше run_after"""
+    if task_name not in _registry:
+        raise UnknownTask(task_name)
+    return Job.objects.create(
+        name=task_name,
+        payload={'args': list(args), 'kwargs': kwargs},
+        max_attempts=_registry[task_name][1],
+        run_after=run_after,
+    )
+
+
+def worker_name():
+    return f'{socket.gethostname()}-{os.getpid()}'
+
+
+def retry_delay(attempts):
+    """Экспоненциальная пауза со случайным разбросом"""
+    delay = min(RETRY_MAX_SECONDS, RETRY_BASE_SECONDS * 2 ** (attempts - 1))
+    return timedelta(seconds=delay * random.uniform(0.5, 1))
+
+
+def _available(now):
+    return Job.objects.filter(run_after__lte=now).filter(
+        Q(locked_at__isnull=True) | Q(locked_at__lt=now - LOCK_TIMEOUT))
+
+
+def claim(worker):
+    """Забрать ближайшую задачу.
+
+    Блокировка — условный UPDATE: из нескольких обработчиков строку
+    получает тот, чей UPDATE изменил её первым. SELECT ... FOR UPDATE
+    SKIP LOCKED не нужен, поэтому очередь работает и на SQLite.
+    Попытка засчитывается при захвате: задача, на которой обработчик
+    падает целиком, тоже дойдёт до max_attempts.
+    """
+    now = timezone.now()
+    candidates = _available(now).order_by('run_after', 'id').values_list(
+        'pk', flat=True)[:CLAIM_CANDIDATES]
+    for pk in candidates:
+        if _available(now).filter(pk=pk).update(
+                locked_by=worker, locked_at=now,
+                attempts=F('attempts') + 1):
+            return Job.objects.get(pk=pk)
+    return None
+
+
+def execute(job):
+    """Выполнить задачу; при ошибке отложить её или отбросить"""
+    try:
+        func, _ = _registry[job.name]
+    except KeyError:
+        func = None
+    if job.attempts > job.max_attempts:
+        fail(job, job.last_error or 'Обработчик не завершил задачу')
+        return False
+    try:
+        if func is None:
+            raise UnknownTask(job.name)
+        func(*job.payload.get('args', ()), **job.payload.get('kwargs', {}))
+    except Exception:
+        fail(job, traceback.format_exc())
+        return False
+    Job.objects.filter(pk=job.pk).delete()
+    return True
+
+
+def fail(job, error):
+    attempts = job.attempts
+    if attempts >= job.max_attempts:
+        logger.error('Задача %s отброшена после %d попыток',
+                     job, attempts)
+        with transaction.atomic():
+            DeadJob.objects.create(
+                name=job.name, payload=job.payload, attempts=attempts,
+                last_error=error, created_at=job.created_at)
+            Job.objects.filter(pk=job.pk).delete()
+        return
+    logger.warning('Задача %s упала, попытка %d', job, attempts)
+    Job.objects.filter(pk=job.pk).update(
+        last_error=error, locked_by='', locked_at=None,
+        run_after=timezone.now() + retry_delay(attempts))
+
+
+def work(worker=None, burst=False, poll_interval=1.0, stop=None):
+    """Цикл обработчика; burst — выйти, когда очередь опустеет.
+
+    stop — threading/multiprocessing Event для остановки по сигналу.
+    Возвращает число выполненных задач.
+    """
+    worker = worker or worker_name()
+    done = 0
+    while stop is None or not stop.is_set():
+        job = claim(worker)
+        if job is None:
+            if burst:
+                break
+            if stop is not None:
+                stop.wait(poll_interval)
+            else:
+                time.sleep(poll_interval)
+            continue
+        done += execute(job)
+    return done
@@ -0,0 +1,24 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.forms import PasswordResetForm
+from django.contrib.auth.tokens import default_token_generator
+from django.utils.encoding import force_bytes
+from django.utils.http import urlsafe_base64_encode
+
+from .queue import task
+
+
+@task
+def send_password_reset_email(subject_template_name, email_template_name,
+                              user_id, context, from_email, to_email,
+                              html_email_template_name=None):
+    """Письмо для сброса пароля: uid, токен, рендер и отправка в обработчике"""
+    user = get_user_model().objects.get(pk=user_id)
+    context = dict(
+        context,
+        user=user,
+        uid=urlsafe_base64_encode(force_bytes(user.pk)),
+        token=default_token_generator.make_token(user),
+    )
+    PasswordResetForm().send_mail(
+        subject_template_name, email_template_name, context, from_email,
+        to_email, html_email_template_name=html_email_template_name)
@@ -1,7 +1,11 @@
 from django import forms
-from django.contrib.auth.forms import UserCreationForm, UserChangeForm
+from django.contrib.auth.forms import (
+    PasswordResetForm, UserChangeForm, UserCreationForm
+)
 from django.contrib.auth.models import User
 
+from jobs.tasks import send_password_reset_email
+
 
 class RegistrationForm(UserCreationForm):
     """Форма регистрации нового пользователя."""
@@ -137,3 +141,22 @@ class ProfileUpdateForm(UserChangeForm):
         if User.objects.filter(username=username).exclude(id=user_id).exists():
             raise forms.ValidationError('Пользователь с таким именем уже существует.')
         return username
+
+
+class QueuedPasswordResetForm(PasswordResetForm):
+    """Сброс пароля: письмо рендерит и отправляет обработчик очереди.
+
+    В очередь попадают только id пользователя, адрес и домен: uid и
+    токен собирает задача, чтобы они не лежали в Job.payload.
+    """
+
+    def send_mail(self, subject_template_name, email_template_name,
+                  context, from_email, to_email,
+                  html_email_template_name=None):
+        user_id = context['user'].pk
+        context = {key: value for key, value in context.items()
+                   if key not in ('user', 'uid', 'token')}
+        send_password_reset_email.delay(
+            subject_template_name, email_template_name, user_id, context,
+            from_email, to_email,
+            html_email_template_name=html_email_template_name)
@@ -1,6 +1,7 @@
 from django.urls import path, include
 from django.contrib.auth import views as auth_views
 from . import views
+from .forms import QueuedPasswordResetForm
 
 app_name = 'users'
 
@@ -23,6 +24,7 @@ urlpatterns = [
     # Восстановление пароля (добавляем)
     path('password_reset/',
          auth_views.PasswordResetView.as_view(
+             form_class=QueuedPasswordResetForm,
              template_name='registration/password_reset_form.html',
              email_template_name='registration/password_reset_email.html',
              subject_template_name='registration/password_reset_subject.txt',
@@ -4,7 +4,6 @@ from django.shortcuts import render, get_object_or_404, redirect
 from django.views.generic import CreateView, UpdateView
 from django.contrib.auth.models import User
 from django.urls import reverse
-from django.utils import timezone
 from django.core.paginator import Paginator
 from django.contrib import messages
 from django.contrib.auth.views import PasswordChangeView
@@ -53,9 +52,7 @@ def profile(request, username):
     else:
         posts_query = Post.objects.filter(
             author=profile_user,
-            pub_date__lte=timezone.now(),
-            is_published=True,
-            category__is_published=True,
+            is_visible=True,
             location__is_published=True
         )
 
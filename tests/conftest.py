@@ -41,6 +41,25 @@ def enable_debug_false():
         yield
 
 
+@pytest.fixture(scope='session', autouse=True)
+def locmem_caches():
+    """Кэши тестов — в памяти процесса: общий файловый кэш машины
+    пережил бы запуск и смешал тесты с работающим сайтом.
+    """
+    from django.conf import settings
+
+    caches = {
+        alias: {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': alias,
+            'TIMEOUT': config.get('TIMEOUT', 300),
+        }
+        for alias, config in settings.CACHES.items()
+    }
+    with override_settings(CACHES=caches):
+        yield
+
+
 class SafeImportFromContextManager:
     def __init__(
             self,
@@ -363,6 +382,7 @@ def cleanup(request):
                     filename.endswith(".jpg")
                     or filename.endswith(".gif")
                     or filename.endswith(".png")
+                    or filename.endswith(".webp")
             ):
                 file_path = os.path.join(root, filename)
                 if os.path.getmtime(file_path) >= start_time:
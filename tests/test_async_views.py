@@ -0,0 +1,103 @@
+from unittest import mock
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import AnonymousUser
+from django.http import Http404, HttpResponse
+from django.test import RequestFactory
+from django.utils import timezone
+
+from blog import async_views, cache as blog_cache, views
+
+
+def render_ids(request, template_name, context):
+    """Вместо страницы — то, что попало в контекст"""
+    ids = [post.id for post in context.get('page_obj', ())]
+    if 'post' in context:
+        ids = [context['post'].id, *(c.id for c in context['comments'])]
+    return HttpResponse(' '.join(map(str, ids)))
+
+
+def call_both(view_name, user, path, **kwargs):
+    responses = []
+    for module, call in ((views, lambda view, request: view(request,
+                                                            **kwargs)),
+                         (async_views, lambda view, request: async_to_sync(
+                             view)(request, **kwargs))):
+        request = RequestFactory().get(path)
+        request.user = user
+        with mock.patch.object(views, 'render', render_ids), \
+                mock.patch.object(async_views, 'render', render_ids):
+            responses.append(call(getattr(module, view_name), request))
+    return responses
+
+
+@pytest.fixture(autouse=True)
+def clear_page_cache():
+    blog_cache.page_cache().clear()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_post_detail_matches_sync(mixer, post_with_published_location):
+    post = post_with_published_location
+    mixer.cycle(5).blend('blog.Comment', post=post)
+    sync, asynchronous = call_both(
+        'post_detail', AnonymousUser(), f'/posts/{post.id}/',
+        post_id=post.id)
+    assert asynchronous.content == sync.content
+    assert len(asynchronous.content.split()) == 6
+
+
+@pytest.mark.django_db(transaction=True)
+def test_async_post_detail_hides_unpublished(
+        user, another_user, post_with_published_location):
+    post = post_with_published_location
+    post.is_published = False
+    post.save()
+    request = RequestFactory().get(f'/posts/{post.id}/')
+    request.user = another_user
+    with mock.patch.object(async_views, 'get_comments_page') as comments:
+        with pytest.raises(Http404):
+            async_to_sync(async_views.post_detail)(request, post_id=post.id)
+    assert not comments.called, (
+        'Комментарии скрытой публикации не должны запрашиваться.')
+    request.user = user
+    with mock.patch.object(async_views, 'render', render_ids):
+        response = async_to_sync(async_views.post_detail)(
+            request, post_id=post.id)
+    assert response.status_code == 200
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.parametrize('view_name', ['index', 'category_posts', 'profile'])
+def test_feeds_match_sync(mixer, user, published_category, view_name):
+    mixer.cycle(15).blend('blog.Post', author=user,
+                          category=published_category, is_published=True)
+    kwargs = {
+        'index': {},
+        'category_posts': {'category_slug': published_category.slug},
+        'profile': {'username': user.username},
+    }[view_name]
+    sync, asynchronous = call_both(view_name, user, '/', **kwargs)
+    assert asynchronous.content == sync.content
+    assert len(asynchronous.content.split()) == views.NUMBER_OF_PAGINATOR_PAGES
+
+
+@pytest.mark.django_db(transaction=True)
+def test_search_matches_sync(mixer, user, published_category):
+    mixer.cycle(15).blend('blog.Post', author=user, title='Море',
+                          category=published_category, is_published=True,
+                          pub_date=timezone.now())
+    sync, asynchronous = call_both('search', user, '/search/?q=морем')
+    assert asynchronous.content == sync.content
+    assert len(asynchronous.content.split()) == views.NUMBER_OF_PAGINATOR_PAGES
+
+
+@pytest.mark.django_db(transaction=True)
+def test_async_index_uses_page_cache():
+    request = RequestFactory().get('/')
+    request.user = AnonymousUser()
+    with mock.patch.object(async_views, 'render', render_ids):
+        async_to_sync(async_views.index)(request)
+        async_to_sync(async_views.index)(request)
+    assert blog_cache.page_stats()['index'] == {'hit': 1, 'miss': 1}
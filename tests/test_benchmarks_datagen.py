@@ -0,0 +1,18 @@
+import pytest
+from django.db.models import Count, F
+
+from benchmarks.datagen import generate
+from blog.models import Comment, Post
+
+
+@pytest.mark.django_db
+def test_generated_dataset_is_consistent():
+    summary = generate(posts=120, authors=7, categories=3, locations=4,
+                       comments_per_post=4, batch_size=50, seed=1)
+    assert Post.objects.count() == 120
+    assert Comment.objects.count() == summary['comments']
+    stale = Post.objects.annotate(
+        actual=Count('comments')).exclude(comment_count=F('actual'))
+    assert not stale.exists(), (
+        'Убедитесь, что генератор заполняет `comment_count` '
+        'в соответствии с созданными комментариями.')
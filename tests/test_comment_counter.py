@@ -0,0 +1,64 @@
+from unittest import mock
+
+import pytest
+from django.core.management import call_command
+from django.shortcuts import get_object_or_404
+
+from blog import views
+from blog.models import Comment, Post
+
+
+def stored_count(post):
+    return Post.objects.values_list(
+        'comment_count', flat=True).get(pk=post.pk)
+
+
+@pytest.mark.django_db
+def test_comment_count_follows_create_and_delete(
+        mixer, user, post_with_published_location):
+    post = post_with_published_location
+    comments = mixer.cycle(3).blend(Comment, post=post, author=user)
+    assert stored_count(post) == 3, (
+        'Убедитесь, что при создании комментария увеличивается '
+        'счётчик `comment_count` публикации.'
+    )
+    comments[0].delete()
+    assert stored_count(post) == 2
+    Comment.objects.filter(post=post).delete()
+    assert stored_count(post) == 0, (
+        'Убедитесь, что массовое удаление комментариев '
+        'уменьшает счётчик `comment_count` публикации.'
+    )
+
+
+@pytest.mark.django_db
+def test_recount_comments_repairs_counter(
+        mixer, user, post_with_published_location):
+    post = post_with_published_location
+    mixer.cycle(2).blend(Comment, post=post, author=user)
+    Post.objects.filter(pk=post.pk).update(comment_count=42)
+    call_command('recount_comments', batch_size=1)
+    assert stored_count(post) == 2
+
+
+@pytest.mark.django_db
+def test_edit_keeps_concurrent_comment(
+        user_client, another_user, post_with_published_location):
+    post = post_with_published_location
+
+    def load_then_comment(*args, **kwargs):
+        loaded = get_object_or_404(*args, **kwargs)
+        Comment.objects.create(post=loaded, author=another_user, text='Текст')
+        return loaded
+
+    with mock.patch.object(views, 'get_object_or_404', load_then_comment):
+        response = user_client.post(f'/posts/{post.id}/edit/', {
+            'title': 'Новый заголовок', 'text': post.text,
+            'pub_date': post.pub_date.strftime('%Y-%m-%d %H:%M'),
+            'category': post.category_id, 'location': post.location_id,
+        })
+    assert response.status_code == 302
+    assert Post.objects.get(pk=post.pk).title == 'Новый заголовок'
+    assert stored_count(post) == 1, (
+        'Убедитесь, что редактирование публикации не затирает счётчик '
+        'комментариев, изменённый параллельно.')
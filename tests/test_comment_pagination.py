@@ -0,0 +1,61 @@
+import re
+from http import HTTPStatus
+
+import pytest
+from django.http import Http404
+from django.test import RequestFactory
+
+from blog.views import COMMENTS_PER_PAGE, post_comments
+
+N_COMMENTS = COMMENTS_PER_PAGE * 2 + 5
+COMMENT_ANCHOR = re.compile(r'name="comment_(\d+)"')
+
+
+@pytest.fixture
+def long_thread(mixer, post_with_published_location):
+    post = post_with_published_location
+    comments = mixer.cycle(N_COMMENTS).blend('blog.Comment', post=post)
+    return post, sorted(c.id for c in comments)
+
+
+def comment_ids(content):
+    return [int(pk) for pk in COMMENT_ANCHOR.findall(content)]
+
+
+@pytest.mark.django_db
+def test_load_more_walks_whole_thread(client, long_thread):
+    post, expected_ids = long_thread
+    url = f'/posts/{post.id}/comments/'
+    seen = []
+    while url:
+        response = client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        content = response.content.decode('utf-8')
+        page_ids = comment_ids(content)
+        assert len(page_ids) <= COMMENTS_PER_PAGE, (
+            'Убедитесь, что комментарии отдаются порциями.')
+        seen.extend(page_ids)
+        match = re.search(r'data-fragment-url="([^"]+)"', content)
+        url = match and match.group(1).replace('&amp;', '&')
+    assert seen == expected_ids
+
+
+@pytest.mark.django_db
+def test_streamed_thread(client, long_thread):
+    post, expected_ids = long_thread
+    response = client.get(f'/posts/{post.id}/comments/?stream=1')
+    assert response.streaming
+    content = b''.join(response.streaming_content).decode('utf-8')
+    assert comment_ids(content) == expected_ids
+
+
+@pytest.mark.django_db
+def test_comments_of_hidden_post_are_404(
+        another_user, post_with_published_location):
+    post = post_with_published_location
+    post.is_published = False
+    post.save()
+    request = RequestFactory().get(f'/posts/{post.id}/comments/')
+    request.user = another_user
+    with pytest.raises(Http404):
+        post_comments(request, post_id=post.id)
@@ -0,0 +1,223 @@
+import time
+from unittest import mock
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import AnonymousUser
+from django.http import HttpResponse
+from django.test import RequestFactory
+from django.utils import timezone
+from django.utils.http import http_date
+
+from blog import async_views, cache as blog_cache, views
+from blog.conditional import conditional_page, latest, page_validators
+from blog.models import Comment
+
+STATE = (timezone.now(), ('parts',))
+
+
+@pytest.fixture(autouse=True)
+def clear_page_cache():
+    blog_cache.page_cache().clear()
+
+
+@pytest.fixture
+def counting_view():
+    calls = []
+
+    @conditional_page(lambda request: STATE)
+    def page(request):
+        calls.append(request)
+        return HttpResponse(f'render #{len(calls)}')
+
+    return page, calls
+
+
+def get(user, path='/', **headers):
+    request = RequestFactory().get(path, **headers)
+    request.user = user
+    return request
+
+
+def etag_of(state_func, user=None, path='/', **kwargs):
+    request = get(user or AnonymousUser(), path)
+    return page_validators(request, state_func(request, **kwargs))[0]
+
+
+def last_modified_of(state_func, user=None, **kwargs):
+    request = get(user or AnonymousUser())
+    return page_validators(request, state_func(request, **kwargs))[1]
+
+
+def later(seconds=5):
+    """Часы blog.cache на seconds впереди: отметки сброса различимы"""
+    return mock.patch.object(blog_cache.time, 'time_ns',
+                             return_value=time.time_ns() + seconds * 10 ** 9)
+
+
+def not_rendered(*args, **kwargs):
+    raise AssertionError('Шаблон не должен рендериться при ответе 304')
+
+
+@pytest.mark.django_db
+def test_validators_and_not_modified(counting_view, user):
+    page, calls = counting_view
+    response = page(get(AnonymousUser()))
+    etag = response['ETag']
+    assert response['Last-Modified'] == http_date(
+        latest(STATE[0], blog_cache.last_purge()).timestamp())
+    assert response['Cache-Control'] == 'no-cache'
+    not_modified = page(get(AnonymousUser(), HTTP_IF_NONE_MATCH=etag))
+    assert not_modified.status_code == 304 and len(calls) == 1
+    assert not_modified['ETag'] == etag
+    assert page(get(AnonymousUser(), HTTP_IF_MODIFIED_SINCE=response[
+        'Last-Modified'])).status_code == 304
+    own = page(get(user, HTTP_IF_NONE_MATCH=etag))
+    assert own.status_code == 200 and own['ETag'] != etag, (
+        'Убедитесь, что ETag зависит от пользователя.')
+    assert 'private' in own['Cache-Control']
+
+
+@pytest.mark.django_db
+def test_etag_follows_csrf_cookie(counting_view, user):
+    page, calls = counting_view
+
+    def etag(cookie):
+        request = get(user)
+        request.META['CSRF_COOKIE'] = cookie
+        return page(request)['ETag']
+
+    assert etag('a' * 64) == etag('a' * 64)
+    assert etag('a' * 64) != etag('b' * 64), (
+        'Убедитесь, что ETag авторизованного зависит от CSRF-cookie.')
+
+
+@pytest.mark.django_db
+def test_page_cache_answers_not_modified():
+    states = []
+
+    def state(request):
+        states.append(request)
+        return STATE
+
+    @blog_cache.anonymous_page_cache
+    @conditional_page(state)
+    def page(request):
+        return HttpResponse('страница')
+
+    etag = page(get(AnonymousUser()))['ETag']
+    response = page(get(AnonymousUser(), HTTP_IF_NONE_MATCH=etag))
+    assert response.status_code == 304 and response['ETag'] == etag
+    assert len(states) == 1, (
+        'Убедитесь, что страница из кэша сверяется без запроса состояния.')
+
+
+@pytest.mark.django_db
+def test_no_validators_for_post(counting_view):
+    page, calls = counting_view
+    request = RequestFactory().post('/')
+    request.user = AnonymousUser()
+    assert not page(request).has_header('ETag')
+
+
+@pytest.mark.django_db
+def test_feed_state_follows_changes(
+        user, another_user, post_with_published_location):
+    post = post_with_published_location
+    seen = {etag_of(views.index_state)}
+
+    def changed():
+        etag = etag_of(views.index_state)
+        assert etag not in seen
+        seen.add(etag)
+
+    comment = Comment.objects.create(post=post, author=user, text='Текст')
+    changed()
+    post.category.title = 'Новое название'
+    post.category.save()
+    changed()
+    post.location.name = 'Новое место'
+    post.location.save()
+    changed()
+    user.username = 'renamed'
+    user.save()
+    changed()
+    comment.delete()
+    changed()
+    user.last_login = timezone.now()
+    user.save(update_fields=['last_login'])
+    assert etag_of(views.index_state) in seen, (
+        'Убедитесь, что вход автора не меняет ETag ленты.')
+    post.delete()
+    changed()
+
+
+@pytest.mark.django_db
+def test_post_detail_state(user, another_user, post_with_published_location):
+    post = post_with_published_location
+    before = etag_of(views.post_detail_state, post_id=post.id)
+    comment = Comment.objects.create(post=post, author=user, text='Текст')
+    added = etag_of(views.post_detail_state, post_id=post.id)
+    comment.text = 'Исправленный текст'
+    comment.save()
+    edited = etag_of(views.post_detail_state, post_id=post.id)
+    assert len({before, added, edited}) == 3
+    post.is_published = False
+    post.save()
+    request = get(another_user)
+    assert views.post_detail_state(request, post_id=post.id) is None
+    request = get(user)
+    assert views.post_detail_state(request, post_id=post.id) is not None
+
+
+@pytest.mark.django_db
+def test_profile_and_legacy_pages(user, post_with_published_location):
+    before = etag_of(views.profile_state, username=user.username)
+    user.first_name = 'Имя'
+    user.save()
+    assert etag_of(views.profile_state, username=user.username) != before
+    request = get(AnonymousUser(), '/?page=2')
+    assert views.index_state(request) is None
+
+
+@pytest.mark.django_db
+def test_not_modified_skips_rendering(client, post_with_published_location):
+    category = post_with_published_location.category
+    path = f'/category/{category.slug}/'
+    etag = etag_of(views.category_posts_state, path=path,
+                   category_slug=category.slug)
+    with mock.patch.object(views, 'render', not_rendered):
+        response = client.get(path, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 304
+
+
+@pytest.mark.django_db
+def test_async_post_detail_not_modified(post_with_published_location):
+    post = post_with_published_location
+    etag = etag_of(views.post_detail_state, post_id=post.id)
+    request = get(AnonymousUser(), HTTP_IF_NONE_MATCH=etag)
+    with mock.patch.object(async_views, 'render', not_rendered):
+        response = async_to_sync(async_views.post_detail)(
+            request, post_id=post.id)
+    assert response.status_code == 304
+
+
+@pytest.mark.django_db
+def test_last_modified_grows_on_delete_and_profile_edit(
+        user, mixer, post_with_published_location):
+    post = post_with_published_location
+    mixer.blend('blog.Post', author=user, category=post.category,
+                is_published=True, pub_date=post.pub_date)
+    before = last_modified_of(views.index_state)
+    with later(5):
+        post.delete()
+    assert last_modified_of(views.index_state) > before, (
+        'Убедитесь, что удаление публикации сдвигает Last-Modified ленты.')
+
+    before = last_modified_of(views.profile_state, username=user.username)
+    with later(10):
+        user.first_name = 'Имя'
+        user.save()
+    assert last_modified_of(
+        views.profile_state, username=user.username) > before, (
+        'Убедитесь, что правка профиля сдвигает Last-Modified.')
@@ -0,0 +1,22 @@
+import pytest
+from django.conf import settings
+from django.db import connection
+from django.db.backends.sqlite3.base import DatabaseWrapper
+
+
+@pytest.mark.django_db
+def test_new_sqlite_connections_are_tuned(tmp_path):
+    wrapper = DatabaseWrapper(
+        {**connection.settings_dict, 'NAME': str(tmp_path / 'db.sqlite3')},
+        alias='tuning')
+    try:
+        with wrapper.cursor() as cursor:
+            cursor.execute('PRAGMA journal_mode')
+            assert cursor.fetchone()[0] == 'wal'
+            cursor.execute('PRAGMA busy_timeout')
+            assert cursor.fetchone()[0] == (
+                settings.SQLITE_PRAGMAS['busy_timeout'])
+            cursor.execute('PRAGMA synchronous')
+            assert cursor.fetchone()[0] == 1, 'Ожидался synchronous=NORMAL.'
+    finally:
+        wrapper.close()
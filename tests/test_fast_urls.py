@@ -0,0 +1,90 @@
+import pytest
+from django.template import engines
+from django.urls import (
+    NoReverseMatch, get_resolver, reverse, set_script_prefix,
+)
+from django.urls.converters import (
+    IntConverter, PathConverter, SlugConverter, StringConverter,
+)
+
+from blog.fasturls import compiled_urls, fast_reverse
+
+SAMPLES = {
+    IntConverter: 42,
+    SlugConverter: 'my-slug_1',
+    StringConverter: 'имя с пробелом',
+    PathConverter: 'a/b c',
+}
+
+
+@pytest.fixture
+def script_prefix():
+    yield set_script_prefix
+    set_script_prefix('/')
+
+
+def sample_calls(urlconf, namespace):
+    """(имя, args, kwargs) для каждого варианта каждого маршрута"""
+    urls = compiled_urls(get_resolver(urlconf))
+    for name, candidates in urls.routes.items():
+        if not name.startswith(namespace):
+            continue
+        for candidate in candidates:
+            kwargs = {
+                param: SAMPLES[type(candidate.converters[param])]
+                for param in candidate.params
+            }
+            yield name, [kwargs[param] for param in candidate.params], None
+            yield name, None, kwargs
+
+
+def route_calls():
+    return ([('blogicum.urls', *call)
+             for call in sample_calls('blogicum.urls', 'blog:')]
+            + [('users.urls', *call)
+               for call in sample_calls('users.urls', '')])
+
+
+def test_every_route_is_compiled():
+    names = {name for _, name, _, _ in route_calls()}
+    assert {'blog:index', 'blog:post_detail', 'blog:edit_comment',
+            'blog:profile', 'registration', 'password_reset_confirm'} <= names
+
+
+@pytest.mark.parametrize('prefix', ['/', '/блог/'])
+@pytest.mark.parametrize('urlconf,name,args,kwargs', route_calls())
+def test_matches_reverse(script_prefix, prefix, urlconf, name, args,
+                         kwargs):
+    script_prefix(prefix)
+    expected = reverse(name, urlconf=urlconf, args=args, kwargs=kwargs)
+    urls = compiled_urls(get_resolver(urlconf))
+    assert urls.reverse(name, args, kwargs) == expected
+
+
+@pytest.mark.parametrize('name,args', [
+    ('blog:profile', ['не@слаг']),
+    ('blog:post_detail', ['abc']),
+    ('blog:post_detail', [1, 2]),
+    ('blog:missing', []),
+])
+def test_same_errors_as_reverse(name, args):
+    with pytest.raises(NoReverseMatch):
+        reverse(name, args=args)
+    with pytest.raises(NoReverseMatch):
+        fast_reverse(name, args)
+
+
+def test_fast_url_tag_matches_url_tag():
+    engine = engines.all()[0]
+    fast = engine.from_string(
+        "{% load blog_tags %}{% fast_url 'blog:profile' name %} "
+        "{% fast_url 'blog:edit_comment' post_id=1 comment_id=2 %}")
+    plain = engine.from_string(
+        "{% url 'blog:profile' name %} "
+        "{% url 'blog:edit_comment' post_id=1 comment_id=2 %}")
+    context = {'name': 'user<&>'}
+    for template in (fast, plain):
+        with pytest.raises(NoReverseMatch):
+            template.render(context)
+    context = {'name': 'user-1'}
+    assert fast.render(context) == plain.render(context)
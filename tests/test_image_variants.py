@@ -0,0 +1,62 @@
+import re
+from datetime import timedelta
+from io import BytesIO
+
+import pytest
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.template import Context, Template
+from django.utils import timezone
+from PIL import Image
+
+from blog.images import build_variants, variant_name
+from blog.models import PublishedPost
+
+
+@pytest.fixture
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    return tmp_path
+
+
+def jpeg(width, height):
+    buffer = BytesIO()
+    Image.new('RGB', (width, height), 'teal').save(buffer, 'JPEG')
+    return ContentFile(buffer.getvalue(), name='photo.jpg')
+
+
+def test_variants_are_not_upscaled(media_root):
+    name = default_storage.save('posts_images/photo.jpg', jpeg(1000, 500))
+    widths = build_variants(name)
+    assert widths == [320, 640, 960, 1000]
+    for width in widths:
+        for extension in ('webp', 'jpg'):
+            path = media_root / variant_name(name, width, extension)
+            with Image.open(path) as image:
+                assert image.width == width
+                assert image.height == width // 2
+
+
+@pytest.mark.django_db
+def test_backfill_and_picture_markup(media_root, mixer, user):
+    post = mixer.blend('blog.Post', author=user, image=None,
+                       is_published=True, category__is_published=True,
+                       pub_date=timezone.now() - timedelta(days=1))
+    post.image.save('photo.jpg', jpeg(800, 600))
+    assert post.image_variants == []
+
+    call_command('build_image_variants', workers=2)
+    post.refresh_from_db()
+    assert post.image_variants == [320, 640, 800]
+    assert PublishedPost.objects.get(pk=post.pk).image_variants == [
+        320, 640, 800], 'Убедитесь, что витрина получила копии фото.'
+
+    html = Template(
+        '{% load blog_tags %}{% post_picture post "card" %}'
+    ).render(Context({'post': post}))
+    assert len(re.findall(r'<img\b', html)) == 1, (
+        'Карточка должна содержать ровно одно изображение.')
+    assert 'type="image/webp"' in html
+    assert variant_name(post.image.url, 640, 'jpg') in html
+    assert f'{variant_name(post.image.url, 800, "webp")} 800w' in html
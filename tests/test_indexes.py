@@ -0,0 +1,51 @@
+import re
+
+import pytest
+from django.db import connection
+from django.utils import timezone
+
+from blog.models import Comment
+from blog.paginators import KeysetPaginator
+from blog.views import FEED_ORDERING, get_posts, get_published_posts
+
+pytestmark = [
+    pytest.mark.django_db,
+    pytest.mark.skipif(
+        connection.vendor != 'sqlite',
+        reason='Разбор плана запроса написан для EXPLAIN QUERY PLAN SQLite'),
+]
+
+FULL_SCAN = re.compile(r'\bSCAN (blog_\w+)\b(?! USING)')
+
+
+def feed_page_query(queryset):
+    paginator = KeysetPaginator(queryset, 10, ordering=FEED_ORDERING)
+    return queryset.filter(
+        paginator._seek([timezone.now(), 1], backwards=False)
+    ).order_by(*FEED_ORDERING)[:11]
+
+
+def assert_uses_index(queryset, view_name):
+    plan = queryset.explain()
+    assert not FULL_SCAN.search(plan), (
+        f'Запрос `{view_name}` читает таблицу целиком:\n{plan}')
+    assert 'TEMP B-TREE' not in plan, (
+        f'Запрос `{view_name}` сортирует без индекса:\n{plan}')
+
+
+@pytest.mark.parametrize('make_queryset, view_name', [
+    (lambda: get_published_posts(), 'index'),
+    (lambda: get_published_posts(category_id=1), 'category_posts'),
+    (lambda: get_published_posts(author_id=1), 'profile'),
+    (lambda: get_posts(author_id=1), 'profile (автор)'),
+])
+def test_feed_queries_use_indexes(make_queryset, view_name):
+    queryset = make_queryset()
+    assert_uses_index(queryset.order_by(*FEED_ORDERING)[:11], view_name)
+    assert_uses_index(feed_page_query(queryset), view_name)
+
+
+def test_post_detail_comments_use_index():
+    assert_uses_index(
+        Comment.objects.select_related('author').filter(post_id=1),
+        'post_detail')
@@ -0,0 +1,106 @@
+from io import BytesIO
+
+import pytest
+from django.core import mail
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.utils import timezone
+from PIL import Image
+
+from jobs.models import DeadJob, Job
+from jobs.queue import LOCK_TIMEOUT, claim, task, work
+
+calls = []
+
+
+@task(name='tests.record')
+def record(value):
+    calls.append(value)
+
+
+@task(name='tests.broken', max_attempts=2)
+def broken():
+    raise RuntimeError('сломано')
+
+
+@pytest.fixture(autouse=True)
+def clear_calls():
+    calls.clear()
+
+
+@pytest.mark.django_db
+def test_job_runs_and_leaves_queue():
+    record.delay('готово')
+    assert calls == []
+    assert work(burst=True) == 1
+    assert calls == ['готово']
+    assert not Job.objects.exists()
+
+
+@pytest.mark.django_db
+def test_failed_job_backs_off_then_dead_letters():
+    broken.delay()
+    assert work(burst=True) == 0
+    job = Job.objects.get()
+    assert job.attempts == 1
+    assert job.run_after > timezone.now()
+    assert 'RuntimeError' in job.last_error
+    assert work(burst=True) == 0, 'Отложенная задача не должна браться.'
+
+    Job.objects.update(run_after=timezone.now())
+    work(burst=True)
+    assert not Job.objects.exists()
+    dead = DeadJob.objects.get()
+    assert dead.name == 'tests.broken' and dead.attempts == 2
+
+
+@pytest.mark.django_db
+def test_attempt_counted_when_claimed():
+    broken.delay()
+    assert claim('упавший').attempts == 1
+    Job.objects.update(locked_at=timezone.now() - LOCK_TIMEOUT * 2)
+    assert claim('второй').attempts == 2
+    Job.objects.update(locked_at=timezone.now() - LOCK_TIMEOUT * 2)
+    work(burst=True)
+    assert not Job.objects.exists(), (
+        'Задача, на которой падает обработчик, должна отбрасываться.')
+    assert DeadJob.objects.get().name == 'tests.broken'
+
+
+@pytest.mark.django_db
+def test_image_variants_built_by_worker(
+        settings, tmp_path, mixer, user_client):
+    settings.MEDIA_ROOT = tmp_path
+    buffer = BytesIO()
+    Image.new('RGB', (700, 400), 'navy').save(buffer, 'JPEG')
+    category = mixer.blend('blog.Category', is_published=True)
+    location = mixer.blend('blog.Location')
+    response = user_client.post('/posts/create/', {
+        'title': 'Фото', 'text': 'Текст', 'pub_date': '2020-01-01 00:00',
+        'category': category.id, 'location': location.id,
+        'image': SimpleUploadedFile('photo.jpg', buffer.getvalue(),
+                                    content_type='image/jpeg'),
+    })
+    assert response.status_code == 302
+    post = category.posts.get()
+    assert post.image_variants == [], 'Копии строятся вне запроса.'
+    assert Job.objects.filter(name__endswith='build_post_image_variants')
+
+    work(burst=True)
+    post.refresh_from_db()
+    assert post.image_variants == [320, 640, 700]
+
+
+@pytest.mark.django_db
+def test_password_reset_mail_sent_by_worker(client, django_user_model):
+    django_user_model.objects.create_user(
+        username='reader', email='reader@example.com', password='secret')
+    response = client.post('/auth/password_reset/',
+                           {'email': 'reader@example.com'})
+    assert response.status_code == 302
+    assert mail.outbox == []
+    payload = str(Job.objects.get().payload)
+    assert 'token' not in payload and 'uid' not in payload, (
+        'Токен сброса пароля не должен храниться в очереди.')
+    work(burst=True)
+    assert len(mail.outbox) == 1
+    assert mail.outbox[0].to == ['reader@example.com']
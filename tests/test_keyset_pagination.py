@@ -0,0 +1,89 @@
+from datetime import timedelta
+
+import pytest
+from django.core.cache import caches
+from django.utils import timezone
+
+from blog.models import Post
+from blog.paginators import KeysetPaginator, encode_cursor, CURSOR_NEXT
+
+PER_PAGE = 4
+
+
+@pytest.fixture
+def feed_posts(mixer, user):
+    now = timezone.now()
+    # Несколько публикаций с одинаковой датой проверяют разбор по id.
+    pub_dates = [now - timedelta(days=i // 2) for i in range(11)]
+    return mixer.cycle(len(pub_dates)).blend(
+        'blog.Post', author=user, pub_date=(d for d in pub_dates))
+
+
+def expected_order(posts):
+    return sorted(posts, key=lambda p: (p.pub_date, p.id), reverse=True)
+
+
+@pytest.mark.django_db
+def test_keyset_walks_whole_feed(feed_posts):
+    paginator = KeysetPaginator(Post.objects.all(), PER_PAGE)
+    page = paginator.get_page()
+    assert not page.has_previous()
+    seen = list(page)
+    while page.has_next():
+        page = paginator.get_page(page.next_cursor)
+        assert page.has_previous()
+        seen.extend(page)
+    assert seen == expected_order(feed_posts), (
+        'Убедитесь, что курсорная пагинация выводит все публикации '
+        'по одному разу, «от новых к старым».'
+    )
+
+
+@pytest.mark.django_db
+def test_keyset_previous_returns_same_page(feed_posts):
+    paginator = KeysetPaginator(Post.objects.all(), PER_PAGE)
+    first = paginator.get_page()
+    second = paginator.get_page(first.next_cursor)
+    third = paginator.get_page(second.next_cursor)
+    back = paginator.get_page(third.previous_cursor)
+    assert list(back) == list(second)
+    assert list(paginator.get_page(second.previous_cursor)) == list(first)
+
+
+@pytest.mark.django_db
+def test_keyset_bad_cursor_falls_back_to_first_page(feed_posts):
+    paginator = KeysetPaginator(Post.objects.all(), PER_PAGE)
+    first = list(paginator.get_page())
+    assert list(paginator.get_page('мусор')) == first
+    assert list(paginator.get_page(
+        encode_cursor(CURSOR_NEXT, ['not-a-date', 1]))) == first
+
+
+@pytest.mark.django_db
+def test_keyset_query_has_no_offset(feed_posts, django_assert_num_queries):
+    paginator = KeysetPaginator(Post.objects.all(), PER_PAGE)
+    cursor = paginator.get_page().next_cursor
+    with django_assert_num_queries(1) as context:
+        list(paginator.get_page(cursor))
+    sql = context.captured_queries[0]['sql'].upper()
+    assert 'OFFSET' not in sql and 'COUNT(' not in sql
+
+
+@pytest.mark.django_db
+def test_approximate_count_keyed_by_feed(feed_posts, mixer, user):
+    caches['default'].clear()
+
+    def count(key, queryset=None):
+        return KeysetPaginator(
+            queryset or Post.objects.filter(pub_date__lte=timezone.now()),
+            PER_PAGE, count_cache_timeout=60, count_key=key,
+        ).approximate_count
+
+    assert count(('feed',)) == len(feed_posts)
+    mixer.blend('blog.Post', author=user,
+                pub_date=timezone.now() - timedelta(days=1))
+    assert count(('feed',)) == len(feed_posts), (
+        'Убедитесь, что число публикаций ленты берётся из кэша по её '
+        'имени, а не по тексту запроса со временем.')
+    assert count(('other',)) == len(feed_posts) + 1
+    assert count(None) is None
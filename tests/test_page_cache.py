@@ -0,0 +1,98 @@
+from datetime import timedelta
+
+import pytest
+from django.contrib.auth.models import AnonymousUser
+from django.http import HttpResponse
+from django.test import RequestFactory
+from django.utils import timezone
+
+from blog import cache as blog_cache
+from blog.models import Comment, Post
+from blog.published import publish_due_posts
+
+
+@pytest.fixture(autouse=True)
+def clear_page_cache():
+    blog_cache.page_cache().clear()
+
+
+@pytest.fixture
+def counting_view():
+    calls = []
+
+    @blog_cache.anonymous_page_cache
+    def feed(request):
+        calls.append(request)
+        return HttpResponse(f'render #{len(calls)}')
+
+    return feed, calls
+
+
+def get(user, path='/'):
+    request = RequestFactory().get(path)
+    request.user = user
+    return request
+
+
+@pytest.mark.django_db
+def test_anonymous_pages_are_cached(counting_view, user):
+    feed, calls = counting_view
+    first = feed(get(AnonymousUser()))
+    second = feed(get(AnonymousUser()))
+    assert first.content == second.content and len(calls) == 1, (
+        'Убедитесь, что страница ленты для анонимов берётся из кэша.')
+    feed(get(AnonymousUser(), '/?cursor=abc'))
+    feed(get(user))
+    assert len(calls) == 3
+    assert blog_cache.page_stats()['feed'] == {'hit': 1, 'miss': 2}
+
+
+@pytest.mark.django_db
+def test_pages_purged_on_new_comment(
+        counting_view, user, post_with_published_location):
+    feed, calls = counting_view
+    feed(get(AnonymousUser()))
+    Comment.objects.create(
+        post=post_with_published_location, author=user, text='Текст')
+    feed(get(AnonymousUser()))
+    assert len(calls) == 2, (
+        'Убедитесь, что новый комментарий сбрасывает кэш страниц лент.')
+
+
+@pytest.mark.django_db
+def test_pages_purged_when_deferred_post_published(
+        counting_view, post_with_published_location):
+    feed, calls = counting_view
+    post = post_with_published_location
+    Post.objects.filter(pk=post.pk).update(is_visible=False)
+    feed(get(AnonymousUser()))
+    assert publish_due_posts() == [post.pk]
+    feed(get(AnonymousUser()))
+    assert len(calls) == 2, (
+        'Убедитесь, что включение отложенной публикации сбрасывает '
+        'кэш страниц лент.')
+
+
+@pytest.mark.django_db
+def test_login_keeps_pages(client, counting_view, user):
+    feed, calls = counting_view
+    feed(get(AnonymousUser()))
+    client.force_login(user)
+    feed(get(AnonymousUser()))
+    assert len(calls) == 1, (
+        'Убедитесь, что вход пользователя не сбрасывает кэш страниц.')
+    user.first_name = 'Имя'
+    user.save()
+    feed(get(AnonymousUser()))
+    assert len(calls) == 2
+
+
+@pytest.mark.django_db
+def test_timeout_ends_at_next_deferred_post(mixer, user):
+    now = timezone.now()
+    assert blog_cache.page_timeout(now) == blog_cache.PAGE_CACHE_TIMEOUT
+    mixer.blend('blog.Post', author=user, is_published=True,
+                pub_date=now + timedelta(seconds=42))
+    assert blog_cache.page_timeout(now) == 42, (
+        'Убедитесь, что страница живёт в кэше не дольше, чем до '
+        'ближайшей отложенной публикации.')
@@ -0,0 +1,63 @@
+from unittest import mock
+
+import pytest
+from django.template.loader import render_to_string
+
+from blog import cache as blog_cache
+from blog.models import Comment, Post
+
+
+@pytest.fixture(autouse=True)
+def clear_fragment_cache():
+    blog_cache.fragment_cache().clear()
+
+
+@pytest.fixture
+def page_posts(mixer, user, published_category, published_location):
+    mixer.cycle(5).blend(
+        Post, author=user, category=published_category,
+        location=published_location)
+    return Post.objects.select_related(
+        'author', 'category', 'location').order_by('id')
+
+
+def render_counting(posts):
+    with mock.patch.object(
+            blog_cache, 'render_post_card',
+            wraps=blog_cache.render_post_card) as render:
+        cards = blog_cache.render_post_cards(posts)
+    return cards, render.call_count
+
+
+@pytest.mark.django_db
+def test_cards_match_template(page_posts):
+    cards, _ = render_counting(page_posts)
+    assert cards == [
+        render_to_string(blog_cache.POST_CARD_TEMPLATE, {'post': post})
+        for post in page_posts
+    ]
+
+
+@pytest.mark.django_db
+def test_only_changed_cards_are_rendered(
+        page_posts, user, published_category,
+        django_capture_on_commit_callbacks):
+    _, first_renders = render_counting(page_posts)
+    assert first_renders == len(page_posts)
+    _, renders = render_counting(page_posts)
+    assert renders == 0, (
+        'Убедитесь, что неизменившиеся карточки берутся из кэша.')
+
+    post = page_posts[0]
+    with django_capture_on_commit_callbacks(execute=True):
+        Comment.objects.create(post=post, author=user, text='Текст')
+    _, renders = render_counting(page_posts)
+    assert renders == 1, (
+        'Убедитесь, что новый комментарий сбрасывает кэш '
+        'только карточки своей публикации.')
+
+    with django_capture_on_commit_callbacks(execute=True):
+        published_category.is_published = False
+        published_category.save()
+    _, renders = render_counting(page_posts)
+    assert renders == len(page_posts)
@@ -0,0 +1,73 @@
+from datetime import timedelta
+
+import pytest
+from django.template import engines
+from django.template.loader import render_to_string
+from django.utils import timezone
+
+from blog.cache import POST_CARD_TEMPLATE
+from blog.cards import render_post_card, render_post_cards
+from blog.models import Post, PublishedPost
+
+pytestmark = pytest.mark.django_db
+
+LONG_TEXT = ('Очень длинный текст <script>alert("x")</script> & ещё '
+             'много слов, чтобы обрезка сработала на десятом слове точно')
+
+
+def template_card(post):
+    return render_to_string(POST_CARD_TEMPLATE, {'post': post})
+
+
+@pytest.fixture
+def make_post(mixer, user, published_category, published_location):
+    def make(**kwargs):
+        kwargs.setdefault('author', user)
+        kwargs.setdefault('category', published_category)
+        kwargs.setdefault('location', published_location)
+        kwargs.setdefault('image', '')
+        post = mixer.blend(Post, **kwargs)
+        return Post.objects.select_related(
+            'author', 'category', 'location').get(pk=post.pk)
+
+    return make
+
+
+@pytest.mark.parametrize('kwargs', [
+    {},
+    {'title': 'Кавычки "и" <теги> & амперсанд', 'text': LONG_TEXT},
+    {'text': 'коротко'},
+    {'location': None},
+    {'is_published': False},
+    {'comment_count': 12345},
+    {'pub_date': timezone.now() + timedelta(days=3)},
+    {'image': 'posts_images/photo.jpg'},
+    {'image': 'posts_images/photo.jpg', 'image_variants': [320, 640, 960]},
+])
+def test_card_matches_template(make_post, kwargs):
+    post = make_post(**kwargs)
+    assert render_post_card(post) == template_card(post)
+
+
+def test_unpublished_location_and_category(make_post, mixer):
+    post = make_post(
+        location=mixer.blend('blog.Location', is_published=False))
+    post.category.is_published = False
+    assert render_post_card(post) == template_card(post)
+
+
+def test_feed_rows_match_template(make_post, another_user):
+    make_post()
+    make_post(author=another_user, location=None)
+    posts = [row.as_post() for row in PublishedPost.objects.order_by('id')]
+    assert render_post_cards(posts) == [
+        template_card(post) for post in posts]
+
+
+def test_cards_tag_does_not_escape(make_post):
+    post = make_post()
+    template = engines.all()[0].from_string(
+        '{% load blog_tags %}{% cached_post_cards posts as cards %}'
+        '{% for card in cards %}{{ card }}{% endfor %}')
+    for _ in range(2):
+        assert template.render({'posts': [post]}) == template_card(post)
@@ -0,0 +1,60 @@
+from unittest import mock
+
+import pytest
+from django.contrib.auth import urls as auth_urls
+from django.http import Http404, HttpResponse
+from django.test import RequestFactory
+from django.urls import include, path, reverse
+
+from blog import views
+from users import urls as users_urls
+
+# Агрегат для ETag, публикация вместе с автором, категорией и местом,
+# комментарии с авторами.
+POST_DETAIL_QUERIES = 3
+
+# Шаблоны ссылаются на пространство имён users (профиль, вход и
+# выход), которого нет в blogicum.urls: страница рендерится целиком с ним.
+urlpatterns = [
+    path('', include('blogicum.urls')),
+    path('users/', include(
+        (users_urls.urlpatterns + auth_urls.urlpatterns, 'users'))),
+]
+
+
+def detail_url(post):
+    return reverse('blog:post_detail', args=[post.id])
+
+
+def get_detail(user, post_id):
+    """Представление без шаблона: проверяется только видимость"""
+    request = RequestFactory().get(f'/posts/{post_id}/')
+    request.user = user
+    with mock.patch.object(views, 'render', lambda *args: HttpResponse()):
+        return views.post_detail(request, post_id=post_id)
+
+
+@pytest.mark.urls(__name__)
+@pytest.mark.django_db
+@pytest.mark.parametrize('n_comments', [0, 1, 25])
+def test_post_detail_query_count_is_fixed(
+        client, mixer, post_with_published_location, n_comments,
+        django_assert_num_queries):
+    post = post_with_published_location
+    mixer.cycle(n_comments).blend('blog.Comment', post=post)
+    with django_assert_num_queries(POST_DETAIL_QUERIES):
+        response = client.get(detail_url(post))
+    assert response.status_code == 200
+    assert 'blog/post_detail.html' in [
+        template.name for template in response.templates]
+
+
+@pytest.mark.django_db
+def test_post_detail_hides_unpublished_from_others(
+        mixer, user, another_user, post_with_published_location):
+    post = post_with_published_location
+    post.is_published = False
+    post.save()
+    with pytest.raises(Http404):
+        get_detail(another_user, post.id)
+    assert get_detail(user, post.id).status_code == 200
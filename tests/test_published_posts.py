@@ -0,0 +1,171 @@
+from datetime import timedelta
+from unittest import mock
+
+import pytest
+from django.contrib.auth.models import AnonymousUser
+from django.core.management import call_command
+from django.db import connection
+from django.http import HttpResponse
+from django.template.loader import render_to_string
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from blog import cache as blog_cache, views
+from blog.models import Post, PublishedPost
+from blog.published import (posts_published, publish_due_posts,
+                            seconds_until_next)
+from jobs.models import Job
+from jobs.queue import work
+
+pytestmark = pytest.mark.django_db
+
+
+def row(post):
+    return PublishedPost.objects.filter(pk=post.pk).first()
+
+
+@pytest.fixture
+def post(mixer, user, published_category, published_location):
+    return mixer.blend(
+        Post, author=user, category=published_category,
+        location=published_location, is_published=True,
+        pub_date=timezone.now() - timedelta(days=1))
+
+
+def test_row_follows_post_and_related(mixer, post):
+    assert row(post).title == post.title
+
+    post.location.name = 'Новое место'
+    post.location.save()
+    post.author.username = 'renamed'
+    post.author.save()
+    published = row(post)
+    assert published.location_name == 'Новое место'
+    assert published.author_username == 'renamed'
+
+    mixer.cycle(2).blend('blog.Comment', post=post)
+    assert row(post).comment_count == 2
+
+    post.location.is_published = False
+    post.location.save()
+    assert row(post).location_name is None
+
+    post.category.is_published = False
+    post.category.save()
+    assert row(post) is None
+    post.category.is_published = True
+    post.category.save()
+    assert row(post).comment_count == 2
+
+    post.is_published = False
+    post.save()
+    assert row(post) is None
+
+
+def test_deleting_related_objects(post):
+    post.location.delete()
+    assert row(post).location_id is None
+    post.category.delete()
+    assert row(post) is None
+
+
+def test_card_from_row_matches_post(post):
+    post.location.is_published = False
+    post.location.save()
+    original = Post.objects.select_related(
+        'author', 'category', 'location').get(pk=post.pk)
+    assert (render_to_string(blog_cache.POST_CARD_TEMPLATE,
+                             {'post': row(post).as_post()})
+            == render_to_string(blog_cache.POST_CARD_TEMPLATE,
+                                {'post': original}))
+
+
+def test_future_post_promoted_by_job(post):
+    post.pub_date = timezone.now() + timedelta(hours=1)
+    post.save()
+    post.refresh_from_db()
+    assert row(post) is None and not post.is_visible
+    job = Job.objects.get(name__endswith='promote_post')
+    assert job.run_after == post.pub_date
+
+    assert work(burst=True) == 0, 'Задача ждёт pub_date.'
+    Post.objects.filter(pk=post.pk).update(
+        pub_date=timezone.now() - timedelta(seconds=1))
+    Job.objects.update(run_after=timezone.now())
+    assert work(burst=True) == 1
+    post.refresh_from_db()
+    assert row(post) is not None and post.is_visible
+
+
+def test_scheduler_publishes_due_posts(post):
+    received = []
+
+    def receiver(sender, post_ids, **kwargs):
+        received.extend(post_ids)
+
+    posts_published.connect(receiver)
+    try:
+        post.pub_date = timezone.now() + timedelta(hours=1)
+        post.save()
+        assert publish_due_posts() == []
+        assert seconds_until_next(limit=5) == 5
+        assert 3590 < seconds_until_next() <= 3600
+        assert publish_due_posts(post.pub_date) == [post.pk]
+    finally:
+        posts_published.disconnect(receiver)
+    assert received == [post.pk]
+    assert row(post) is not None
+    assert seconds_until_next(limit=5) == 5
+
+
+def test_publish_scheduled_once(post):
+    Post.objects.filter(pk=post.pk).update(is_visible=False)
+    PublishedPost.objects.all().delete()
+    call_command('publish_scheduled', '--once')
+    assert row(post) is not None
+
+
+def test_rebuild_command(post):
+    PublishedPost.objects.filter(pk=post.pk).update(title='устарело')
+    Post.objects.update(is_visible=False)
+    call_command('sync_published_posts')
+    post.refresh_from_db()
+    assert row(post).title == post.title and post.is_visible
+
+
+@pytest.mark.django_db(transaction=True)
+def test_loaddata_builds_rows(post, tmp_path):
+    Post.objects.update(is_visible=False)
+    fixture = tmp_path / 'posts.json'
+    with open(fixture, 'w', encoding='utf-8') as file:
+        call_command('dumpdata', 'blog.post', stdout=file)
+    Post.objects.all().delete()
+    call_command('loaddata', str(fixture), verbosity=0)
+    assert Post.objects.get(pk=post.pk).is_visible, (
+        'Убедитесь, что после loaddata публикации получают видимость.')
+    assert row(post).title == post.title
+
+
+def test_feed_reads_single_table(mixer, post):
+    mixer.cycle(3).blend(
+        Post, author=post.author, category=post.category,
+        is_published=True, pub_date=timezone.now() - timedelta(hours=1))
+    blog_cache.page_cache().clear()
+    request = RequestFactory().get('/')
+    request.user = AnonymousUser()
+
+    def render_ids(request, template_name, context):
+        return HttpResponse(' '.join(
+            str(item.id) for item in context['page_obj']))
+
+    with mock.patch.object(views, 'render', render_ids), \
+            CaptureQueriesContext(connection) as queries:
+        response = views.index(request)
+    expected = Post.objects.order_by('-pub_date', '-id').values_list(
+        'id', flat=True)
+    assert response.content.decode().split() == [str(i) for i in expected]
+    feed_queries = [q['sql'] for q in queries
+                    if 'blog_publishedpost' in q['sql']]
+    assert feed_queries
+    assert not any('JOIN' in sql for sql in feed_queries)
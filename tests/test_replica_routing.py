@@ -0,0 +1,99 @@
+from unittest import mock
+
+import pytest
+from django.contrib.auth.models import AnonymousUser
+from django.core.management import call_command
+from django.db import connections
+from django.http import HttpResponse
+from django.test import RequestFactory
+
+from blog import cache as blog_cache, views
+from blog.routers import STICKY_COOKIE, PrimaryStickinessMiddleware
+
+
+@pytest.fixture
+def replica(settings, tmp_path):
+    """Вторая база SQLite, которую синхронизирует sync_replica"""
+    settings.DATABASE_REPLICAS = ('replica',)
+    primary = connections['default']
+    wrapper = primary.__class__(
+        {**primary.settings_dict, 'NAME': str(tmp_path / 'replica.db')},
+        alias='replica')
+    connections['replica'] = wrapper
+    yield wrapper
+    wrapper.close()
+    del connections['replica']
+
+
+@pytest.fixture(autouse=True)
+def clear_page_cache():
+    blog_cache.page_cache().clear()
+
+
+def render_ids(request, template_name, context):
+    return HttpResponse(' '.join(str(post.id) for post in context['page_obj']))
+
+
+def feed_ids(cookies=None):
+    request = RequestFactory().get('/')
+    request.user = AnonymousUser()
+    request.COOKIES.update(cookies or {})
+    with mock.patch.object(views, 'render', render_ids):
+        return set(map(int, views.index(request).content.split()))
+
+
+@pytest.mark.django_db(transaction=True)
+def test_feed_reads_replica_until_write(
+        settings, mixer, published_category, replica):
+    old = mixer.blend('blog.Post', category=published_category,
+                      is_published=True, pub_date='2020-01-01T00:00Z')
+    call_command('sync_replica')
+    new = mixer.blend('blog.Post', category=published_category,
+                      is_published=True, pub_date='2020-01-02T00:00Z')
+    # Окно после сброса кэша проверяет следующий тест.
+    settings.REPLICA_LAG_SECONDS = 0
+
+    assert feed_ids() == {old.id}, 'Лента должна читаться с реплики.'
+    blog_cache.page_cache().clear()
+    assert feed_ids({STICKY_COOKIE: '1'}) == {old.id, new.id}, (
+        'После записи читатель должен видеть основную базу.')
+
+
+@pytest.mark.django_db(transaction=True)
+def test_primary_after_invalidation(mixer, published_category, replica):
+    old = mixer.blend('blog.Post', category=published_category,
+                      is_published=True, pub_date='2020-01-01T00:00Z')
+    call_command('sync_replica')
+    new = mixer.blend('blog.Post', category=published_category,
+                      is_published=True, pub_date='2020-01-02T00:00Z')
+    assert feed_ids() == {old.id, new.id}, (
+        'Сразу после сброса кэша лента должна читаться с основной базы.')
+
+
+@pytest.mark.django_db(transaction=True)
+def test_streamed_comments_read_replica(
+        settings, mixer, user, post_with_published_location, replica):
+    post = post_with_published_location
+    old = mixer.blend('blog.Comment', post=post, author=user)
+    call_command('sync_replica')
+    mixer.blend('blog.Comment', post=post, author=user)
+    settings.REPLICA_LAG_SECONDS = 0
+    request = RequestFactory().get(f'/posts/{post.id}/comments/?stream=1')
+    request.user = AnonymousUser()
+    response = views.post_comments(request, post_id=post.id)
+    with mock.patch.object(
+            views, 'render_to_string',
+            lambda name, context, request: ' '.join(
+                str(comment.id) for comment in context['comments'])):
+        streamed = b''.join(response.streaming_content).decode()
+    assert streamed == str(old.id), (
+        'Поток комментариев должен читаться с реплики.')
+
+
+def test_writes_set_sticky_cookie(settings):
+    settings.DATABASE_REPLICAS = ('replica',)
+    middleware = PrimaryStickinessMiddleware(lambda request: HttpResponse())
+    factory = RequestFactory()
+    assert STICKY_COOKIE in middleware(factory.post('/posts/1/comment/')
+                                       ).cookies
+    assert STICKY_COOKIE not in middleware(factory.get('/')).cookies
@@ -0,0 +1,113 @@
+from datetime import timedelta
+from unittest import mock
+
+import pytest
+from django.contrib.auth.models import AnonymousUser
+from django.core.management import call_command
+from django.http import HttpResponse
+from django.test import RequestFactory
+from django.utils import timezone
+
+from blog import cache as blog_cache, search, views
+from blog.models import Post
+from blog.search import search_posts, stems
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def clear_page_cache():
+    blog_cache.page_cache().clear()
+
+
+@pytest.fixture
+def make_post(mixer, user, published_category):
+    def make(title, text='', **kwargs):
+        kwargs.setdefault('pub_date', timezone.now() - timedelta(days=1))
+        kwargs.setdefault('is_published', True)
+        return mixer.blend(
+            Post, author=user, category=published_category,
+            title=title, text=text, **kwargs)
+
+    return make
+
+
+def found(query):
+    return sorted(search_posts(query).values_list('id', flat=True))
+
+
+def test_russian_word_forms_share_stem():
+    assert stems('Котики') == stems('котиков')
+    assert stems('ёлка') == stems('елки')
+
+
+def test_search_matches_word_forms(make_post):
+    post = make_post('Прогулка с котиками', 'Жаркий летний день')
+    make_post('Про собак')
+    assert found('котик') == [post.id]
+    assert found('жаркого летнего') == [post.id]
+    assert found('котик собака') == []
+
+
+def test_dense_matches_scan_feed_index(make_post, monkeypatch):
+    posts = [make_post(f'Море {i}') for i in range(3)]
+    make_post('Горы')
+    monkeypatch.setattr(search, 'DENSE_MATCHES', 2)
+    query = str(search_posts('море').query)
+    assert 'EXISTS' in query
+    assert found('море') == sorted(post.id for post in posts)
+
+
+def test_search_follows_edits_and_deletes(make_post):
+    post = make_post('Старое название')
+    post.title = 'Новое название'
+    post.save()
+    assert found('старое') == []
+    assert found('новое') == [post.id]
+    post.delete()
+    assert found('новое') == []
+
+
+def test_search_honors_visibility(make_post):
+    make_post('Черновик про море', is_published=False)
+    make_post('Отложенное море',
+              pub_date=timezone.now() + timedelta(days=1))
+    visible = make_post('Море')
+    assert found('море') == [visible.id]
+
+
+@pytest.mark.parametrize('query', ['"', 'AND OR NOT', 'мор* (', '---'])
+def test_query_syntax_is_not_interpreted(make_post, query):
+    make_post('Море')
+    list(search_posts(query))
+
+
+def test_rebuild_command(make_post):
+    post = make_post('Горы')
+    call_command('rebuild_search_index')
+    assert found('горы') == [post.id]
+
+
+def render_ids(request, template_name, context):
+    ids = [str(post.id) for post in context.get('page_obj', ())]
+    next_cursor = getattr(context.get('page_obj'), 'next_cursor', None)
+    return HttpResponse(' '.join(ids + [f'next={next_cursor}']))
+
+
+def get(**params):
+    request = RequestFactory().get('/search/', params)
+    request.user = AnonymousUser()
+    with mock.patch.object(views, 'render', render_ids):
+        return views.search(request).content.decode().split()
+
+
+def test_search_view_pages_with_cursor(make_post):
+    posts = [make_post(f'Река номер {i}',
+                       pub_date=timezone.now() - timedelta(hours=i))
+             for i in range(views.NUMBER_OF_PAGINATOR_PAGES + 3)]
+    first = get(q='реки')
+    assert first[:-1] == [str(post.id) for post in posts[:-3]]
+    cursor = first[-1].split('=', 1)[1]
+    second = get(q='реки', cursor=cursor)
+    assert second == [str(post.id) for post in posts[-3:]] + ['next=None']
+    assert get(q='  ') == ['next=None']
@@ -0,0 +1,101 @@
+import secrets
+from datetime import timedelta
+
+import pytest
+from django.contrib.sessions.models import Session
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from blog.sessions import SessionStore, in_cookie
+
+pytestmark = pytest.mark.django_db
+
+# Случайные данные: сжатие не уложит их в cookie.
+LARGE = secrets.token_hex(3000)
+
+
+def session_queries(context):
+    return [query['sql'] for query in context.captured_queries
+            if 'django_session' in query['sql']]
+
+
+def test_login_and_requests_do_not_touch_session_table(
+        client, user, post_with_published_location):
+    url = f'/posts/{post_with_published_location.id}/comment/'
+    with CaptureQueriesContext(connection) as context:
+        client.force_login(user)
+        for _ in range(2):
+            response = client.post(url, {'text': 'Комментарий'})
+            assert response.status_code == 302
+    assert session_queries(context) == []
+    assert post_with_published_location.comments.count() == 2
+    assert in_cookie(client.cookies['sessionid'].value)
+    assert client.session['_auth_user_id'] == str(user.pk)
+
+
+def test_large_session_moves_to_database_and_back():
+    store = SessionStore()
+    store['blob'] = LARGE
+    store.save()
+    assert not in_cookie(store.session_key)
+    assert Session.objects.filter(pk=store.session_key).exists()
+    server_key = store.session_key
+
+    loaded = SessionStore(server_key)
+    assert loaded['blob'] == LARGE
+    del loaded['blob']
+    loaded.save()
+    assert in_cookie(loaded.session_key)
+    assert not Session.objects.filter(pk=server_key).exists()
+
+
+def test_unchanged_session_is_not_written():
+    store = SessionStore()
+    store['blob'] = LARGE
+    store.save()
+    loaded = SessionStore(store.session_key)
+    loaded['blob'] = LARGE
+    assert loaded.modified
+    with CaptureQueriesContext(connection) as context:
+        loaded.save()
+    assert context.captured_queries == []
+
+
+def test_tampered_cookie_starts_new_session():
+    store = SessionStore()
+    store['answer'] = 42
+    store.save()
+    tampered = SessionStore(store.session_key[:-2] + 'xx')
+    assert tampered.get('answer') is None
+    assert tampered.session_key is None
+
+
+def test_cycle_key_defers_write_until_save():
+    store = SessionStore()
+    store['blob'] = LARGE
+    store.save()
+    old_key = store.session_key
+    store.cycle_key()
+    assert not Session.objects.filter(pk=old_key).exists()
+    store.save()
+    assert store.session_key != old_key
+    assert SessionStore(store.session_key)['blob'] == LARGE
+
+
+def test_purge_sessions_in_batches():
+    now = timezone.now()
+    Session.objects.bulk_create([
+        Session(session_key=f'expired{i:08}', session_data='',
+                expire_date=now - timedelta(days=1))
+        for i in range(5)
+    ] + [Session(session_key='alive0000', session_data='',
+                 expire_date=now + timedelta(days=1))])
+    with CaptureQueriesContext(connection) as context:
+        call_command('purge_sessions', '--batch-size', '2')
+    deletes = [sql for sql in session_queries(context)
+               if sql.startswith('DELETE')]
+    assert len(deletes) == 3
+    assert list(Session.objects.values_list('pk', flat=True)) == [
+        'alive0000']
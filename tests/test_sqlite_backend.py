@@ -0,0 +1,66 @@
+import sqlite3
+import threading
+
+import pytest
+from django.db import connection
+
+from blog.backends.sqlite3.base import DatabaseWrapper, lock_waited
+
+
+@pytest.fixture
+def database(tmp_path):
+    wrapper = DatabaseWrapper(
+        {**connection.settings_dict, 'NAME': str(tmp_path / 'db.sqlite3')},
+        alias='stress')
+    with wrapper.cursor() as cursor:
+        cursor.execute('CREATE TABLE item (id INTEGER PRIMARY KEY)')
+    yield wrapper, str(tmp_path / 'db.sqlite3')
+    wrapper.close()
+
+
+@pytest.fixture
+def waits():
+    recorded = []
+
+    def record(sender, seconds, retries, **kwargs):
+        recorded.append((seconds, retries))
+
+    lock_waited.connect(record)
+    yield recorded
+    lock_waited.disconnect(record)
+
+
+def hold_write_lock(path, seconds):
+    holder = sqlite3.connect(path, check_same_thread=False)
+    holder.isolation_level = None
+    holder.execute('BEGIN IMMEDIATE')
+    timer = threading.Timer(seconds, holder.execute, ('COMMIT',))
+    timer.start()
+    return timer
+
+
+@pytest.mark.django_db
+def test_transaction_waits_for_write_lock(database, waits):
+    wrapper, path = database
+    hold_write_lock(path, 0.2)
+    wrapper.set_autocommit(
+        False, force_begin_transaction_with_broken_autocommit=True)
+    with wrapper.cursor() as cursor:
+        cursor.execute('INSERT INTO item DEFAULT VALUES')
+    wrapper.commit()
+    wrapper.set_autocommit(True)
+    assert waits and waits[-1][0] >= 0.15, (
+        'Ожидание блокировки записи должно попадать в lock_waited.')
+
+
+@pytest.mark.django_db
+def test_busy_autocommit_write_is_retried(database, waits):
+    wrapper, path = database
+    with wrapper.cursor() as cursor:
+        cursor.execute('PRAGMA busy_timeout = 0')
+        timer = hold_write_lock(path, 0.1)
+        cursor.execute('INSERT INTO item DEFAULT VALUES')
+        timer.join()
+        cursor.execute('SELECT COUNT(*) FROM item')
+        assert cursor.fetchone()[0] == 1
+    assert waits and waits[-1][1] > 0, 'SQLITE_BUSY должна повторяться.'
@@ -0,0 +1,69 @@
+import pytest
+from django.template import engines
+from django.template.loader import get_template
+from django.test import override_settings
+
+from blog.instrumentation import profile_templates
+from blog.templating import warm_up
+
+CACHED_LOADERS = [('django.template.loaders.cached.Loader', [
+    'django.template.loaders.filesystem.Loader',
+])]
+
+
+@pytest.fixture
+def template_dir(tmp_path):
+    templates = {
+        'outer.html': ('{% load django_bootstrap5 %}{% bootstrap_css %}'
+                       '{% for item in items %}{% include "card.html" %}'
+                       '{% endfor %}'),
+        'card.html': '<p>{{ item }}</p>',
+        'nested/footer.txt': 'подвал',
+        'broken.html': '{% if %}',
+    }
+    for name, text in templates.items():
+        path = tmp_path / name
+        path.parent.mkdir(exist_ok=True)
+        path.write_text(text, encoding='utf-8')
+    return tmp_path
+
+
+def templates_setting(directory, loaders):
+    return [{
+        'BACKEND': 'blog.instrumentation.InstrumentedDjangoTemplates',
+        'DIRS': [directory],
+        'OPTIONS': {'loaders': loaders},
+    }]
+
+
+def test_warm_up_fills_cached_loader(template_dir):
+    with override_settings(
+            TEMPLATES=templates_setting(template_dir, CACHED_LOADERS)):
+        assert warm_up() == 3
+        loader = engines.all()[0].engine.template_loaders[0]
+        assert {'outer.html', 'card.html', 'nested/footer.txt'} <= {
+            key.split('-')[0] for key in loader.get_template_cache}
+
+
+def test_warm_up_skips_uncached_engine(template_dir):
+    with override_settings(TEMPLATES=templates_setting(
+            template_dir, ['django.template.loaders.filesystem.Loader'])):
+        assert warm_up() == 0
+
+
+def test_profile_templates_includes_and_tags(template_dir):
+    with override_settings(
+            TEMPLATES=templates_setting(template_dir, CACHED_LOADERS)):
+        template = get_template('outer.html')
+        with profile_templates() as profile:
+            html = template.render({'items': [1, 2, 3]})
+        template.render({'items': [4]})
+    assert html.count('<p>') == 3
+    rows = {row['name']: row for row in profile.rows()}
+    assert rows['outer.html']['calls'] == 1
+    assert rows['card.html']['calls'] == 3
+    assert rows['{% include "card.html" %} outer.html:1']['calls'] == 3
+    assert rows['{% bootstrap_css %}']['calls'] == 1
+    assert not any(name.startswith('{% for') for name in rows)
+    outer = rows['outer.html']
+    assert 0 <= outer['own_ms'] <= outer['total_ms']
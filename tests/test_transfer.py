@@ -0,0 +1,133 @@
+import json
+from datetime import timedelta
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.utils import timezone
+
+from blog.models import Category, Comment, Location, Post, PublishedPost
+from blog.search import search_posts
+from jobs.models import Job
+
+pytestmark = pytest.mark.django_db
+
+User = get_user_model()
+
+
+@pytest.fixture
+def content(mixer, user, another_user, published_category,
+            published_location):
+    created_at = timezone.now() - timedelta(days=30)
+    posts = [
+        mixer.blend(Post, author=user, category=published_category,
+                    location=published_location, is_published=True,
+                    title=f'Прогулка {i}', image='',
+                    pub_date=timezone.now() - timedelta(days=i + 1))
+        for i in range(2)
+    ]
+    mixer.cycle(3).blend(Comment, post=posts[0], author=another_user)
+    Post.objects.update(created_at=created_at)
+    return posts
+
+
+def export(tmp_path, *args):
+    target = tmp_path / 'dump'
+    call_command('blog_export', '--output', str(target), *args)
+    return target
+
+
+def snapshot():
+    return sorted(
+        (post.title, post.author.username, post.category.slug,
+         post.location.name, post.pub_date, post.created_at,
+         post.comment_count, post.is_visible)
+        for post in Post.objects.select_related(
+            'author', 'category', 'location'))
+
+
+def test_jsonl_roundtrip(tmp_path, content):
+    expected = snapshot()
+    dump = export(tmp_path)
+    lines = [json.loads(line) for line in dump.read_text().splitlines()]
+    assert [line['model'] for line in lines] == (
+        ['category', 'location'] + ['post'] * 2 + ['comment'] * 3)
+
+    Location.objects.all().delete()
+    Post.objects.all().delete()
+    Category.objects.update(title='Изменённое название')
+    call_command('blog_import', str(dump), '--batch-size', '2')
+
+    assert snapshot() == expected
+    assert Category.objects.get().title != 'Изменённое название'
+    assert PublishedPost.objects.count() == 2
+    assert search_posts('прогулки').count() == 2
+    assert sorted(PublishedPost.objects.values_list(
+        'comment_count', flat=True)) == [0, 3]
+
+
+def test_csv_import_next_to_existing_posts(tmp_path, content):
+    dump = export(tmp_path, '--format', 'csv')
+    assert {path.name for path in dump.iterdir()} == {
+        'category.csv', 'location.csv', 'post.csv', 'comment.csv'}
+    top_id = max(post.id for post in content)
+
+    call_command('blog_import', str(dump))
+
+    assert Post.objects.count() == 4
+    assert Category.objects.count() == 1
+    imported = Post.objects.filter(id__gt=top_id)
+    assert sorted(imported.values_list('comment_count', flat=True)) == [0, 3]
+    assert Comment.objects.filter(post__in=imported).count() == 3
+
+
+def test_future_post_import_schedules_promotion(tmp_path, content):
+    pub_date = timezone.now() + timedelta(hours=1)
+    Post.objects.filter(pk=content[0].pk).update(pub_date=pub_date)
+    dump = export(tmp_path)
+    Post.objects.all().delete()
+    Job.objects.all().delete()
+
+    call_command('blog_import', str(dump))
+
+    post = Post.objects.get(pub_date=pub_date)
+    assert not PublishedPost.objects.filter(pk=post.pk).exists()
+    job = Job.objects.get(name__endswith='promote_post')
+    assert job.run_after == pub_date
+    assert job.payload['args'] == [post.pk]
+
+
+def test_comment_dates_survive_import(tmp_path, content):
+    created_at = timezone.now() - timedelta(days=7)
+    Comment.objects.update(created_at=created_at)
+    dump = export(tmp_path)
+    Post.objects.all().delete()
+
+    call_command('blog_import', str(dump))
+
+    assert list(Comment.objects.values_list(
+        'created_at', flat=True).distinct()) == [created_at]
+
+
+def test_missing_authors_are_created(tmp_path, content):
+    dump = export(tmp_path)
+    text = dump.read_text().replace(
+        f'"author": "{content[0].author.username}"', '"author": "newcomer"')
+    dump.write_text(text)
+    call_command('blog_import', str(dump))
+    newcomer = User.objects.get(username='newcomer')
+    assert not newcomer.has_usable_password()
+    assert newcomer.posts.count() == 2
+
+
+def test_unknown_category_aborts_import(tmp_path, content):
+    dump = export(tmp_path, '--models', 'post')
+    with pytest.raises(CommandError, match='категории'):
+        call_command('blog_import', str(dump))
+
+
+def test_unknown_location_aborts_import(tmp_path, content):
+    dump = export(tmp_path, '--models', 'category', 'post')
+    with pytest.raises(CommandError, match='места'):
+        call_command('blog_import', str(dump))
+    assert Post.objects.count() == 2
@@ -0,0 +1,53 @@
+import json
+
+import pytest
+from django.core.management import call_command
+from django.test import override_settings
+
+from blog.instrumentation import (
+    QueryBudgetExceeded, check_budget, recorder, stats_cache)
+
+
+@pytest.fixture(autouse=True)
+def clear_stats():
+    stats_cache().clear()
+    recorder.views = {}
+
+
+@pytest.fixture
+def comments_url(post_with_published_location):
+    return f'/posts/{post_with_published_location.id}/comments/'
+
+
+@pytest.mark.django_db
+def test_stats_are_collected_per_view(
+        client, admin_client, comments_url, capsys):
+    for _ in range(3):
+        client.get(comments_url)
+    response = admin_client.get('/admin/viewstats/')
+    views = response.json()['views']
+    summary = views['blog:post_comments']
+    assert summary['queries']['count'] == 3
+    assert summary['queries']['max'] == 2, (
+        'Убедитесь, что middleware считает SQL-запросы представления.')
+    assert summary['template_ms']['count'] == 3
+    assert summary['response_bytes']['max'] > 0
+
+    call_command('viewstats', '--json')
+    assert 'blog:post_comments' in json.loads(capsys.readouterr().out)
+
+
+@pytest.mark.django_db
+def test_stats_endpoint_is_staff_only(client, user_client):
+    for viewer in (client, user_client):
+        response = viewer.get('/admin/viewstats/')
+        assert response.status_code == 302
+
+
+def test_query_budget():
+    with override_settings(
+            VIEW_QUERY_BUDGETS={'blog:post_comments': 1},
+            VIEW_QUERY_BUDGET_ACTION='raise'):
+        check_budget('blog:post_comments', 1)
+        with pytest.raises(QueryBudgetExceeded):
+            check_budget('blog:post_comments', 2)